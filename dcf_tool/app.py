@@ -1,8 +1,25 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import plotly.graph_objects as go
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from finstat_common.instrument import debug_panel, span, start_rerun, traced
+from dcf_engine import (
+    SENSITIVITY_INPUTS,
+    dcf_sensitivities,
+    discount_cash_flows,
+    project_free_cash_flows,
+    sensitivity_grid,
+)
+from fcf_schedule import schedule_valuation, stage_growth
+from monte_carlo import run_monte_carlo
+from reverse_dcf import solve_implied
 
 st.set_page_config(page_title="DCF Valuation Tool", layout="wide")
+start_rerun("dcf_tool")
 
 st.title("💰 DCF Valuation Tool")
 st.write("Educational Streamlit app to experiment with Discounted Cash Flow (DCF) valuation assumptions.")
@@ -24,23 +41,22 @@ st.sidebar.markdown("---")
 st.sidebar.info("💡 **Tip**: Adjust the sliders to see how different assumptions affect the valuation.")
 
 # DCF calculation
-years_range = np.arange(1, years + 1)
-revenues = revenue_start * (1 + growth_rate / 100) ** years_range
-ebit = revenues * ebit_margin / 100
-nopat = ebit * (1 - tax_rate / 100)
-free_cash_flow = nopat  # Simplified: Assuming FCF = NOPAT
-
-discount_factors = (1 + discount_rate / 100) ** years_range
-discounted_fcf = free_cash_flow / discount_factors
-
-# Terminal value calculation
-terminal_value = free_cash_flow[-1] * (1 + terminal_growth / 100) / (
-    (discount_rate / 100) - (terminal_growth / 100)
-)
-terminal_pv = terminal_value / ((1 + discount_rate / 100) ** years)
+with span("dcf_valuation"):
+    years_range, revenues, ebit, nopat, free_cash_flow = project_free_cash_flows(
+        revenue_start, growth_rate, ebit_margin, tax_rate, years
+    )
+    discount_factors, discounted_fcf, _, terminal_value, terminal_pv = discount_cash_flows(
+        free_cash_flow, discount_rate, terminal_growth, years
+    )
 
 enterprise_value = discounted_fcf.sum() + terminal_pv
 intrinsic_value_per_share = enterprise_value / shares_out
+# Default for the market-price inputs: the DCF value can be NaN (WACC <= terminal growth) or not positive
+default_price = round(float(intrinsic_value_per_share), 2) if np.isfinite(intrinsic_value_per_share) else 0.0
+default_price = default_price if default_price >= 0.01 else 100.0
+
+if discount_rate <= terminal_growth:
+    st.warning("⚠️ Discount rate must exceed terminal growth for a finite terminal value.")
 
 # Display results
 st.subheader("📊 DCF Valuation Summary")
@@ -103,6 +119,331 @@ st.write(f"**Intrinsic Value per Share:** ₹ {intrinsic_value_per_share:,.2f}")
 
 st.markdown("---")
 
+# Multi-stage schedule
+st.subheader("🪜 Multi-Stage FCF Schedule")
+st.write(
+    "Hold the sidebar growth rate for a high-growth stage, fade it linearly to terminal growth, "
+    "and model reinvestment explicitly: FCF = NOPAT + D&A − Capex − ΔNWC."
+)
+
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    high_years = st.number_input("High-growth years", 0, 15, 5)
+with col2:
+    fade_years = st.number_input("Fade years", 0, 15, 5)
+with col3:
+    capex_pct = st.number_input("Capex (% revenue)", 0.0, 50.0, 0.0)
+with col4:
+    depreciation_pct = st.number_input("D&A (% revenue)", 0.0, 50.0, 0.0)
+with col5:
+    nwc_pct = st.number_input("NWC (% of Δ revenue)", 0.0, 100.0, 0.0)
+
+if high_years + fade_years == 0:
+    st.info("Add at least one high-growth or fade year to build a schedule.")
+else:
+    with span("fcf_schedule"):
+        stage_path = stage_growth(growth_rate, int(high_years), terminal_growth, int(fade_years))
+        staged, schedule = schedule_valuation(
+            revenue_start,
+            stage_path,
+            ebit_margin,
+            tax_rate,
+            discount_rate,
+            terminal_growth,
+            shares_out,
+            capex=capex_pct,
+            depreciation=depreciation_pct,
+            nwc=nwc_pct,
+        )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🏢 Multi-Stage EV (₹ Cr)", f"{staged.enterprise_value:,.2f}")
+    with col2:
+        st.metric(
+            "💵 Multi-Stage Value per Share (₹)",
+            f"{staged.intrinsic_value_per_share:,.2f}",
+            f"{staged.intrinsic_value_per_share - intrinsic_value_per_share:+,.2f} vs single-stage",
+        )
+    with col3:
+        st.metric("📊 Terminal Value (₹ Cr)", f"{staged.terminal_value:,.2f}")
+
+    schedule_df = pd.DataFrame(
+        {
+            "Year": np.arange(1, stage_path.size + 1),
+            "Growth (%)": stage_path,
+            "Revenue": schedule["revenue"],
+            "NOPAT": schedule["nopat"],
+            "D&A": schedule["depreciation"],
+            "Capex": schedule["capex"],
+            "ΔNWC": schedule["nwc_investment"],
+            "Free Cash Flow": schedule["free_cash_flow"],
+            "Discounted FCF": schedule["discounted_fcf"],
+        }
+    )
+    st.dataframe(
+        schedule_df.style.format({col: "{:,.2f}" for col in schedule_df.columns if col != "Year"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+st.markdown("---")
+
+# Closed-form sensitivities
+st.subheader("🌪️ Value Drivers")
+st.write("Analytic partial derivatives of intrinsic value per share, computed in the same pass as the valuation.")
+
+with span("dcf_sensitivities"):
+    _, partials, elasticities = dcf_sensitivities(
+        revenue_start, growth_rate, ebit_margin, tax_rate, discount_rate, terminal_growth, years, shares_out
+    )
+driver_labels = {
+    "growth_rate": "Revenue growth",
+    "ebit_margin": "EBIT margin",
+    "tax_rate": "Tax rate",
+    "discount_rate": "WACC",
+    "terminal_growth": "Terminal growth",
+    "years": "Projection years",
+}
+drivers = pd.DataFrame(
+    {
+        "Input": [driver_labels[name] for name in SENSITIVITY_INPUTS],
+        "Unit": ["+1 year" if name == "years" else "+1 pp" for name in SENSITIVITY_INPUTS],
+        "Δ Value per Share (₹)": [float(partials[name]) for name in SENSITIVITY_INPUTS],
+        "Elasticity": [float(elasticities[name]) for name in SENSITIVITY_INPUTS],
+    }
+)
+drivers = drivers.reindex(drivers["Δ Value per Share (₹)"].abs().sort_values().index)
+
+col1, col2 = st.columns([3, 2])
+with col1:
+    impact = drivers["Δ Value per Share (₹)"]
+    tornado = go.Figure()
+    for sign, name, color in ((-1, "Unfavourable move", "red"), (1, "Favourable move", "green")):
+        tornado.add_trace(
+            go.Bar(
+                y=drivers["Input"],
+                x=sign * impact.abs(),
+                base=intrinsic_value_per_share,
+                orientation="h",
+                name=name,
+                marker=dict(color=color),
+            )
+        )
+    tornado.update_layout(
+        barmode="overlay",
+        xaxis_title="Value per share (₹) for a one-unit move",
+        height=400,
+        margin=dict(l=50, r=20, t=30, b=50),
+    )
+    st.plotly_chart(tornado, use_container_width=True)
+with col2:
+    st.dataframe(
+        drivers.iloc[::-1].style.format({"Δ Value per Share (₹)": "{:+,.2f}", "Elasticity": "{:+.2f}"}),
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.caption("Elasticity = % change in value for a 1% relative change in the input.")
+
+st.markdown("---")
+
+# Sensitivity analysis
+st.subheader("🔥 Sensitivity Analysis")
+st.write("Intrinsic value per share across a full WACC × growth × terminal growth grid, evaluated in one pass.")
+
+
+@traced("compute_sensitivity_grid", cache=st.cache_data(show_spinner=False))
+def compute_sensitivity_grid(base: dict, discount_rates, growth_rates, terminal_growths, years: int):
+    return sensitivity_grid(base, discount_rates, growth_rates, terminal_growths, years)
+
+
+def value_heatmap(z, x, y, x_title: str, y_title: str) -> go.Figure:
+    fig = go.Figure(
+        go.Heatmap(
+            z=z,
+            x=x,
+            y=y,
+            colorscale="RdYlGn",
+            colorbar=dict(title="₹ / share"),
+            hovertemplate=f"{x_title}: %{{x:.2f}}<br>{y_title}: %{{y:.2f}}<br>Value: ₹%{{z:,.2f}}<extra></extra>",
+        )
+    )
+    fig.update_layout(xaxis_title=x_title, yaxis_title=y_title, height=450, margin=dict(l=50, r=20, t=30, b=50))
+    return fig
+
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    wacc_span = st.slider("WACC range (%)", 5.0, 20.0, (8.0, 16.0))
+    wacc_steps = st.number_input("WACC steps", 5, 200, 50)
+with col2:
+    growth_span = st.slider("Growth range (%)", 0.0, 30.0, (2.0, 20.0))
+    growth_steps = st.number_input("Growth steps", 5, 200, 50)
+with col3:
+    tg_span = st.slider("Terminal growth range (%)", 0.0, 6.0, (1.0, 5.0))
+    tg_steps = st.number_input("Terminal growth steps", 2, 100, 20)
+
+wacc_grid = np.linspace(*wacc_span, int(wacc_steps))
+growth_grid = np.linspace(*growth_span, int(growth_steps))
+tg_grid = np.linspace(*tg_span, int(tg_steps))
+
+value_grid = compute_sensitivity_grid(
+    {"revenue_start": revenue_start, "ebit_margin": ebit_margin, "tax_rate": tax_rate, "shares_out": shares_out},
+    wacc_grid,
+    growth_grid,
+    tg_grid,
+    years,
+)
+st.caption(f"{value_grid.size:,} scenarios evaluated. Blank cells have WACC ≤ terminal growth.")
+
+col1, col2 = st.columns(2)
+with col1:
+    tg_index = int(np.abs(tg_grid - terminal_growth).argmin())
+    st.markdown(f"**WACC × Growth** (terminal growth {tg_grid[tg_index]:.2f}%)")
+    with span("plotly_chart"):
+        st.plotly_chart(
+            value_heatmap(value_grid[:, :, tg_index], growth_grid, wacc_grid, "Revenue growth (%)", "WACC (%)"),
+            use_container_width=True,
+        )
+with col2:
+    growth_index = int(np.abs(growth_grid - growth_rate).argmin())
+    st.markdown(f"**WACC × Terminal Growth** (revenue growth {growth_grid[growth_index]:.2f}%)")
+    with span("plotly_chart"):
+        st.plotly_chart(
+            value_heatmap(value_grid[:, growth_index, :], tg_grid, wacc_grid, "Terminal growth (%)", "WACC (%)"),
+            use_container_width=True,
+        )
+
+st.markdown("---")
+
+# Monte Carlo simulation
+st.subheader("🎲 Monte Carlo Simulation")
+st.write("Sample growth, EBIT margin, tax and WACC around the sidebar values to see the distribution of intrinsic value.")
+
+
+@traced("compute_monte_carlo", cache=st.cache_data(show_spinner=False))
+def compute_monte_carlo(fixed: dict, distributions: dict, years: int, n_draws: int, seed: int, market_price: float):
+    return run_monte_carlo(fixed, distributions, years, n_draws, seed=seed, market_price=market_price)
+
+
+with st.form("monte_carlo"):
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        growth_sd = st.number_input("Growth std dev (pp)", 0.0, 20.0, 3.0)
+    with col2:
+        margin_sd = st.number_input("EBIT margin std dev (pp)", 0.0, 20.0, 4.0)
+    with col3:
+        tax_sd = st.number_input("Tax std dev (pp)", 0.0, 10.0, 2.0)
+    with col4:
+        wacc_sd = st.number_input("WACC std dev (pp)", 0.0, 5.0, 1.5)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        n_draws = st.number_input("Draws", 1_000, 50_000_000, 1_000_000, step=100_000)
+    with col2:
+        market_price = st.number_input("Market price (₹)", value=default_price, min_value=0.0)
+    with col3:
+        mc_seed = st.number_input("Random seed", 0, 2**31 - 1, 42)
+
+    run_simulation = st.form_submit_button("Run simulation")
+
+if run_simulation:
+    with st.spinner(f"Simulating {int(n_draws):,} scenarios..."):
+        mc = compute_monte_carlo(
+            {
+                "revenue_start": revenue_start,
+                "growth_rate": growth_rate,
+                "ebit_margin": ebit_margin,
+                "tax_rate": tax_rate,
+                "discount_rate": discount_rate,
+                "terminal_growth": terminal_growth,
+                "shares_out": shares_out,
+            },
+            {
+                "growth_rate": (growth_rate, growth_sd),
+                "ebit_margin": (ebit_margin, margin_sd),
+                "tax_rate": (tax_rate, tax_sd),
+                "discount_rate": (discount_rate, wacc_sd),
+            },
+            years,
+            int(n_draws),
+            int(mc_seed),
+            market_price,
+        )
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Median Value (₹)", f"{mc.percentiles.get(50, float('nan')):,.2f}")
+    with col2:
+        st.metric("Mean Value (₹)", f"{mc.mean:,.2f}")
+    with col3:
+        st.metric("5th – 95th Pct (₹)", f"{mc.percentiles.get(5, float('nan')):,.0f} – {mc.percentiles.get(95, float('nan')):,.0f}")
+    with col4:
+        prob = mc.prob_above_price
+        st.metric("P(Value > Market Price)", f"{prob:.1%}" if prob is not None else "N/A")
+
+    centers = (mc.bin_edges[:-1] + mc.bin_edges[1:]) / 2
+    hist_fig = go.Figure(go.Bar(x=centers, y=mc.counts, marker=dict(color="steelblue"), name="Scenarios"))
+    hist_fig.add_vline(x=market_price, line_dash="dash", line_color="red", annotation_text="Market price")
+    hist_fig.update_layout(
+        xaxis_title="Intrinsic value per share (₹)",
+        yaxis_title="Scenarios",
+        bargap=0,
+        height=400,
+        margin=dict(l=50, r=20, t=30, b=50),
+    )
+    with span("plotly_chart"):
+        st.plotly_chart(hist_fig, use_container_width=True)
+
+    st.dataframe(
+        pd.DataFrame({"Percentile": list(mc.percentiles), "Value (₹)": list(mc.percentiles.values())}).style.format(
+            {"Value (₹)": "{:,.2f}"}
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+    if mc.n_invalid:
+        st.caption(f"{mc.n_invalid:,} draws had WACC ≤ terminal growth and were excluded.")
+
+st.markdown("---")
+
+# Reverse DCF
+st.subheader("🔁 Reverse DCF")
+st.write("Solve for the revenue growth or WACC that the market price implies, holding every other assumption fixed.")
+
+implied_price = st.number_input("Observed market price (₹)", value=default_price, min_value=0.01)
+reverse_params = {
+    "revenue_start": revenue_start,
+    "growth_rate": growth_rate,
+    "ebit_margin": ebit_margin,
+    "tax_rate": tax_rate,
+    "discount_rate": discount_rate,
+    "terminal_growth": terminal_growth,
+    "shares_out": shares_out,
+}
+with span("reverse_dcf"):
+    implied_growth = solve_implied("growth_rate", implied_price, reverse_params, years)
+    implied_wacc = solve_implied("discount_rate", implied_price, reverse_params, years)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.metric(
+        "📈 Implied Revenue Growth",
+        f"{float(implied_growth.value):.2f}%" if implied_growth.converged else "N/A",
+        f"{float(implied_growth.value) - growth_rate:+.2f} pp vs input" if implied_growth.converged else None,
+    )
+    st.caption(f"Status: {implied_growth.status} after {int(implied_growth.iterations)} iterations")
+with col2:
+    st.metric(
+        "📉 Implied WACC",
+        f"{float(implied_wacc.value):.2f}%" if implied_wacc.converged else "N/A",
+        f"{float(implied_wacc.value) - discount_rate:+.2f} pp vs input" if implied_wacc.converged else None,
+        delta_color="inverse",
+    )
+    st.caption(f"Status: {implied_wacc.status} after {int(implied_wacc.iterations)} iterations")
+
+st.markdown("---")
+
 # Educational notes
 with st.expander("📚 Learn More About DCF"):
     st.markdown("""
@@ -126,3 +467,5 @@ with st.expander("📚 Learn More About DCF"):
 st.caption(
     "⚠️ This tool is for **educational** purposes only and does not constitute financial advice."
 )
+
+debug_panel()
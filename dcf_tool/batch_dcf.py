@@ -0,0 +1,163 @@
+"""Headless batch DCF valuation.
+
+Reads one row of assumptions per company from CSV or Parquet, values every
+row with the vectorized engine in a process pool and streams the results to
+Parquet chunk by chunk.
+
+Usage:
+    python batch_dcf.py assumptions.parquet valuations.parquet --years 10
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dcf_engine import SENSITIVITY_INPUTS, DCFResult, dcf_sensitivities, dcf_valuation
+
+INPUT_COLUMNS = [
+    "revenue_start",
+    "growth_rate",
+    "ebit_margin",
+    "tax_rate",
+    "discount_rate",
+    "terminal_growth",
+    "shares_out",
+]
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def output_columns(sensitivities: bool = False) -> list:
+    columns = list(DCFResult._fields)
+    if sensitivities:
+        columns += [f"d_value_d_{name}" for name in SENSITIVITY_INPUTS]
+    return columns
+
+
+def read_assumptions(path: Path, sensitivities: bool = False) -> pd.DataFrame:
+    """Load an assumptions table from CSV or Parquet"""
+    if path.suffix.lower() in (".parquet", ".pq"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    missing = [col for col in INPUT_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing assumption columns: {', '.join(missing)}")
+    clashing = [col for col in output_columns(sensitivities) if col in df.columns]
+    if clashing:
+        raise ValueError(f"Input columns clash with output columns: {', '.join(clashing)}")
+    return df
+
+
+def row_horizons(df: pd.DataFrame, years: int) -> pd.Series:
+    """Projection years per row: the `years` column where given, else the default"""
+    if "years" not in df.columns:
+        return pd.Series(years, index=df.index)
+    horizons = pd.to_numeric(df["years"]).fillna(years)
+    if ((horizons < 1) | (horizons != np.floor(horizons))).any():
+        raise ValueError("'years' must be a whole number of at least 1")
+    return horizons.astype(int)
+
+
+def value_frame(df: pd.DataFrame, years: int, sensitivities: bool = False) -> pd.DataFrame:
+    """Value every row of an assumptions frame
+
+    A per-row `years` column overrides the default horizon (blank cells use
+    the default); rows are grouped by horizon so each group is still a
+    single vectorized call. With `sensitivities`, analytic
+    d(value per share)/d(input) columns are added.
+    """
+    horizons = row_horizons(df, years)
+    columns = output_columns(sensitivities)
+    out = pd.DataFrame(np.nan, index=df.index, columns=columns)
+
+    for horizon, rows in df.groupby(horizons):
+        inputs = [rows[col].to_numpy(dtype=float) for col in INPUT_COLUMNS]
+        if sensitivities:
+            result, partials, _ = dcf_sensitivities(*inputs[:6], int(horizon), inputs[6])
+            values = [*result, *(partials[name] for name in SENSITIVITY_INPUTS)]
+        else:
+            values = dcf_valuation(*inputs[:6], int(horizon), inputs[6])
+        out.loc[rows.index, columns] = np.column_stack(values)
+
+    return pd.concat([df, out], axis=1)
+
+
+def output_schema(df: pd.DataFrame, sensitivities: bool = False) -> pa.Schema:
+    """Parquet schema for valued rows, inferred once from the whole input
+
+    Inferring per chunk would let a passthrough column that happens to be
+    all-null in one chunk change type between row groups.
+    """
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for col in output_columns(sensitivities):
+        schema = schema.append(pa.field(col, pa.float64()))
+    return schema
+
+
+def _value_chunk(args) -> pd.DataFrame:
+    df, years, sensitivities = args
+    return value_frame(df, years, sensitivities)
+
+
+def run_batch(
+    input_path: Path,
+    output_path: Path,
+    years: int = 10,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    max_workers=None,
+    sensitivities: bool = False,
+) -> int:
+    """Value an assumptions file and stream results to Parquet, returning the row count"""
+    df = read_assumptions(input_path, sensitivities)
+    # Fail on bad horizons before any worker starts
+    row_horizons(df, years)
+    schema = output_schema(df, sensitivities)
+    chunks = [
+        (df.iloc[start : start + chunk_rows], years, sensitivities) for start in range(0, len(df), chunk_rows)
+    ]
+
+    pool = None
+    rows = 0
+    # An empty input still produces a file with the full schema and no rows
+    writer = pq.ParquetWriter(output_path, schema)
+    try:
+        if len(chunks) > 1 and max_workers != 1:
+            pool = ProcessPoolExecutor(max_workers=max_workers)
+            results = pool.map(_value_chunk, chunks)
+        else:
+            results = map(_value_chunk, chunks)
+
+        for valued in results:
+            writer.write_table(pa.Table.from_pandas(valued, schema=schema, preserve_index=False))
+            rows += len(valued)
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown()
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch DCF valuation over a table of per-company assumptions")
+    parser.add_argument("input", type=Path, help="CSV or Parquet file with one row of assumptions per company")
+    parser.add_argument("output", type=Path, help="Parquet file to write valuations to")
+    parser.add_argument("--years", type=int, default=10, help="Projection years when the input has no 'years' column")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows valued per worker task")
+    parser.add_argument("--sensitivities", action="store_true", help="Add analytic partial-derivative columns")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = run_batch(args.input, args.output, args.years, args.chunk_rows, args.workers, args.sensitivities)
+    print(f"Valued {rows:,} rows in {time.perf_counter() - start:.2f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Vectorized DCF math shared by the Streamlit app and batch tools.
+
+Every function accepts scalars or NumPy arrays for the percentage inputs
+(same units as the sidebar sliders) and broadcasts them against each other,
+so a single call can value one scenario or a whole grid of scenarios.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class DCFResult(NamedTuple):
+    enterprise_value: np.ndarray
+    intrinsic_value_per_share: np.ndarray
+    pv_fcf: np.ndarray
+    terminal_value: np.ndarray
+    terminal_pv: np.ndarray
+
+
+def to_rate(value) -> np.ndarray:
+    """Convert a percentage input into a float array of rates"""
+    return np.asarray(value, dtype=float) / 100
+
+
+def project_free_cash_flows(revenue_start, growth_rate, ebit_margin, tax_rate, years: int):
+    """Project revenue, EBIT, NOPAT and FCF along a trailing year axis"""
+    years_range = np.arange(1, years + 1)
+    revenue_start = np.asarray(revenue_start, dtype=float)[..., None]
+    growth = to_rate(growth_rate)[..., None]
+    margin = to_rate(ebit_margin)[..., None]
+    tax = to_rate(tax_rate)[..., None]
+
+    revenues = revenue_start * (1 + growth) ** years_range
+    ebit = revenues * margin
+    nopat = ebit * (1 - tax)
+    free_cash_flow = nopat  # Simplified: Assuming FCF = NOPAT
+    return years_range, revenues, ebit, nopat, free_cash_flow
+
+
+def discount_cash_flows(free_cash_flow, discount_rate, terminal_growth, years: int):
+    """Discount an FCF projection and add the perpetuity-growth terminal value
+
+    Scenarios where the discount rate does not exceed terminal growth have no
+    finite terminal value and come back as NaN.
+    """
+    years_range = np.arange(1, years + 1)
+    wacc = to_rate(discount_rate)
+    g_terminal = to_rate(terminal_growth)
+
+    discount_factors = (1 + wacc[..., None]) ** years_range
+    discounted_fcf = free_cash_flow / discount_factors
+    pv_fcf = discounted_fcf.sum(axis=-1)
+
+    spread = wacc - g_terminal
+    valid = spread > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terminal_value = np.where(
+            valid,
+            free_cash_flow[..., -1] * (1 + g_terminal) / np.where(valid, spread, 1.0),
+            np.nan,
+        )
+    terminal_pv = terminal_value / discount_factors[..., -1]
+    return discount_factors, discounted_fcf, pv_fcf, terminal_value, terminal_pv
+
+
+def dcf_valuation(
+    revenue_start,
+    growth_rate,
+    ebit_margin,
+    tax_rate,
+    discount_rate,
+    terminal_growth,
+    years: int,
+    shares_out=1.0,
+) -> DCFResult:
+    """Value one scenario or a broadcast batch of scenarios"""
+    *_, free_cash_flow = project_free_cash_flows(revenue_start, growth_rate, ebit_margin, tax_rate, years)
+    _, _, pv_fcf, terminal_value, terminal_pv = discount_cash_flows(
+        free_cash_flow, discount_rate, terminal_growth, years
+    )
+    enterprise_value = pv_fcf + terminal_pv
+    intrinsic_value_per_share = enterprise_value / np.asarray(shares_out, dtype=float)
+    return DCFResult(enterprise_value, intrinsic_value_per_share, pv_fcf, terminal_value, terminal_pv)
+
+
+def sensitivity_grid(
+    base: dict,
+    discount_rates,
+    growth_rates,
+    terminal_growths,
+    years: int,
+) -> np.ndarray:
+    """Intrinsic value per share over a WACC x growth x terminal-growth grid
+
+    `base` holds the remaining assumptions (revenue_start, ebit_margin,
+    tax_rate, shares_out). The result has shape
+    (len(discount_rates), len(growth_rates), len(terminal_growths)) and is
+    evaluated in a single broadcast.
+    """
+    wacc, growth, g_terminal = np.ix_(
+        np.asarray(discount_rates, dtype=float),
+        np.asarray(growth_rates, dtype=float),
+        np.asarray(terminal_growths, dtype=float),
+    )
+    result = dcf_valuation(
+        base["revenue_start"],
+        growth,
+        base["ebit_margin"],
+        base["tax_rate"],
+        wacc,
+        g_terminal,
+        years,
+        base["shares_out"],
+    )
+    return result.intrinsic_value_per_share
+
+
+SENSITIVITY_INPUTS = (
+    "growth_rate",
+    "ebit_margin",
+    "tax_rate",
+    "discount_rate",
+    "terminal_growth",
+    "years",
+)
+
+
+def dcf_sensitivities(
+    revenue_start,
+    growth_rate,
+    ebit_margin,
+    tax_rate,
+    discount_rate,
+    terminal_growth,
+    years: int,
+    shares_out=1.0,
+):
+    """Valuation plus analytic partial derivatives of value per share
+
+    With C = revenue * margin * (1 - tax) and q = (1 + g) / (1 + r),
+    EV = C * (sum_t q^t + q^N * A) where A = (1 + g_T) / (r - g_T), so every
+    partial follows from the same two sums over the year axis. Derivatives
+    are per percentage point for rate inputs and per extra projection year
+    (an exact one-year step) for `years`. Returns (DCFResult, partials,
+    elasticities), the last two keyed by SENSITIVITY_INPUTS.
+    """
+    years_range = np.arange(1, years + 1)
+    revenue_start = np.asarray(revenue_start, dtype=float)
+    g, m, tax = to_rate(growth_rate), to_rate(ebit_margin), to_rate(tax_rate)
+    r, g_terminal = to_rate(discount_rate), to_rate(terminal_growth)
+    shares = np.asarray(shares_out, dtype=float)
+
+    q = (1 + g) / (1 + r)
+    q_t = q[..., None] ** years_range
+    sum_q = q_t.sum(axis=-1)
+    sum_tq = (years_range * q_t).sum(axis=-1)
+    q_n = q_t[..., -1]
+
+    spread = r - g_terminal
+    valid = spread > 0
+    safe_spread = np.where(valid, spread, 1.0)
+    perpetuity = np.where(valid, (1 + g_terminal) / safe_spread, np.nan)
+
+    base = revenue_start * m * (1 - tax)
+    multiple = sum_q + q_n * perpetuity  # EV / C
+    enterprise_value = base * multiple
+    pv_fcf = base * sum_q
+    terminal_value = base * (1 + g) ** years * perpetuity
+    terminal_pv = base * q_n * perpetuity
+    result = DCFResult(enterprise_value, enterprise_value / shares, pv_fcf, terminal_value, terminal_pv)
+
+    growth_weight = sum_tq + years * q_n * perpetuity
+    d_ev = {
+        "growth_rate": base * growth_weight / (1 + g),
+        "ebit_margin": revenue_start * (1 - tax) * multiple,
+        "tax_rate": -revenue_start * m * multiple,
+        "discount_rate": -base * (growth_weight / (1 + r) + q_n * perpetuity / safe_spread),
+        "terminal_growth": np.where(valid, base * q_n * (1 + r) / safe_spread**2, np.nan),
+    }
+    partials = {name: value / 100 / shares for name, value in d_ev.items()}
+    partials["years"] = base * q_n * (q * (1 + perpetuity) - perpetuity) / shares
+
+    inputs = {
+        "growth_rate": growth_rate,
+        "ebit_margin": ebit_margin,
+        "tax_rate": tax_rate,
+        "discount_rate": discount_rate,
+        "terminal_growth": terminal_growth,
+        "years": years,
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        elasticities = {
+            name: partials[name] * np.asarray(inputs[name], dtype=float) / result.intrinsic_value_per_share
+            for name in SENSITIVITY_INPUTS
+        }
+    return result, partials, elasticities
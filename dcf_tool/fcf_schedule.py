@@ -0,0 +1,108 @@
+"""Multi-stage free cash flow schedules.
+
+Assumptions are per-year vectors along the last axis, so a (companies, years)
+matrix values a whole batch in one call. A batch input with one value per
+company (the shape of `revenue_start`) applies to every year. Free cash flow is
+
+    FCF_t = NOPAT_t + D&A_t - Capex_t - change in NWC_t
+
+with D&A and capex as % of revenue and NWC investment as % of the change in
+revenue. With constant growth and margin and zero capex, D&A and NWC the
+schedule reduces to the single-stage model in dcf_engine.
+"""
+
+import numpy as np
+
+from dcf_engine import DCFResult, discount_cash_flows, to_rate
+
+
+def stage_growth(high_growth, high_years: int, terminal_growth, fade_years: int) -> np.ndarray:
+    """Growth path (in %) holding `high_growth` then fading linearly to terminal growth
+
+    Inputs may be arrays of per-company rates; the result has a trailing axis
+    of length high_years + fade_years.
+    """
+    high_growth = np.asarray(high_growth, dtype=float)[..., None]
+    terminal_growth = np.asarray(terminal_growth, dtype=float)[..., None]
+    # Fade weights run from just below 1 down to 1 / (fade_years + 1) so the
+    # last fade year is still above terminal growth.
+    fade = 1 - np.arange(1, fade_years + 1) / (fade_years + 1)
+    weights = np.concatenate([np.ones(high_years), fade])
+    return terminal_growth + (high_growth - terminal_growth) * weights
+
+
+def project_schedule(revenue_start, growth, ebit_margin, tax_rate, capex=0.0, depreciation=0.0, nwc=0.0) -> dict:
+    """Per-year revenue, NOPAT and FCF from per-year assumption vectors (all in %)
+
+    Scalars count as a one-year schedule, and every per-year input is
+    broadcast to a common shape before projecting, so a constant given as a
+    scalar lines up with the year axis of the others. For a batch, an input
+    shaped like `revenue_start` holds one value per company for every year;
+    a per-year vector shared by all companies needs a different length or
+    shape (1, years).
+    """
+    revenue_start = np.asarray(revenue_start, dtype=float)
+    companies = revenue_start.shape
+
+    def per_year(value) -> np.ndarray:
+        rate = to_rate(value)
+        if companies and rate.shape == companies:
+            # One value per company: add the year axis instead of broadcasting along it
+            rate = rate[..., None]
+        return np.atleast_1d(rate)
+
+    growth, margin, tax, capex, depreciation, nwc = np.broadcast_arrays(
+        *(per_year(v) for v in (growth, ebit_margin, tax_rate, capex, depreciation, nwc))
+    )
+    revenue_start = revenue_start[..., None]
+
+    revenues = revenue_start * np.cumprod(1 + growth, axis=-1)
+    start = np.broadcast_to(revenue_start, revenues.shape[:-1] + (1,))
+    previous = np.concatenate([start, revenues[..., :-1]], axis=-1)
+    ebit = revenues * margin
+    nopat = ebit * (1 - tax)
+    depreciation_amount = revenues * depreciation
+    capex_amount = revenues * capex
+    nwc_investment = (revenues - previous) * nwc
+    free_cash_flow = nopat + depreciation_amount - capex_amount - nwc_investment
+
+    return {
+        "revenue": revenues,
+        "ebit": ebit,
+        "nopat": nopat,
+        "depreciation": depreciation_amount,
+        "capex": capex_amount,
+        "nwc_investment": nwc_investment,
+        "free_cash_flow": free_cash_flow,
+    }
+
+
+def schedule_valuation(
+    revenue_start,
+    growth,
+    ebit_margin,
+    tax_rate,
+    discount_rate,
+    terminal_growth,
+    shares_out=1.0,
+    capex=0.0,
+    depreciation=0.0,
+    nwc=0.0,
+):
+    """Value a multi-stage schedule, returning (DCFResult, per-year schedule)
+
+    `discount_rate`, `terminal_growth` and `shares_out` are one value per
+    company; the other assumptions may vary by year along the last axis.
+    """
+    schedule = project_schedule(revenue_start, growth, ebit_margin, tax_rate, capex, depreciation, nwc)
+    free_cash_flow = schedule["free_cash_flow"]
+    years = free_cash_flow.shape[-1]
+    discount_factors, discounted_fcf, pv_fcf, terminal_value, terminal_pv = discount_cash_flows(
+        free_cash_flow, discount_rate, terminal_growth, years
+    )
+    schedule["discount_factor"] = np.broadcast_to(discount_factors, free_cash_flow.shape)
+    schedule["discounted_fcf"] = discounted_fcf
+
+    enterprise_value = pv_fcf + terminal_pv
+    intrinsic_value_per_share = enterprise_value / np.asarray(shares_out, dtype=float)
+    return DCFResult(enterprise_value, intrinsic_value_per_share, pv_fcf, terminal_value, terminal_pv), schedule
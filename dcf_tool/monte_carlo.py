@@ -0,0 +1,204 @@
+"""Monte Carlo DCF: sample assumptions and aggregate the value distribution.
+
+Draws are processed in fixed-size chunks so memory stays bounded no matter
+how many scenarios are requested. Each chunk gets its own child seed from a
+single `np.random.SeedSequence`, which keeps results reproducible regardless
+of how chunks are spread across worker processes. Chunks only return
+histogram counts and per-chunk moments, never the raw draws.
+"""
+
+import site
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from dcf_engine import dcf_valuation
+
+DEFAULT_CHUNK_SIZE = 250_000
+DEFAULT_BINS = 2_000
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+# This directory is not a package, so spawned workers need it on sys.path to
+# unpickle `_run_chunk` and import dcf_engine by its bare name
+MODULE_DIR = str(Path(__file__).resolve().parent)
+
+# Sampled assumptions and the range each is clipped to (in %)
+SAMPLED_INPUTS = {
+    "growth_rate": (-100.0, np.inf),
+    "ebit_margin": (0.0, 100.0),
+    "tax_rate": (0.0, 100.0),
+    "discount_rate": (0.0, np.inf),
+}
+
+
+class MonteCarloResult(NamedTuple):
+    n_draws: int
+    n_invalid: int
+    mean: float
+    std: float
+    percentiles: dict
+    bin_edges: np.ndarray
+    counts: np.ndarray
+    prob_above_price: Optional[float]
+
+
+def _draw(rng: np.random.Generator, distributions: dict, n: int) -> dict:
+    """Draw clipped normal samples for every input in `distributions`"""
+    draws = {}
+    for name, (mean, std) in distributions.items():
+        low, high = SAMPLED_INPUTS[name]
+        draws[name] = np.clip(rng.normal(mean, std, n), low, high)
+    return draws
+
+
+def _simulate(seed: np.random.SeedSequence, n: int, fixed: dict, distributions: dict, years: int) -> np.ndarray:
+    """Intrinsic value per share for one chunk of draws"""
+    params = {**fixed, **_draw(np.random.default_rng(seed), distributions, n)}
+    return dcf_valuation(
+        params["revenue_start"],
+        params["growth_rate"],
+        params["ebit_margin"],
+        params["tax_rate"],
+        params["discount_rate"],
+        params["terminal_growth"],
+        years,
+        params["shares_out"],
+    ).intrinsic_value_per_share
+
+
+def _summarize(values: np.ndarray, bin_edges: np.ndarray, market_price: Optional[float]) -> tuple:
+    """Reduce one chunk to (counts, underflow, overflow, invalid, n, mean, m2, above)
+
+    `m2` is the sum of squared deviations from the chunk mean, so chunks can
+    be pooled without the cancellation of a raw sum of squares.
+    """
+    valid = values[np.isfinite(values)]
+    counts, _ = np.histogram(valid, bins=bin_edges)
+    above = int((valid > market_price).sum()) if market_price is not None else 0
+    mean = float(valid.mean()) if valid.size else 0.0
+    return (
+        counts,
+        int((valid < bin_edges[0]).sum()),
+        int((valid > bin_edges[-1]).sum()),
+        values.size - valid.size,
+        valid.size,
+        mean,
+        float(np.square(valid - mean).sum()),
+        above,
+    )
+
+
+def _pool_moments(summaries) -> tuple:
+    """Combine per-chunk (n, mean, m2) with Chan et al.'s pairwise update"""
+    n, mean, m2 = 0, 0.0, 0.0
+    for s in summaries:
+        n_b, mean_b, m2_b = s[4], s[5], s[6]
+        if not n_b:
+            continue
+        total = n + n_b
+        delta = mean_b - mean
+        mean += delta * n_b / total
+        m2 += m2_b + delta**2 * n * n_b / total
+        n = total
+    return n, mean, m2
+
+
+def _run_chunk(args) -> tuple:
+    seed, n, fixed, distributions, years, bin_edges, market_price = args
+    return _summarize(_simulate(seed, n, fixed, distributions, years), bin_edges, market_price)
+
+
+def _bin_edges(pilot: np.ndarray, bins: int) -> np.ndarray:
+    """Histogram range from a pilot chunk, padded to catch the tails"""
+    valid = pilot[np.isfinite(pilot)]
+    if valid.size == 0:
+        return np.linspace(0.0, 1.0, bins + 1)
+    low, high = np.percentile(valid, [0.5, 99.5])
+    pad = max(high - low, abs(high) * 1e-6, 1e-9) * 0.5
+    return np.linspace(low - pad, high + pad, bins + 1)
+
+
+def _histogram_percentiles(counts: np.ndarray, underflow: int, overflow: int, bin_edges: np.ndarray, qs) -> dict:
+    """Interpolate percentiles from the cumulative histogram
+
+    Draws outside the histogram range count toward the total; a percentile
+    that falls among them is clamped to the nearest edge.
+    """
+    cumulative = underflow + np.cumsum(counts)
+    total = underflow + int(counts.sum()) + overflow
+    result = {}
+    for q in qs:
+        target = total * q / 100
+        if target <= underflow:
+            result[q] = float(bin_edges[0])
+            continue
+        idx = int(np.searchsorted(cumulative, target))
+        if idx >= counts.size:
+            result[q] = float(bin_edges[-1])
+            continue
+        before = cumulative[idx] - counts[idx]
+        frac = (target - before) / counts[idx] if counts[idx] else 0.0
+        result[q] = float(bin_edges[idx] + np.clip(frac, 0, 1) * (bin_edges[idx + 1] - bin_edges[idx]))
+    return result
+
+
+def run_monte_carlo(
+    fixed: dict,
+    distributions: dict,
+    years: int,
+    n_draws: int,
+    seed: int = 42,
+    market_price: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    bins: int = DEFAULT_BINS,
+    max_workers: Optional[int] = None,
+) -> MonteCarloResult:
+    """Simulate the distribution of intrinsic value per share
+
+    `fixed` holds every dcf_valuation input; any key that also appears in
+    `distributions` as (mean, std) is sampled instead. With every std at
+    zero the result collapses onto the single-point valuation. Percentiles
+    are interpolated from a fine histogram whose range comes from the first
+    chunk, so values beyond it only count toward the tails.
+    """
+    if n_draws < 1:
+        raise ValueError(f"n_draws must be at least 1, got {n_draws}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    sizes = [chunk_size] * (n_draws // chunk_size)
+    if n_draws % chunk_size:
+        sizes.append(n_draws % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    pilot = _simulate(seeds[0], sizes[0], fixed, distributions, years)
+    bin_edges = _bin_edges(pilot, bins)
+    summaries = [_summarize(pilot, bin_edges, market_price)]
+
+    jobs = [
+        (chunk_seed, n, fixed, distributions, years, bin_edges, market_price)
+        for chunk_seed, n in zip(seeds[1:], sizes[1:])
+    ]
+    if jobs and max_workers != 1:
+        # The stdlib initializer runs before any task is unpickled, so it can fix the path first
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=site.addsitedir, initargs=(MODULE_DIR,)) as pool:
+            summaries.extend(pool.map(_run_chunk, jobs))
+    else:
+        summaries.extend(map(_run_chunk, jobs))
+
+    counts = np.sum([s[0] for s in summaries], axis=0)
+    underflow, overflow, n_invalid, above = (sum(s[i] for s in summaries) for i in (1, 2, 3, 7))
+    n_valid, mean, m2 = _pool_moments(summaries)
+    std = np.sqrt(m2 / n_valid) if n_valid else np.nan
+    mean = mean if n_valid else np.nan
+
+    return MonteCarloResult(
+        n_draws=n_draws,
+        n_invalid=n_invalid,
+        mean=mean,
+        std=std,
+        percentiles=_histogram_percentiles(counts, underflow, overflow, bin_edges, PERCENTILES) if n_valid else {},
+        bin_edges=bin_edges,
+        counts=counts,
+        prob_above_price=above / n_valid if market_price is not None and n_valid else None,
+    )
@@ -0,0 +1,188 @@
+"""Reverse DCF: solve for the growth or discount rate implied by a market price.
+
+The solver is a bracketed Newton iteration that runs on whole arrays at once,
+so thousands of tickers are solved in the same handful of vectorized passes.
+Whenever a Newton step would leave the current bracket (or the derivative is
+unusable) that element falls back to bisection, which guarantees progress.
+
+Usage:
+    python reverse_dcf.py assumptions.parquet implied.parquet --years 10
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from batch_dcf import INPUT_COLUMNS, read_assumptions, row_horizons
+from dcf_engine import dcf_valuation
+
+SOLVABLE = ("growth_rate", "discount_rate")
+DEFAULT_GROWTH_BOUNDS = (-50.0, 100.0)
+DEFAULT_MAX_DISCOUNT_RATE = 100.0
+# Closest the discount rate may get to terminal growth, in percentage points
+SINGULARITY_GAP = 1e-6
+
+
+class ImpliedResult(NamedTuple):
+    value: np.ndarray
+    converged: np.ndarray
+    iterations: np.ndarray
+    residual: np.ndarray
+    status: np.ndarray
+
+
+def _value_per_share(target: str, x, params: dict, years: int) -> np.ndarray:
+    inputs = {**params, target: x}
+    return dcf_valuation(
+        inputs["revenue_start"],
+        inputs["growth_rate"],
+        inputs["ebit_margin"],
+        inputs["tax_rate"],
+        inputs["discount_rate"],
+        inputs["terminal_growth"],
+        years,
+        inputs["shares_out"],
+    ).intrinsic_value_per_share
+
+
+def _default_bounds(target: str, params: dict):
+    if target == "growth_rate":
+        return DEFAULT_GROWTH_BOUNDS
+    # Value per share explodes as WACC -> terminal growth, so the lower bound
+    # sits just above the singularity and the bracket keeps iterates there.
+    return np.asarray(params["terminal_growth"], dtype=float) + SINGULARITY_GAP, DEFAULT_MAX_DISCOUNT_RATE
+
+
+def solve_implied(
+    target: str,
+    market_price,
+    params: dict,
+    years: int,
+    bounds=None,
+    price_tol: float = 1e-8,
+    x_tol: float = 1e-10,
+    max_iter: int = 100,
+) -> ImpliedResult:
+    """Solve for the `target` assumption (in %) that reproduces `market_price`
+
+    `params` holds the other dcf_valuation inputs as scalars or arrays that
+    broadcast against `market_price`. Elements whose bracket does not contain
+    a sign change are reported with status "no_bracket" and a NaN value. An
+    element only counts as converged once its price residual is within
+    `price_tol`; one whose bracket narrows below `x_tol` without getting
+    there (a pole or jump in the valuation) stops with status "stalled".
+    """
+    if target not in SOLVABLE:
+        raise ValueError(f"target must be one of {SOLVABLE}, got {target!r}")
+
+    price = np.asarray(market_price, dtype=float)
+    low, high = bounds if bounds is not None else _default_bounds(target, params)
+    shape = np.broadcast_shapes(price.shape, *(np.shape(v) for v in params.values()), np.shape(low), np.shape(high))
+
+    def residual(x):
+        return _value_per_share(target, x, params, years) - price
+
+    x_lo = np.broadcast_to(np.asarray(low, dtype=float), shape).copy()
+    x_hi = np.broadcast_to(np.asarray(high, dtype=float), shape).copy()
+    f_lo = np.broadcast_to(residual(x_lo), shape).copy()
+    f_hi = np.broadcast_to(residual(x_hi), shape).copy()
+
+    bracketed = np.isfinite(f_lo) & np.isfinite(f_hi) & (np.sign(f_lo) != np.sign(f_hi))
+    x = np.where(bracketed, (x_lo + x_hi) / 2, np.nan)
+    f = np.broadcast_to(residual(x), shape).copy()
+    priced = np.abs(f) <= price_tol * np.maximum(1.0, np.abs(price))
+    converged = bracketed & priced
+    stalled = np.zeros(shape, dtype=bool)
+    iterations = np.zeros(shape, dtype=int)
+
+    for _ in range(max_iter):
+        active = bracketed & ~converged & ~stalled
+        if not active.any():
+            break
+        iterations[active] += 1
+
+        # Shrink the bracket around the current iterate
+        same_side = np.sign(f) == np.sign(f_lo)
+        x_lo = np.where(active & same_side, x, x_lo)
+        f_lo = np.where(active & same_side, f, f_lo)
+        x_hi = np.where(active & ~same_side, x, x_hi)
+        f_hi = np.where(active & ~same_side, f, f_hi)
+
+        # Newton step with a forward-difference slope, bisection as fallback
+        h = 1e-6 * np.maximum(1.0, np.abs(x))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = (residual(x + h) - f) / h
+            newton = x - f / slope
+        inside = np.isfinite(newton) & (newton > np.minimum(x_lo, x_hi)) & (newton < np.maximum(x_lo, x_hi))
+        x_next = np.where(inside, newton, (x_lo + x_hi) / 2)
+
+        x = np.where(active, x_next, x)
+        f = np.where(active, residual(x), f)
+        priced = np.abs(f) <= price_tol * np.maximum(1.0, np.abs(price))
+        converged |= active & priced
+        stalled |= active & ~priced & (np.abs(x_hi - x_lo) <= x_tol)
+
+    status = np.where(
+        ~bracketed, "no_bracket", np.where(converged, "converged", np.where(stalled, "stalled", "max_iter"))
+    )
+    return ImpliedResult(
+        value=np.where(bracketed, x, np.nan),
+        converged=converged,
+        iterations=iterations,
+        residual=np.where(bracketed, f, np.nan),
+        status=status,
+    )
+
+
+def implied_frame(df: pd.DataFrame, years: int) -> pd.DataFrame:
+    """Implied growth and implied discount rate for every row with a market_price
+
+    Rows are solved on the same horizon `batch_dcf` values them on: the
+    per-row `years` column where given, else `years`.
+    """
+    horizons = row_horizons(df, years).to_numpy()
+    params = {col: df[col].to_numpy(dtype=float) for col in INPUT_COLUMNS}
+    price = df["market_price"].to_numpy(dtype=float)
+    out = df.copy()
+    for target, label in (("growth_rate", "implied_growth"), ("discount_rate", "implied_discount_rate")):
+        value, residual = np.full(len(df), np.nan), np.full(len(df), np.nan)
+        iterations = np.zeros(len(df), dtype=int)
+        status = np.full(len(df), "no_bracket", dtype=object)
+        for horizon in np.unique(horizons):
+            rows = horizons == horizon
+            result = solve_implied(
+                target, price[rows], {col: values[rows] for col, values in params.items()}, int(horizon)
+            )
+            value[rows], residual[rows] = result.value, result.residual
+            iterations[rows], status[rows] = result.iterations, result.status
+        out[label] = value
+        out[f"{label}_status"] = status
+        out[f"{label}_iterations"] = iterations
+        out[f"{label}_residual"] = residual
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market-implied growth and discount rate for many tickers")
+    parser.add_argument("input", type=Path, help="CSV or Parquet assumptions file with a market_price column")
+    parser.add_argument("output", type=Path, help="Parquet file to write implied rates to")
+    parser.add_argument("--years", type=int, default=10, help="Projection years when the input has no 'years' column")
+    args = parser.parse_args()
+
+    df = read_assumptions(args.input)
+    if "market_price" not in df.columns:
+        raise SystemExit("Input needs a market_price column")
+
+    start = time.perf_counter()
+    out = implied_frame(df, args.years)
+    out.to_parquet(args.output, index=False)
+    solved = (out["implied_growth_status"] == "converged").sum()
+    print(f"Solved {solved:,}/{len(out):,} rows in {time.perf_counter() - start:.2f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Data and analytics helpers shared by the FinStatAnalysis Streamlit apps."""
@@ -0,0 +1,456 @@
+"""Benchmark suite for the fetch, compute and render hot paths.
+
+Every case runs on deterministic synthetic data (`providers.synthetic_ohlcv`
+and `synthetic_statement`), so results only change when the code does. A
+case is set up once per size outside the timed region, run `--repeat`
+times for the median and best wall time, then run once more under
+`tracemalloc` for its peak Python/NumPy allocation.
+
+Stages:
+    fetch    synthetic download, Parquet store round trip, session resampling
+    compute  RSI, MACD, the full indicator set, batch DCF valuation,
+             the DCF sensitivity grid and fundamental ratios
+    render   Plotly figure construction and JSON serialization
+             (stock-candlestick-viewer) and mplfinance PNG export
+             (ohlc-fundamentals-plot)
+
+Sizes are bars for price cases, scenarios or grid points for DCF cases and
+ticker-periods for ratios. Each case has a size cap where the app itself
+never goes further (mplfinance above 10k candles, for example); larger
+sizes are skipped for it.
+
+Results are written as JSON. Comparing against a saved baseline flags a
+case as a regression when its median time or peak memory grew by more than
+the threshold and by more than a small absolute floor, so timer noise on
+sub-millisecond cases does not trip it. `run` and `compare` exit with
+status 1 when anything regressed.
+
+Usage:
+    python -m finstat_common.bench run --out baseline.json
+    python -m finstat_common.bench run --stages compute --sizes 1000 100000 --baseline baseline.json
+    python -m finstat_common.bench compare results.json baseline.json --threshold 0.2
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from finstat_common import indicators
+from finstat_common.ohlcv_store import OHLCVStore
+from finstat_common.providers import synthetic_ohlcv, synthetic_statement
+from finstat_common.ratios import compute_ratios, stack_statements
+from finstat_common.resample import resample_ohlcv
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+STAGES = ("fetch", "compute", "render")
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000, 5_000_000)
+DEFAULT_REPEAT = 5
+# Stop repeating a case once it has used this much wall time (it always runs once)
+CASE_BUDGET_SECONDS = 10.0
+
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MEMORY_THRESHOLD = 0.25
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1024 * 1024
+
+BENCH_END = pd.Timestamp("2025-12-31 15:30")
+CHART_WIDTH = 1400
+STATEMENT_POOL = 50
+DCF_YEARS = 10
+
+
+class Case(NamedTuple):
+    """A benchmark: `prepare(size)` does the untimed setup and returns the call to time"""
+
+    name: str
+    stage: str
+    prepare: Callable[[int], Callable[[], object]]
+    unit: str = "bars"
+    max_size: Optional[int] = None
+
+
+class Measurement(NamedTuple):
+    name: str
+    stage: str
+    size: int
+    unit: str
+    seconds: float
+    best: float
+    runs: int
+    peak_bytes: int
+
+
+class Regression(NamedTuple):
+    key: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+
+def _app_module(app_dir: str, module: str):
+    """Import a module from one of the app directories, which are not packages"""
+    path = str(REPO_ROOT / app_dir)
+    if path not in sys.path:
+        sys.path.append(path)
+    return importlib.import_module(module)
+
+
+@lru_cache(maxsize=1)
+def _bars(size: int) -> pd.DataFrame:
+    # One-minute bars reach 5M bars without running into the daily anchor date
+    return synthetic_ohlcv("BENCH", "1m", bars=size, end=BENCH_END)
+
+
+# -- fetch -------------------------------------------------------------------
+
+
+def _prepare_download(size: int):
+    return lambda: synthetic_ohlcv("BENCH", "1m", bars=size, end=BENCH_END)
+
+
+def _prepare_store_roundtrip(size: int):
+    bars = _bars(size)
+    # The directory is removed once the closure holding it is dropped
+    directory = tempfile.TemporaryDirectory(prefix="finstat-bench-")
+    store = OHLCVStore(root=Path(directory.name))
+
+    def run():
+        store.save("BENCH", "1m", True, bars, {"directory": directory.name})
+        return store.load("BENCH", "1m", True)
+
+    return run
+
+
+def _prepare_resample(size: int):
+    bars = _bars(size)
+    return lambda: resample_ohlcv(bars, "15m")
+
+
+# -- compute -----------------------------------------------------------------
+
+
+def _prepare_rsi(size: int):
+    close = _bars(size)["Close"].to_numpy()
+    return lambda: indicators.rsi(close)
+
+
+def _prepare_macd(size: int):
+    close = _bars(size)["Close"].to_numpy()
+    return lambda: indicators.macd(close)
+
+
+def _prepare_indicator_set(size: int):
+    bars = _bars(size)
+    return lambda: indicators.compute(bars, list(indicators.DEFAULTS))
+
+
+def _dcf_inputs(size: int) -> list:
+    rng = np.random.default_rng(size)
+    return [
+        rng.uniform(100, 10_000, size),
+        rng.uniform(0, 30, size),
+        rng.uniform(5, 40, size),
+        rng.uniform(15, 35, size),
+        rng.uniform(9, 16, size),
+        rng.uniform(2, 6, size),
+    ]
+
+
+def _prepare_dcf_batch(size: int):
+    dcf_engine = _app_module("dcf_tool", "dcf_engine")
+    inputs = _dcf_inputs(size)
+    return lambda: dcf_engine.dcf_valuation(*inputs, DCF_YEARS, 1e8)
+
+
+def _prepare_dcf_grid(size: int):
+    dcf_engine = _app_module("dcf_tool", "dcf_engine")
+    side = max(2, round(size ** (1 / 3)))
+    base = {"revenue_start": 1000.0, "ebit_margin": 20.0, "tax_rate": 25.0, "shares_out": 1e8}
+    discount_rates = np.linspace(8, 16, side)
+    growth_rates = np.linspace(0, 30, side)
+    terminal_growths = np.linspace(1, 6, side)
+    return lambda: dcf_engine.sensitivity_grid(base, discount_rates, growth_rates, terminal_growths, DCF_YEARS)
+
+
+@lru_cache(maxsize=1)
+def _statement_pool() -> tuple:
+    fields = ("balance_sheet", "income_stmt", "cashflow")
+    return tuple(
+        tuple(synthetic_statement(f"BENCH{i}", field, end=BENCH_END) for field in fields)
+        for i in range(STATEMENT_POOL)
+    )
+
+
+def _prepare_ratios(size: int):
+    # Annual statements carry four periods, so `size` ticker-periods is size / 4 tickers
+    pool = _statement_pool()
+    statements = {f"T{i:06d}": pool[i % len(pool)] for i in range(max(1, size // 4))}
+    return lambda: compute_ratios(stack_statements(statements))
+
+
+# -- render ------------------------------------------------------------------
+
+
+def _chart_frame(size: int) -> pd.DataFrame:
+    bars = _bars(size)
+    values = indicators.compute(bars, ["sma_20", "rsi_14", "macd_12_26_9"])
+    return bars.assign(**values)
+
+
+def _prepare_plotly_figure(size: int, webgl: Optional[bool] = None):
+    panels = _app_module("stock-candlestick-viewer", "panels")
+    downsample = _app_module("stock-candlestick-viewer", "downsample")
+    frame = _chart_frame(size)
+    max_points = downsample.target_points(CHART_WIDTH)
+    webgl = panels.use_webgl(len(frame)) if webgl is None else webgl
+
+    def run():
+        price, _, _ = panels.price_panel(frame, max_points, {"sma_20": "SMA 20"}, webgl)
+        rsi = panels.rsi_panel(frame["rsi_14"], max_points, webgl=webgl)
+        macd = panels.macd_panel(
+            frame["macd_12_26_9"], frame["macd_12_26_9_signal"], frame["macd_12_26_9_hist"], max_points, webgl
+        )
+        return panels.compose_figure([price, rsi, macd], "<b>BENCH Technical Analysis</b>")
+
+    return run
+
+
+def _prepare_plotly_json(size: int):
+    fig = _prepare_plotly_figure(size)()
+    return fig.to_json
+
+
+def _prepare_plotly_full(size: int):
+    # "Full resolution" sends every bar, drawn with WebGL
+    panels = _app_module("stock-candlestick-viewer", "panels")
+    frame = _chart_frame(size)
+    webgl = panels.use_webgl(len(frame))
+
+    def run():
+        price, _, _ = panels.price_panel(frame, len(frame), {"sma_20": "SMA 20"}, webgl)
+        return panels.compose_figure([price], "<b>BENCH</b>").to_json()
+
+    return run
+
+
+def _prepare_mplfinance(size: int, dpi_name: str = "SCREEN_DPI"):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    render_cache = _app_module("ohlc-fundamentals-plot", "render_cache")
+    bars = _bars(size)[["Open", "High", "Low", "Close", "Volume"]].tz_localize(None)
+    dpi = getattr(render_cache, dpi_name)
+    return lambda: render_cache.render_png(
+        bars, dpi, type="candle", style="yahoo", volume=True, figsize=(14, 8), warn_too_much_data=size + 1
+    )
+
+
+CASES = [
+    Case("synthetic_download", "fetch", _prepare_download),
+    Case("store_roundtrip", "fetch", _prepare_store_roundtrip),
+    Case("resample_15m", "fetch", _prepare_resample),
+    Case("rsi", "compute", _prepare_rsi),
+    Case("macd", "compute", _prepare_macd),
+    Case("indicator_set", "compute", _prepare_indicator_set),
+    Case("dcf_batch", "compute", _prepare_dcf_batch, unit="scenarios", max_size=1_000_000),
+    Case("dcf_sensitivity_grid", "compute", _prepare_dcf_grid, unit="grid points", max_size=1_000_000),
+    Case("ratios", "compute", _prepare_ratios, unit="ticker-periods", max_size=100_000),
+    Case("plotly_figure", "render", _prepare_plotly_figure),
+    Case("plotly_json", "render", _prepare_plotly_json),
+    Case("plotly_full_resolution", "render", _prepare_plotly_full, max_size=100_000),
+    Case("mplfinance_png", "render", _prepare_mplfinance, max_size=10_000),
+    Case("mplfinance_png_export", "render", lambda size: _prepare_mplfinance(size, "EXPORT_DPI"), max_size=10_000),
+]
+
+
+def measure(case: Case, size: int, repeat: int = DEFAULT_REPEAT) -> Measurement:
+    """Median/best wall time over up to `repeat` runs, then peak memory from one traced run"""
+    run = case.prepare(size)
+    timings = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+        if sum(timings) > CASE_BUDGET_SECONDS:
+            break
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Measurement(case.name, case.stage, size, case.unit, statistics.median(timings), min(timings), len(timings), peak)
+
+
+def result_key(name: str, size: int) -> str:
+    return f"{name}/{size}"
+
+
+def environment() -> dict:
+    import matplotlib
+    import plotly
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plotly": plotly.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def run_suite(
+    stages: Iterable[str] = STAGES,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    cases: Optional[Iterable[str]] = None,
+    repeat: int = DEFAULT_REPEAT,
+    progress: Optional[Callable[[Measurement], None]] = None,
+) -> dict:
+    """Run every selected case at every size up to its cap; returns the JSON-ready results"""
+    stages, wanted = set(stages), set(cases or ())
+    results: Dict[str, dict] = {}
+    for size in sorted(sizes):
+        for case in CASES:
+            if case.stage not in stages or (wanted and case.name not in wanted):
+                continue
+            if case.max_size is not None and size > case.max_size:
+                continue
+            measurement = measure(case, size, repeat)
+            results[result_key(case.name, size)] = measurement._asdict()
+            if progress is not None:
+                progress(measurement)
+        _bars.cache_clear()
+    return {
+        "created": pd.Timestamp.now(tz="UTC").isoformat(timespec="seconds"),
+        "environment": environment(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    threshold: float = DEFAULT_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> List[Regression]:
+    """Cases present in both runs whose median time or peak memory grew past the thresholds"""
+    regressions = []
+    checks = (
+        ("seconds", threshold, MIN_TIME_DELTA),
+        ("peak_bytes", memory_threshold, MIN_MEMORY_DELTA),
+    )
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        for metric, limit, floor in checks:
+            before, after = base[metric], result[metric]
+            if after - before > floor and after > before * (1 + limit):
+                regressions.append(Regression(key, metric, before, after, after / before - 1 if before else np.inf))
+    return regressions
+
+
+def _format_bytes(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def _format_value(metric: str, value: float) -> str:
+    return _format_bytes(value) if metric == "peak_bytes" else f"{value * 1000:,.1f} ms"
+
+
+def print_measurement(m: Measurement):
+    print(
+        f"{m.stage:<8} {m.name:<24} {m.size:>10,} {m.unit:<15} "
+        f"{m.seconds * 1000:>11,.1f} ms  best {m.best * 1000:>11,.1f} ms  x{m.runs:<2} "
+        f"peak {_format_bytes(m.peak_bytes):>10}"
+    )
+
+
+def report(current: dict, baseline: dict, regressions: List[Regression]) -> int:
+    """Print the comparison; returns the process exit status"""
+    env, base_env = current.get("environment", {}), baseline.get("environment", {})
+    differing = [name for name in ("python", "machine", "processor", "numpy", "pandas") if env.get(name) != base_env.get(name)]
+    if differing:
+        print(f"Note: baseline was recorded with a different {', '.join(differing)}; timings may not be comparable")
+
+    shared = [key for key in current["results"] if key in baseline["results"]]
+    print(f"Compared {len(shared)} cases against the baseline from {baseline.get('created', 'unknown')}")
+    if not regressions:
+        print("No regressions")
+        return 0
+    print(f"{len(regressions)} regression(s):")
+    for r in regressions:
+        print(
+            f"  REGRESSION {r.key:<36} {r.metric:<10} "
+            f"{_format_value(r.metric, r.baseline)} -> {_format_value(r.metric, r.current)} (+{r.change:.0%})"
+        )
+    return 1
+
+
+def _load(path: Path) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch, compute and render benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and write JSON results")
+    run.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    run.add_argument("--cases", nargs="+", choices=[case.name for case in CASES], help="Only these cases")
+    run.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    run.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run.add_argument("--out", type=Path, default=None, help="Results file (JSON)")
+    run.add_argument("--baseline", type=Path, default=None, help="Baseline results to compare against")
+
+    check = commands.add_parser("compare", help="Compare two results files")
+    check.add_argument("results", type=Path)
+    check.add_argument("baseline", type=Path)
+
+    for command in (run, check):
+        command.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown (0.25 = 25%%)")
+        command.add_argument(
+            "--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD, help="Allowed peak memory growth"
+        )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        current = run_suite(args.stages, args.sizes, args.cases, args.repeat, progress=print_measurement)
+        if args.out is not None:
+            args.out.parent.mkdir(parents=True, exist_ok=True)
+            args.out.write_text(json.dumps(current, indent=2))
+            print(f"Wrote {len(current['results'])} results -> {args.out}")
+        if args.baseline is None:
+            return
+        baseline = _load(args.baseline)
+    else:
+        current, baseline = _load(args.results), _load(args.baseline)
+
+    regressions = compare(current, baseline, args.threshold, args.memory_threshold)
+    sys.exit(report(current, baseline, regressions))
+
+
+if __name__ == "__main__":
+    main()
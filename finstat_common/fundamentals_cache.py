@@ -0,0 +1,271 @@
+"""Disk-backed fundamentals cache with per-field TTLs.
+
+Each ticker gets a directory under root/fundamentals/ holding one file per
+field: financial statements as Parquet and `stock.info` as JSON. Every
+field carries its own expiry: info is trusted for a day, and statements are
+trusted until the next filing is expected (latest period end plus the
+reporting cadence and filing lag). An empty result, which is also what a
+throttled request returns, is rechecked after a few minutes and never
+replaces stored data.
+
+Expired entries are served immediately while a background thread fetches
+a replacement (stale-while-revalidate). Files are replaced atomically, so
+any number of Streamlit worker processes can read while another writes, and
+a lock file next to each field stops two processes from refreshing it at
+the same time.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from finstat_common.instrument import span
+from finstat_common.ohlcv_store import METADATA_KEY, default_root, write_atomic
+from finstat_common.providers import get_provider
+
+STATEMENT_FIELDS = (
+    "balance_sheet",
+    "quarterly_balance_sheet",
+    "income_stmt",
+    "quarterly_income_stmt",
+    "cashflow",
+    "quarterly_cashflow",
+)
+FIELDS = ("info",) + STATEMENT_FIELDS
+
+INFO_TTL = 24 * 60 * 60
+
+# Reporting cadence plus the SEBI filing deadline after the period end
+# (45 days for quarterly results, 60 days for annual results)
+FILING_LAG = {
+    "annual": pd.DateOffset(years=1, days=60),
+    "quarterly": pd.DateOffset(months=3, days=45),
+}
+
+# Recheck interval once an expected filing is overdue
+RETRY_TTL = 24 * 60 * 60
+
+# Recheck interval after an empty result, which is also what a throttled
+# Yahoo request looks like
+EMPTY_TTL = 5 * 60
+
+# Background refreshes that fail are not retried in this process for a while
+FAILURE_BACKOFF = 5 * 60
+
+# A refresh lock older than this is assumed abandoned by a crashed process
+LOCK_TIMEOUT = 2 * 60
+
+
+def _provider_fundamentals(ticker: str, field: str):
+    with span("fetch_fundamentals"):
+        return get_provider().fundamentals(ticker, field)
+
+
+def _json_default(value):
+    # yfinance's info dict mixes in NumPy scalars and timestamps
+    return value.item() if isinstance(value, np.generic) else str(value)
+
+
+def is_empty(value) -> bool:
+    """True for a missing, empty statement frame or an empty info dict"""
+    if value is None:
+        return True
+    return value.empty if isinstance(value, pd.DataFrame) else not value
+
+
+def statement_freq(field: str) -> str:
+    """'quarterly' for the quarterly_* statements, 'annual' otherwise"""
+    return "quarterly" if field.startswith("quarterly_") else "annual"
+
+
+def statement_expiry(field: str, statement: pd.DataFrame, now: float) -> float:
+    """Epoch time at which the next filing for a statement is expected"""
+    if is_empty(statement):
+        return now + EMPTY_TTL
+    periods = pd.to_datetime(pd.Index(statement.columns), errors="coerce").dropna()
+    if periods.empty:
+        return now + RETRY_TTL
+    expected = (periods.max() + FILING_LAG[statement_freq(field)]).tz_localize(None)
+    return max(expected.timestamp(), now + RETRY_TTL)
+
+
+class FundamentalsCache:
+    """Per-field cache of company fundamentals shared through the filesystem
+
+    `fetch(ticker, field)` returns the value of one field (a statement frame
+    or the info dict). It defaults to the configured market-data provider.
+    """
+
+    def __init__(self, root: Optional[Path] = None, fetch: Optional[Callable] = None):
+        self.root = Path(root) if root is not None else default_root()
+        self.fetch = fetch or _provider_fundamentals
+        self._lock = threading.Lock()
+        self._inflight = set()
+        self._failed_until = {}
+
+    def path(self, ticker: str, field: str) -> Path:
+        suffix = ".json" if field == "info" else ".parquet"
+        return self.root / "fundamentals" / ticker.upper() / f"{field}{suffix}"
+
+    def read(self, ticker: str, field: str):
+        """Stored value and metadata, or (None, {}) when nothing is stored"""
+        path = self.path(ticker, field)
+        if not path.exists():
+            return None, {}
+        if field == "info":
+            payload = json.loads(path.read_text())
+            return payload["data"], payload["meta"]
+
+        table = pq.read_table(path)
+        meta = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b"{}"))
+        df = table.to_pandas()
+        # Statement columns are period-end dates, stored as ISO strings
+        periods = pd.to_datetime(df.columns, errors="coerce")
+        if len(periods) and periods.notna().all():
+            df.columns = periods
+        return df, meta
+
+    def write(self, ticker: str, field: str, value, meta: dict):
+        path = self.path(ticker, field)
+        if field == "info":
+            payload = json.dumps({"data": value, "meta": meta}, default=_json_default)
+            write_atomic(path, lambda tmp: Path(tmp).write_text(payload))
+            return
+
+        df = value.copy()
+        df.columns = [c.isoformat() if isinstance(c, pd.Timestamp) else str(c) for c in df.columns]
+        df = df.apply(pd.to_numeric, errors="coerce")
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(meta)})
+        write_atomic(path, lambda tmp: pq.write_table(table, tmp))
+
+    def expiry(self, field: str, value, now: float) -> float:
+        if field == "info":
+            return now + (INFO_TTL if value else EMPTY_TTL)
+        return statement_expiry(field, value, now)
+
+    def _backing_off(self, ticker: str, field: str) -> bool:
+        with self._lock:
+            return time.time() < self._failed_until.get((ticker.upper(), field), 0)
+
+    def _back_off(self, ticker: str, field: str, seconds: float):
+        with self._lock:
+            self._failed_until[(ticker.upper(), field)] = time.time() + seconds
+
+    def refresh(self, ticker: str, field: str):
+        """Fetch one field now, store it and return it
+
+        An empty result never replaces a non-empty stored copy: that copy is
+        returned as is and the field is not fetched again in this process
+        for EMPTY_TTL. With nothing better stored, the empty result is
+        stored to expire after EMPTY_TTL.
+        """
+        value = self.fetch(ticker, field)
+        if field == "info":
+            value = dict(value or {})
+        elif value is None:
+            value = pd.DataFrame()
+        if is_empty(value):
+            stored, _ = self.read(ticker, field)
+            if not is_empty(stored):
+                self._back_off(ticker, field, EMPTY_TTL)
+                return stored
+        now = time.time()
+        self.write(ticker, field, value, {"fetched_at": now, "expires_at": self.expiry(field, value, now)})
+        return value
+
+    def get(self, ticker: str, field: str, background: bool = True):
+        """Stored value, fetched synchronously only when nothing is stored yet
+
+        An expired value is still returned right away; a background refresh
+        replaces it for later reads. With `background=False` (bulk jobs that
+        bound their own concurrency) an expired value is refreshed inline
+        instead, falling back to the stale copy if the fetch fails.
+        """
+        value, meta = self.read(ticker, field)
+        if value is None:
+            return self.refresh(ticker, field)
+        if time.time() >= meta.get("expires_at", 0) and not self._backing_off(ticker, field):
+            if not background:
+                try:
+                    return self.refresh(ticker, field)
+                except Exception:
+                    return value
+            self.revalidate(ticker, field)
+        return value
+
+    def load(self, ticker: str):
+        """(balance_sheet, quarterly_balance_sheet, info), as the app expects"""
+        return (
+            self.get(ticker, "balance_sheet"),
+            self.get(ticker, "quarterly_balance_sheet"),
+            self.get(ticker, "info"),
+        )
+
+    def _lock_path(self, ticker: str, field: str) -> Path:
+        return self.path(ticker, field).with_suffix(".lock")
+
+    def _acquire(self, lock_path: Path) -> bool:
+        """Create the cross-process refresh lock, breaking it if abandoned"""
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - lock_path.stat().st_mtime < LOCK_TIMEOUT:
+                        return False
+                    lock_path.unlink()
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def revalidate(self, ticker: str, field: str) -> bool:
+        """Start a background refresh unless one is already running anywhere"""
+        key = (ticker.upper(), field)
+        if self._backing_off(ticker, field):
+            return False
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+
+        lock_path = self._lock_path(ticker, field)
+        if not self._acquire(lock_path):
+            with self._lock:
+                self._inflight.discard(key)
+            return False
+
+        def run():
+            try:
+                self.refresh(ticker, field)
+            except Exception:
+                # Keep serving the stale copy; try again after the backoff
+                self._back_off(ticker, field, FAILURE_BACKOFF)
+            finally:
+                lock_path.unlink(missing_ok=True)
+                with self._lock:
+                    self._inflight.discard(key)
+
+        threading.Thread(target=run, name=f"revalidate-{ticker}-{field}", daemon=True).start()
+        return True
+
+
+_default_cache: Optional[FundamentalsCache] = None
+
+
+def get_fundamentals_cache() -> FundamentalsCache:
+    """Process-wide fundamentals cache rooted at FINSTAT_DATA_DIR"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FundamentalsCache()
+    return _default_cache
@@ -0,0 +1,183 @@
+"""Shared gateway for upstream data requests (Yahoo Finance by default).
+
+Every provider call goes through `RequestGateway.call(key, fn, ...)`:
+
+- Single flight: while a call for `key` is running, identical calls wait for
+  it and all receive its result (or its exception) instead of sending their
+  own request. A result is also reused for `result_ttl` seconds, which
+  covers sessions that miss by a hair; errors and empty results are not.
+- Token bucket: requests leave at `rate` per second with bursts of up to
+  `burst`. A rate-limit error pauses the whole bucket with exponential
+  backoff, so every caller slows down, and the call is retried.
+- Counters: `stats()` reports calls, memo hits, coalesced waiters, upstream
+  fetches, throttled waits, retries and failures.
+
+The gateway knows nothing about yfinance beyond recognising its rate-limit
+errors. Any callable can stand in for the provider.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+# Sustained requests per second and burst size for the shared Yahoo budget
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 5
+DEFAULT_RESULT_TTL = 5.0
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 2.0
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """True for yfinance's YFRateLimitError and HTTP 429 responses"""
+    message = str(error).lower()
+    return type(error).__name__ == "YFRateLimitError" or "too many requests" in message or "rate limit" in message
+
+
+def _is_empty(value) -> bool:
+    return value is None or bool(getattr(value, "empty", False))
+
+
+def _share(value):
+    # Waiters get their own copy, so one session mutating a frame cannot affect another
+    return value.copy() if hasattr(value, "copy") else value
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hold every caller back for `seconds` and restart from an empty bucket"""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestGateway:
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        result_ttl: float = DEFAULT_RESULT_TTL,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.result_ttl = result_ttl
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._recent = {}
+        self._counters = dict.fromkeys(
+            ("calls", "hits", "coalesced", "fetches", "throttled", "retries", "failures"), 0
+        )
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+    def call(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """`fn(*args, **kwargs)`, shared with every identical call in flight or just finished"""
+        with self._lock:
+            self._counters["calls"] += 1
+            now = time.monotonic()
+            recent = self._recent.get(key)
+            if recent is not None and recent[0] > now:
+                self._counters["hits"] += 1
+                return _share(recent[1])
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _share(flight.result)
+
+        try:
+            flight.result = self._fetch(fn, args, kwargs)
+            return _share(flight.result)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if flight.error is None and self.result_ttl > 0 and not _is_empty(flight.result):
+                    now = time.monotonic()
+                    self._recent = {k: v for k, v in self._recent.items() if v[0] > now}
+                    self._recent[key] = (now + self.result_ttl, flight.result)
+            flight.done.set()
+
+    def _fetch(self, fn: Callable, args: tuple, kwargs: dict):
+        for attempt in range(self.max_retries + 1):
+            if self.bucket.acquire() > 0:
+                self._count("throttled")
+            self._count("fetches")
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_rate_limited(e):
+                    self._count("failures")
+                    raise
+                # Jittered exponential backoff, applied to every caller through the bucket
+                self.bucket.pause(self.backoff * 2 ** attempt * (1 + random.random()))
+                self._count("retries")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "inflight": len(self._inflight)}
+
+
+_default_gateway: Optional[RequestGateway] = None
+_default_lock = threading.Lock()
+
+
+def get_gateway() -> RequestGateway:
+    """Process-wide gateway shared by every session and data store"""
+    global _default_gateway
+    with _default_lock:
+        if _default_gateway is None:
+            _default_gateway = RequestGateway()
+        return _default_gateway
@@ -0,0 +1,230 @@
+"""Incremental RSI and MACD state.
+
+Each indicator keeps only the running exponential averages it needs, so a
+new bar costs O(1) instead of re-running `ewm` over the whole history. The
+recursions match pandas `ewm(adjust=False)`:
+
+    y_0 = x_0,    y_t = (1 - alpha) * y_{t-1} + alpha * x_t
+
+State round-trips through plain dicts (`to_dict` / `from_dict`) so it can
+be persisted next to the cached price data; `advance` is the step the
+OHLCV store runs on every read.
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS = ["RSI", "MACD", "Signal", "Hist"]
+
+# `indicators.compute` specs tracked by IndicatorState (default parameters), with their output keys
+INCREMENTAL_SPECS = {
+    "rsi_14": {"rsi_14": "RSI"},
+    "macd_12_26_9": {"macd_12_26_9": "MACD", "macd_12_26_9_signal": "Signal", "macd_12_26_9_hist": "Hist"},
+}
+
+
+@dataclass
+class EMAState:
+    alpha: float
+    value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        self.value = self.peek(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """The value `update(x)` would return, without changing the state"""
+        return x if self.value is None else (1 - self.alpha) * self.value + self.alpha * x
+
+
+def span_alpha(span: int) -> float:
+    return 2 / (span + 1)
+
+
+@dataclass
+class IncrementalRSI:
+    period: int = 14
+    gain: EMAState = None
+    loss: EMAState = None
+    prev_close: Optional[float] = None
+
+    def __post_init__(self):
+        self.gain = self.gain or EMAState(1 / self.period)
+        self.loss = self.loss or EMAState(1 / self.period)
+
+    def update(self, close: float) -> float:
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        self.gain.update(max(delta, 0.0))
+        self.loss.update(max(-delta, 0.0))
+        return self.value
+
+    def peek(self, close: float) -> float:
+        """RSI if `close` were the next bar, without advancing (for a bar still forming)"""
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        return self._rsi(self.gain.peek(max(delta, 0.0)), self.loss.peek(max(-delta, 0.0)))
+
+    @property
+    def value(self) -> float:
+        return self._rsi(self.gain.value, self.loss.value)
+
+    @staticmethod
+    def _rsi(gain: Optional[float], loss: Optional[float]) -> float:
+        if gain is None:
+            return np.nan
+        if loss == 0:
+            return np.nan if gain == 0 else 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IncrementalRSI":
+        data = dict(data)
+        data["gain"] = EMAState(**data["gain"])
+        data["loss"] = EMAState(**data["loss"])
+        return cls(**data)
+
+
+@dataclass
+class IncrementalMACD:
+    fast: int = 12
+    slow: int = 26
+    signal: int = 9
+    fast_ema: EMAState = None
+    slow_ema: EMAState = None
+    signal_ema: EMAState = None
+
+    def __post_init__(self):
+        self.fast_ema = self.fast_ema or EMAState(span_alpha(self.fast))
+        self.slow_ema = self.slow_ema or EMAState(span_alpha(self.slow))
+        self.signal_ema = self.signal_ema or EMAState(span_alpha(self.signal))
+
+    def update(self, close: float) -> tuple:
+        macd = self.fast_ema.update(close) - self.slow_ema.update(close)
+        signal_line = self.signal_ema.update(macd)
+        return macd, signal_line, macd - signal_line
+
+    def peek(self, close: float) -> tuple:
+        """(macd, signal, histogram) if `close` were the next bar, without advancing"""
+        macd = self.fast_ema.peek(close) - self.slow_ema.peek(close)
+        signal_line = self.signal_ema.peek(macd)
+        return macd, signal_line, macd - signal_line
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IncrementalMACD":
+        data = dict(data)
+        for key in ("fast_ema", "slow_ema", "signal_ema"):
+            data[key] = EMAState(**data[key])
+        return cls(**data)
+
+
+@dataclass
+class IndicatorState:
+    """RSI and MACD state for one price series, with the last bar it has seen"""
+
+    rsi: IncrementalRSI = field(default_factory=IncrementalRSI)
+    macd: IncrementalMACD = field(default_factory=IncrementalMACD)
+    last_timestamp: Optional[str] = None
+
+    def append(self, close: pd.Series) -> pd.DataFrame:
+        """Feed bars newer than `last_timestamp` and return their indicator values"""
+        if self.last_timestamp is not None:
+            close = close[close.index > pd.Timestamp(self.last_timestamp)]
+        values = np.empty((len(close), 4))
+        for i, price in enumerate(close.to_numpy(dtype=float)):
+            values[i, 0] = self.rsi.update(price)
+            values[i, 1:] = self.macd.update(price)
+        if len(close):
+            self.last_timestamp = close.index[-1].isoformat()
+        return pd.DataFrame(values, index=close.index, columns=INDICATOR_COLUMNS)
+
+    @classmethod
+    def warm(cls, close: pd.Series, rsi_period: int = 14, fast: int = 12, slow: int = 26, signal: int = 9):
+        """Build state from a full history with vectorized `ewm`, returning (state, indicators)"""
+        state = cls(IncrementalRSI(rsi_period), IncrementalMACD(fast, slow, signal))
+        if close.empty:
+            return state, pd.DataFrame(columns=INDICATOR_COLUMNS, dtype=float)
+
+        delta = close.diff().fillna(0.0)
+        gain = delta.clip(lower=0).ewm(alpha=1 / rsi_period, adjust=False).mean()
+        loss = (-delta).clip(lower=0).ewm(alpha=1 / rsi_period, adjust=False).mean()
+        fast_ema = close.ewm(span=fast, adjust=False).mean()
+        slow_ema = close.ewm(span=slow, adjust=False).mean()
+        macd = fast_ema - slow_ema
+        signal_line = macd.ewm(span=signal, adjust=False).mean()
+
+        state.rsi.gain.value, state.rsi.loss.value = float(gain.iloc[-1]), float(loss.iloc[-1])
+        state.rsi.prev_close = float(close.iloc[-1])
+        state.macd.fast_ema.value, state.macd.slow_ema.value = float(fast_ema.iloc[-1]), float(slow_ema.iloc[-1])
+        state.macd.signal_ema.value = float(signal_line.iloc[-1])
+        state.last_timestamp = close.index[-1].isoformat()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - 100 / (1 + gain / loss)
+        frame = pd.DataFrame({"RSI": rsi, "MACD": macd, "Signal": signal_line, "Hist": macd - signal_line})
+        return state, frame
+
+    def to_dict(self) -> dict:
+        return {"rsi": self.rsi.to_dict(), "macd": self.macd.to_dict(), "last_timestamp": self.last_timestamp}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "IndicatorState":
+        return cls(
+            rsi=IncrementalRSI.from_dict(data["rsi"]),
+            macd=IncrementalMACD.from_dict(data["macd"]),
+            last_timestamp=data.get("last_timestamp"),
+        )
+
+
+def _continues(state: Optional[IndicatorState], close: pd.Series) -> bool:
+    """Whether `state` was built from this series: its last bar is present with the same close
+
+    A close that moved means the history was re-adjusted (split or
+    dividend) and the running averages are on the old price basis.
+    """
+    if state is None:
+        return False
+    if state.last_timestamp is None:
+        return True
+    last = pd.Timestamp(state.last_timestamp)
+    if last not in close.index:
+        return False
+    return bool(np.isclose(close[last], state.rsi.prev_close, rtol=1e-12, atol=0.0))
+
+
+def advance(state: Optional[IndicatorState], close: pd.Series):
+    """Bring `state` up to date with `close`, returning (state, indicator rows)
+
+    Every bar but the last is folded into the state. The last bar is left
+    out because a delta refresh re-downloads and may revise it; its row is
+    a `peek` from the state before it, so the next call applies the revised
+    bar instead of skipping it. Rows start after the bar the state had
+    already folded in, or at the first bar when the state is missing or
+    does not belong to this series (it is then rebuilt with `warm`).
+    """
+    committed, final = close.iloc[:-1], close.iloc[-1:]
+    if _continues(state, committed):
+        frame = state.append(committed)
+    else:
+        state, frame = IndicatorState.warm(committed)
+    preview = pd.DataFrame(
+        [[state.rsi.peek(price), *state.macd.peek(price)] for price in final.to_numpy(dtype=float)],
+        index=final.index,
+        columns=INDICATOR_COLUMNS,
+        dtype=float,
+    )
+    return state, pd.concat([frame, preview]) if len(frame) else preview
+
+
+def spec_values(frame: pd.DataFrame, index: pd.Index, specs) -> dict:
+    """Columns of an indicator frame under their `indicators.compute` keys, aligned to `index`"""
+    frame = frame.reindex(index)
+    return {key: frame[column].to_numpy() for spec in specs for key, column in INCREMENTAL_SPECS[spec].items()}
@@ -0,0 +1,183 @@
+"""O(n) technical indicators on NumPy arrays.
+
+Every indicator takes 1-D (time) or 2-D (time x ticker) float arrays and
+returns arrays of the same shape. Rolling windows and exponential averages
+run in pandas' compiled kernels and cumulative indicators use NumPy
+cumulative sums, so there are no Python-level loops over bars.
+
+`compute` is the batch entry point: it evaluates a list of indicator specs
+over one OHLCV frame, pulling the price columns out once for all of them.
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _frame(values) -> pd.DataFrame:
+    values = np.asarray(values, dtype=float)
+    return pd.DataFrame(values.reshape(len(values), -1))
+
+
+def _shape_like(result: pd.DataFrame, values) -> np.ndarray:
+    return result.to_numpy().reshape(np.shape(values))
+
+
+def sma(values, period: int) -> np.ndarray:
+    """Simple moving average (NaN until `period` bars are available)"""
+    return _shape_like(_frame(values).rolling(period).mean(), values)
+
+
+def ema(values, period: Optional[int] = None, alpha: Optional[float] = None) -> np.ndarray:
+    """Exponential moving average matching pandas `ewm(adjust=False)`"""
+    kwargs = {"alpha": alpha} if alpha is not None else {"span": period}
+    return _shape_like(_frame(values).ewm(adjust=False, **kwargs).mean(), values)
+
+
+def bollinger(values, period: int = 20, num_std: float = 2.0):
+    """(middle, upper, lower) Bollinger Bands using the population std dev"""
+    frame = _frame(values)
+    middle = frame.rolling(period).mean()
+    spread = frame.rolling(period).std(ddof=0) * num_std
+    return (
+        _shape_like(middle, values),
+        _shape_like(middle + spread, values),
+        _shape_like(middle - spread, values),
+    )
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Wilder-style RSI with `ewm(alpha=1/period, adjust=False)` smoothing"""
+    close = np.asarray(close, dtype=float)
+    delta = np.diff(close, axis=0, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain_ema = ema(gain, alpha=1 / period)
+    loss_ema = ema(loss, alpha=1 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + gain_ema / loss_ema))
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9):
+    """(macd, signal, histogram)"""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = (np.asarray(v, dtype=float) for v in (high, low, close))
+    prev_close = np.concatenate([close[:1] * np.nan, close[:-1]])
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return np.nanmax(ranges, axis=0)
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Average True Range with Wilder smoothing"""
+    return ema(true_range(high, low, close), alpha=1 / period)
+
+
+def stochastic(high, low, close, period: int = 14, smooth: int = 3):
+    """(%K, %D) stochastic oscillator"""
+    highest = _frame(high).rolling(period).max().to_numpy().reshape(np.shape(high))
+    lowest = _frame(low).rolling(period).min().to_numpy().reshape(np.shape(low))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100 * (np.asarray(close, dtype=float) - lowest) / (highest - lowest)
+    return k, sma(k, smooth)
+
+
+def _cumsum_by_session(values: np.ndarray, session_ids) -> np.ndarray:
+    """Cumulative sum along time that restarts whenever the session id changes"""
+    total = np.cumsum(values, axis=0)
+    if session_ids is None:
+        return total
+    session_ids = np.asarray(session_ids)
+    starts = np.flatnonzero(np.r_[True, session_ids[1:] != session_ids[:-1]])
+    offsets = np.concatenate([np.zeros((1,) + values.shape[1:]), total[starts[1:] - 1]])
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+    return total - offsets[segment]
+
+
+def vwap(high, low, close, volume, session_ids=None) -> np.ndarray:
+    """Volume-weighted average typical price, reset at each new session id"""
+    high, low, close, volume = (np.asarray(v, dtype=float) for v in (high, low, close, volume))
+    typical = (high + low + close) / 3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _cumsum_by_session(typical * volume, session_ids) / _cumsum_by_session(volume, session_ids)
+
+
+def obv(close, volume) -> np.ndarray:
+    """On-Balance Volume"""
+    close = np.asarray(close, dtype=float)
+    direction = np.sign(np.diff(close, axis=0, prepend=close[:1]))
+    return np.cumsum(direction * np.asarray(volume, dtype=float), axis=0)
+
+
+def session_ids(index: pd.DatetimeIndex) -> Optional[np.ndarray]:
+    """Calendar-day id per bar for intraday data (None for daily bars, whose VWAP is anchored)"""
+    days = index.normalize().asi8
+    return days if (days != index.asi8).any() else None
+
+
+# Default parameters per indicator, in positional order
+DEFAULTS = {
+    "sma": (20,),
+    "ema": (20,),
+    "bbands": (20, 2.0),
+    "rsi": (14,),
+    "macd": (12, 26, 9),
+    "atr": (14,),
+    "stoch": (14, 3),
+    "vwap": (),
+    "obv": (),
+}
+
+
+def parse_spec(spec: str):
+    """Split an indicator spec into (name, params), filling in defaults"""
+    name, *raw = spec.lower().split("_")
+    if name not in DEFAULTS:
+        raise ValueError(f"Unknown indicator {spec!r}; expected one of {sorted(DEFAULTS)}")
+    params = [float(p) if re.search(r"[.e]", p) else int(p) for p in raw]
+    return name, tuple(params) + DEFAULTS[name][len(params) :]
+
+
+def compute(ohlcv: pd.DataFrame, specs: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Evaluate several indicator specs over one OHLCV frame in a single pass
+
+    Columns are pulled out as NumPy arrays once and shared by every spec.
+    Specs follow `name[_param...]`, e.g. "sma_50" or "macd_12_26_9";
+    missing parameters take the DEFAULTS.
+    Multi-output indicators add one key per output, e.g. "bbands_20_2" adds
+    "bbands_20_2_upper" and "bbands_20_2_lower" next to the middle band.
+    """
+    arrays = {
+        col: ohlcv[col].to_numpy(dtype=float) for col in ("Open", "High", "Low", "Close", "Volume") if col in ohlcv
+    }
+    close = arrays["Close"]
+    out: Dict[str, np.ndarray] = {}
+
+    for spec in specs:
+        name, params = parse_spec(spec)
+        if name == "sma":
+            out[spec] = sma(close, *params)
+        elif name == "ema":
+            out[spec] = ema(close, *params)
+        elif name == "bbands":
+            out[spec], out[f"{spec}_upper"], out[f"{spec}_lower"] = bollinger(close, *params)
+        elif name == "rsi":
+            out[spec] = rsi(close, *params)
+        elif name == "macd":
+            out[spec], out[f"{spec}_signal"], out[f"{spec}_hist"] = macd(close, *params)
+        elif name == "atr":
+            out[spec] = atr(arrays["High"], arrays["Low"], close, *params)
+        elif name == "stoch":
+            out[spec], out[f"{spec}_d"] = stochastic(arrays["High"], arrays["Low"], close, *params)
+        elif name == "vwap":
+            sessions = session_ids(ohlcv.index) if isinstance(ohlcv.index, pd.DatetimeIndex) else None
+            out[spec] = vwap(arrays["High"], arrays["Low"], close, arrays["Volume"], sessions)
+        elif name == "obv":
+            out[spec] = obv(close, arrays["Volume"])
+    return out
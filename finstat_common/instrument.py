@@ -0,0 +1,476 @@
+"""Timing spans for the apps' hot paths, with per-rerun traces and metrics export.
+
+Instrumentation is off unless FINSTAT_INSTRUMENT=1 is set. While it is off,
+`span()` returns a shared no-op context manager and `traced` functions make
+one extra call and a flag check, so the cost is negligible.
+
+When it is on, every span adds its wall time to a process-wide histogram
+keyed by (app, span, cache). `traced(name, cache=st.cache_data(...))`
+wraps a Streamlit-cached function so the span covers the cached call
+(including Streamlit's copy or unpickle of the value) and is labelled "hit"
+or "miss" depending on whether the body ran. Spans opened during a script
+run are also collected into that rerun's `Trace`, which `debug_panel`
+shows as a breakdown in the sidebar. Spans in worker threads join the
+trace when the worker runs a `propagate`d callable; fragment reruns and
+background refreshes only feed the histograms.
+
+Histograms are exported in the Prometheus text format and as JSON lines,
+together with numeric stats from registered collectors (the request
+gateway is always included). Set FINSTAT_METRICS_PORT to serve them at
+http://<host>:<port>/metrics and /metrics.jsonl; each app process needs
+its own port.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import accumulate
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+ENV = "FINSTAT_INSTRUMENT"
+PORT_ENV = "FINSTAT_METRICS_PORT"
+
+# Upper bounds in seconds; a final +Inf bucket is implied
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SPAN_METRIC = "finstat_span_seconds"
+RERUN_METRIC = "finstat_rerun_seconds"
+METRIC_HELP = {
+    SPAN_METRIC: "Wall time of instrumented spans",
+    RERUN_METRIC: "Wall time of whole script reruns",
+}
+
+_log = logging.getLogger(__name__)
+_enabled = os.environ.get(ENV, "").strip().lower() in ("1", "true", "yes", "on")
+_NULL_SPAN = nullcontext()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(on: bool = True):
+    """Turn recording on or off for the whole process"""
+    global _enabled
+    _enabled = on
+
+
+class SpanRecord(NamedTuple):
+    name: str
+    start: float
+    seconds: float
+    depth: int
+    cache: str
+
+
+class Trace:
+    """Spans recorded during one script rerun"""
+
+    def __init__(self, app: str):
+        self.app = app
+        self.started = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.spans: List[SpanRecord] = []
+
+    @property
+    def open(self) -> bool:
+        return self.seconds is None
+
+    def finish(self) -> float:
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self.started
+        return self.seconds
+
+    def breakdown(self) -> pd.DataFrame:
+        """Spans in start order, with their share of the rerun"""
+        total = self.seconds or (time.perf_counter() - self.started)
+        spans = sorted(self.spans, key=lambda record: record.start)
+        return pd.DataFrame(
+            {
+                "Span": ["  " * record.depth + ("↳ " if record.depth else "") + record.name for record in spans],
+                "Cache": [record.cache for record in spans],
+                "Start (ms)": [(record.start - self.started) * 1000 for record in spans],
+                "Time (ms)": [record.seconds * 1000 for record in spans],
+                "Share": [record.seconds / total if total else np.nan for record in spans],
+            }
+        )
+
+    def covered(self) -> float:
+        """Seconds spent in top-level spans on the script thread"""
+        return sum(record.seconds for record in self.spans if record.depth == 0)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, seconds: float):
+        # Prometheus buckets are inclusive upper bounds
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket, as Prometheus does"""
+        cumulative = list(accumulate(self.counts))
+        count = cumulative[-1]
+        if not count:
+            return np.nan
+        i = bisect_left(cumulative, q * count)
+        if i >= len(BUCKETS):
+            return BUCKETS[-1]
+        lower = BUCKETS[i - 1] if i else 0.0
+        below = cumulative[i - 1] if i else 0
+        return lower + (BUCKETS[i] - lower) * (q * count - below) / max(self.counts[i], 1)
+
+
+class Registry:
+    """Process-wide histograms plus collectors of other numeric stats"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+
+    def observe(self, metric: str, labels: tuple, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get((metric, labels))
+            if histogram is None:
+                histogram = self._histograms[(metric, labels)] = Histogram()
+            histogram.observe(seconds)
+
+    def add_collector(self, name: str, collect: Callable[[], dict]):
+        """Export the numeric values of `collect()` as finstat_<name>_<key> gauges"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def _snapshot(self) -> list:
+        with self._lock:
+            return [(metric, labels, list(h.counts), h.sum) for (metric, labels), h in sorted(self._histograms.items())]
+
+    def _collected(self) -> Dict[str, float]:
+        with self._lock:
+            collectors = dict(self._collectors)
+        values = {}
+        for name, collect in sorted(collectors.items()):
+            try:
+                stats = collect()
+            except Exception as e:
+                _log.warning("Metrics collector %s failed: %s", name, e)
+                continue
+            for key, value in stats.items():
+                if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+                    values[f"finstat_{name}_{key}"] = float(value)
+        return values
+
+    def summary(self) -> pd.DataFrame:
+        """One row per (app, span, cache) with count, mean and estimated p50/p95"""
+        rows = []
+        with self._lock:
+            items = [(metric, labels, h) for (metric, labels), h in self._histograms.items()]
+            for metric, labels, h in items:
+                app, span, cache = labels
+                rows.append(
+                    {
+                        "Span": "(rerun)" if metric == RERUN_METRIC else span,
+                        "Cache": cache,
+                        "Count": h.count,
+                        "Mean (ms)": h.sum / h.count * 1000,
+                        "p50 (ms)": h.quantile(0.5) * 1000,
+                        "p95 (ms)": h.quantile(0.95) * 1000,
+                        "Total (s)": h.sum,
+                    }
+                )
+        if not rows:
+            return pd.DataFrame()
+        return pd.DataFrame(rows).sort_values("Total (s)", ascending=False, ignore_index=True)
+
+    def prometheus(self) -> str:
+        """Histograms and collector gauges in the Prometheus text exposition format"""
+        lines, described = [], set()
+        for metric, (app, span, cache), counts, total in self._snapshot():
+            if metric not in described:
+                lines += [f"# HELP {metric} {METRIC_HELP[metric]}", f"# TYPE {metric} histogram"]
+                described.add(metric)
+            labels = f'app="{_escape(app)}"'
+            if metric == SPAN_METRIC:
+                labels += f',span="{_escape(span)}",cache="{cache}"'
+            cumulative = list(accumulate(counts))
+            for bound, n in zip(BUCKETS + (float("inf"),), cumulative):
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {n}')
+            lines.append(f"{metric}_sum{{{labels}}} {total!r}")
+            lines.append(f"{metric}_count{{{labels}}} {cumulative[-1]}")
+        for name, value in self._collected().items():
+            lines += [f"# TYPE {name} gauge", f"{name} {value!r}"]
+        return "\n".join(lines) + "\n"
+
+    def json_lines(self) -> str:
+        """One JSON object per histogram series or collector value"""
+        now = time.time()
+        records = []
+        for metric, (app, span, cache), counts, total in self._snapshot():
+            cumulative = list(accumulate(counts))
+            record = {"timestamp": now, "metric": metric, "app": app}
+            if metric == SPAN_METRIC:
+                record.update(span=span, cache=cache)
+            record.update(
+                count=cumulative[-1],
+                sum=total,
+                buckets={("+Inf" if i == len(BUCKETS) else repr(BUCKETS[i])): n for i, n in enumerate(cumulative)},
+            )
+            records.append(record)
+        for name, value in self._collected().items():
+            records.append({"timestamp": now, "metric": name, "value": value})
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = Registry()
+_trace: contextvars.ContextVar = contextvars.ContextVar("finstat_trace", default=None)
+_stack: contextvars.ContextVar = contextvars.ContextVar("finstat_spans", default=())
+_app_name = ""
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+def add_collector(name: str, collect: Callable[[], dict]):
+    """Export `collect()`'s numeric stats with the span histograms"""
+    _registry.add_collector(name, collect)
+
+
+def _gateway_stats() -> dict:
+    from finstat_common.gateway import get_gateway
+
+    return get_gateway().stats()
+
+
+_registry.add_collector("gateway", _gateway_stats)
+
+
+class _Span:
+    __slots__ = ("name", "cached", "missed", "trace", "depth", "start", "_token")
+
+    def __init__(self, name: str, cached: bool = False):
+        self.name = name
+        self.cached = cached
+        self.missed = False
+
+    def __enter__(self):
+        self.trace = _trace.get()
+        stack = _stack.get()
+        self.depth = len(stack)
+        self._token = _stack.set(stack + (self,))
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        _stack.reset(self._token)
+        cache = ("miss" if self.missed else "hit") if self.cached else ""
+        trace = self.trace
+        app = trace.app if trace is not None else _app_name
+        _registry.observe(SPAN_METRIC, (app, self.name, cache), seconds)
+        if trace is not None and trace.open:
+            trace.spans.append(SpanRecord(self.name, self.start, seconds, self.depth, cache))
+        return False
+
+
+def span(name: str, cached: bool = False):
+    """Context manager timing `name`; with `cached`, call `miss()` inside it when the value was computed"""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, cached)
+
+
+def miss():
+    """Mark the innermost cached span as a cache miss"""
+    for open_span in reversed(_stack.get()):
+        if open_span.cached:
+            open_span.missed = True
+            return
+
+
+def traced(name: Optional[str] = None, cache: Optional[Callable] = None):
+    """Decorator timing every call of a function, optionally applying a Streamlit cache decorator
+
+    With `cache`, the function is cached by `cache` and each call is
+    recorded as a hit or a miss. Streamlit still keys the cache on the
+    original function's source and arguments.
+    """
+
+    def decorate(fn):
+        label = name or fn.__name__
+        target = fn
+        if cache is not None:
+
+            @functools.wraps(fn)
+            def compute(*args, **kwargs):
+                if _enabled:
+                    miss()
+                return fn(*args, **kwargs)
+
+            target = cache(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            if not _enabled:
+                return target(*args, **kwargs)
+            with _Span(label, cache is not None):
+                return target(*args, **kwargs)
+
+        if hasattr(target, "clear"):
+            call.clear = target.clear
+        return call
+
+    return decorate
+
+
+def propagate(fn: Callable) -> Callable:
+    """`fn` wrapped to record its spans into the calling rerun's trace when run on another thread"""
+    if not _enabled:
+        return fn
+    trace, stack = _trace.get(), _stack.get()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # Open spans carry over too, so the worker's spans nest under the caller's
+        trace_token, stack_token = _trace.set(trace), _stack.set(stack)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _stack.reset(stack_token)
+            _trace.reset(trace_token)
+
+    return run
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def start_rerun(app: str) -> Optional[Trace]:
+    """Begin a rerun trace for the calling script thread (call at the top of the script)"""
+    global _app_name
+    if not _enabled:
+        return None
+    _app_name = app
+    _start_server()
+    trace = Trace(app)
+    _trace.set(trace)
+    _stack.set(())
+    return trace
+
+
+def finish_rerun() -> Optional[Trace]:
+    """Close the current rerun trace and record its total time"""
+    trace = _trace.get() if _enabled else None
+    if trace is None or not trace.open:
+        return trace
+    _registry.observe(RERUN_METRIC, (trace.app, "", ""), trace.finish())
+    return trace
+
+
+_server_lock = threading.Lock()
+_server: Optional[ThreadingHTTPServer] = None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body, content_type = _registry.prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.jsonl":
+            body, content_type = _registry.json_lines(), "application/x-ndjson"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, host: str = "") -> ThreadingHTTPServer:
+    """Serve /metrics (Prometheus) and /metrics.jsonl from a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="finstat-metrics", daemon=True).start()
+    return server
+
+
+def _start_server():
+    global _server
+    port = os.environ.get(PORT_ENV)
+    if not port or _server is not None:
+        return
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = serve(int(port))
+            except (OSError, ValueError) as e:
+                # Don't retry on every rerun; the panel's downloads still work
+                _server = False
+                _log.warning("Could not serve metrics on port %s: %s", port, e)
+
+
+def debug_panel():
+    """Finish the rerun trace and show its breakdown in the sidebar (call at the end of the script)"""
+    if not _enabled:
+        return
+    import streamlit as st
+
+    trace = finish_rerun()
+    with st.sidebar.expander("⏱️ Rerun timing"):
+        if trace is None:
+            st.caption("No trace for this rerun.")
+        else:
+            covered = trace.covered()
+            st.caption(
+                f"Rerun took {trace.seconds * 1000:,.0f} ms; instrumented spans cover {covered * 1000:,.0f} ms. "
+                "The rest is script code and Streamlit sending elements."
+            )
+            st.dataframe(
+                trace.breakdown(),
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Start (ms)": st.column_config.NumberColumn(format="%.1f"),
+                    "Time (ms)": st.column_config.NumberColumn(format="%.1f"),
+                    "Share": st.column_config.ProgressColumn(min_value=0.0, max_value=1.0, format="percent"),
+                },
+            )
+        st.caption("Since the server started")
+        st.dataframe(_registry.summary().round(2), hide_index=True, use_container_width=True)
+        # Rendered up front rather than passed as callables, which download_button only accepts from 1.52
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "Prometheus", _registry.prometheus(), file_name="finstat_metrics.prom", mime="text/plain"
+            )
+        with col2:
+            st.download_button(
+                "JSON lines", _registry.json_lines(), file_name="finstat_metrics.jsonl", mime="application/x-ndjson"
+            )
@@ -0,0 +1,346 @@
+"""Persistent on-disk OHLCV store with delta fetching.
+
+Each (ticker, interval, adjustment) series lives in one Parquet file. Reads
+are memory-mapped, and a refresh only downloads bars from the last stored
+timestamp onwards and merges them in, so a cold start after a deploy costs
+one small request per ticker instead of the full history.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from finstat_common.incremental import INDICATOR_COLUMNS, IndicatorState, advance
+from finstat_common.instrument import span
+from finstat_common.providers import get_provider
+from finstat_common.resample import base_interval, resample_ohlcv
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+}
+
+# How long stored bars are trusted before asking the provider for newer ones
+REFRESH_SECONDS = {
+    "15m": 15 * 60,
+    "30m": 30 * 60,
+    "1h": 60 * 60,
+    "1d": 4 * 60 * 60,
+}
+
+# Relative close-price drift on the overlapping bar that signals a
+# retroactive adjustment (split or dividend) and forces a full re-download
+ADJUSTMENT_TOLERANCE = 1e-4
+
+METADATA_KEY = b"finstat"
+
+
+def default_root() -> Path:
+    root = Path(os.environ.get("FINSTAT_DATA_DIR", Path.home() / ".cache" / "finstat"))
+    # Data from fixture or synthetic providers never mixes with cached Yahoo data
+    namespace = get_provider().namespace
+    return root / "providers" / namespace if namespace else root
+
+
+def write_atomic(path: Path, write: Callable):
+    """Write via a temp file in the same directory and rename it into place
+
+    Readers in other processes see either the old file or the new one, never
+    a partial write.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Flatten yfinance's (field, ticker) columns and sort by timestamp"""
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df.index.name = "Date"
+    return df
+
+
+def period_start(period: str, now: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+    """Earliest timestamp covered by a yfinance-style period string"""
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    return now - PERIOD_OFFSETS[period]
+
+
+def _provider_download(ticker: str, interval: str, auto_adjust: bool, start=None, period=None) -> pd.DataFrame:
+    with span("fetch_prices"):
+        return get_provider().download(ticker, interval, auto_adjust, start=start, period=period)
+
+
+def _provider_download_many(tickers: List[str], period: str, interval: str) -> pd.DataFrame:
+    with span("fetch_prices"):
+        return get_provider().download_many(tickers, period, interval)
+
+
+class OHLCVStore:
+    """Parquet-backed OHLCV cache keyed by ticker, interval and adjustment
+
+    `fetch(ticker, interval, auto_adjust, start=..., period=...)` is the
+    download function and `fetch_many(tickers, period, interval)` the
+    batched one (adjusted bars, yfinance's (field, ticker) columns); both
+    default to the configured market-data provider (`providers.get_provider`)
+    and can be swapped for any callable with the same signature.
+    """
+
+    def __init__(
+        self, root: Optional[Path] = None, fetch: Optional[Callable] = None, fetch_many: Optional[Callable] = None
+    ):
+        self.root = Path(root) if root is not None else default_root()
+        self.fetch = fetch or _provider_download
+        self.fetch_many = fetch_many or _provider_download_many
+
+    def path(self, ticker: str, interval: str, auto_adjust: bool = True) -> Path:
+        kind = "adj" if auto_adjust else "raw"
+        return self.root / "ohlcv" / interval / kind / f"{ticker.upper()}.parquet"
+
+    def load(self, ticker: str, interval: str, auto_adjust: bool = True):
+        """Stored bars and metadata, or (None, {}) when nothing is stored"""
+        return self._read_parquet(self.path(ticker, interval, auto_adjust))
+
+    def save(self, ticker: str, interval: str, auto_adjust: bool, df: pd.DataFrame, meta: dict):
+        """Atomically replace the stored series"""
+        self._write_parquet(self.path(ticker, interval, auto_adjust), df, meta)
+
+    def _read_parquet(self, path: Path):
+        if not path.exists():
+            return None, {}
+        table = pq.read_table(path, memory_map=True)
+        raw_meta = (table.schema.metadata or {}).get(METADATA_KEY)
+        meta = json.loads(raw_meta) if raw_meta else {}
+        return table.to_pandas(), meta
+
+    def _write_parquet(self, path: Path, df: pd.DataFrame, meta: dict):
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(meta)})
+        self._write_atomic(path, lambda tmp: pq.write_table(table, tmp))
+
+    def _write_atomic(self, path: Path, write: Callable):
+        write_atomic(path, write)
+
+    def sidecar_path(self, series_path: Path, name: str) -> Path:
+        """File for data derived from one stored series (e.g. its indicators), kept next to it"""
+        return series_path.with_suffix(f".{name}.parquet")
+
+    def clear_state(self, ticker: str, interval: str, auto_adjust: bool):
+        """Drop every sidecar derived from a series whose history was replaced"""
+        path = self.path(ticker, interval, auto_adjust)
+        for sidecar in path.parent.glob(f"{path.stem}.*.parquet"):
+            # "TCS.indicators.parquet" belongs to TCS, "TCS.NS.indicators.parquet" does not
+            if "." not in sidecar.name[len(path.stem) + 1 : -len(".parquet")]:
+                sidecar.unlink(missing_ok=True)
+
+    def _full_fetch(self, ticker: str, period: str, interval: str, auto_adjust: bool) -> pd.DataFrame:
+        self.clear_state(ticker, interval, auto_adjust)
+        return normalize_ohlcv(self.fetch(ticker, interval, auto_adjust, period=period))
+
+    def refresh(self, ticker: str, period: str, interval: str = "1d", auto_adjust: bool = True) -> pd.DataFrame:
+        """Bring the stored series up to date and return the full stored frame"""
+        stored, meta = self.load(ticker, interval, auto_adjust)
+        now = pd.Timestamp.now(tz="UTC")
+        wanted_from = period_start(period, now)
+
+        covered_from = pd.Timestamp(meta["covered_from"]) if "covered_from" in meta else None
+
+        if stored is None or stored.empty or covered_from is None or covered_from > wanted_from:
+            merged = self._full_fetch(ticker, period, interval, auto_adjust)
+            meta = {"covered_from": wanted_from.isoformat(), "covered_period": period}
+        elif time.time() - meta.get("fetched_at", 0) < REFRESH_SECONDS.get(interval, 0):
+            return stored
+        else:
+            last = stored.index[-1]
+            delta = normalize_ohlcv(self.fetch(ticker, interval, auto_adjust, start=last))
+            if not delta.empty and last in delta.index and "Close" in delta.columns:
+                old_close, new_close = stored.at[last, "Close"], delta.at[last, "Close"]
+                if abs(new_close - old_close) > ADJUSTMENT_TOLERANCE * abs(old_close):
+                    # History was re-adjusted upstream; splicing would mix price bases
+                    covered_period = meta["covered_period"]
+                    stored = self._full_fetch(ticker, covered_period, interval, auto_adjust)
+                    delta = stored.iloc[:0]
+                    meta = {
+                        "covered_from": period_start(covered_period, now).isoformat(),
+                        "covered_period": covered_period,
+                    }
+            merged = normalize_ohlcv(pd.concat([stored, delta])) if not delta.empty else stored
+
+        if merged.empty:
+            return merged
+        self.save(ticker, interval, auto_adjust, merged, {**meta, "fetched_at": time.time()})
+        return merged
+
+    def read(self, ticker: str, period: str, interval: str = "1d", auto_adjust: bool = True) -> pd.DataFrame:
+        """Bars for the requested period, fetching only what the store is missing"""
+        return _slice_period(self.refresh(ticker, period, interval, auto_adjust), period)
+
+    def read_many(
+        self, tickers: Iterable[str], period: str, interval: str = "1d", batch_size: int = 100
+    ) -> Dict[str, pd.DataFrame]:
+        """Adjusted bars for many tickers, downloading the missing or stale ones in batches
+
+        Tickers whose stored series covers the period and is fresh are read
+        from the store. The rest are fetched `batch_size` at a time with
+        `fetch_many` and spliced into their stored series, so the next
+        single-ticker read of any of them is a cache hit too. Tickers the
+        provider returns nothing for are left out.
+        """
+        now = pd.Timestamp.now(tz="UTC")
+        wanted_from = period_start(period, now)
+        series, stale = {}, []
+        for ticker in dict.fromkeys(tickers):
+            stored, meta = self.load(ticker, interval)
+            covered_from = pd.Timestamp(meta["covered_from"]) if "covered_from" in meta else None
+            covered = covered_from is not None and covered_from <= wanted_from
+            if stored is not None and not stored.empty and covered and time.time() - meta.get("fetched_at", 0) < REFRESH_SECONDS.get(interval, 0):
+                series[ticker] = stored
+            else:
+                stale.append(ticker)
+
+        for start in range(0, len(stale), batch_size):
+            batch = stale[start : start + batch_size]
+            data = self.fetch_many(batch, period, interval)
+            if data is None or data.empty:
+                continue
+            if not isinstance(data.columns, pd.MultiIndex):
+                # A single-ticker download comes back with flat columns
+                data = pd.concat({batch[0]: data}, axis=1).swaplevel(axis=1)
+            for ticker in batch:
+                if ticker not in data.columns.get_level_values(1):
+                    continue
+                fetched = normalize_ohlcv(data.xs(ticker, axis=1, level=1)).dropna(how="all")
+                if not fetched.empty:
+                    series[ticker] = self._splice(ticker, interval, period, fetched, now)
+
+        return {ticker: _slice_period(series[ticker], period) for ticker in dict.fromkeys(tickers) if ticker in series}
+
+    def _splice(self, ticker: str, interval: str, period: str, fetched: pd.DataFrame, now: pd.Timestamp):
+        """Merge a full-period download into the stored adjusted series and save it"""
+        stored, meta = self.load(ticker, interval)
+        covered = {"covered_from": period_start(period, now).isoformat(), "covered_period": period}
+        if stored is not None and not stored.empty and "covered_from" in meta:
+            overlap = stored.index.intersection(fetched.index)
+            if len(overlap):
+                old_close, new_close = stored.at[overlap[-1], "Close"], fetched.at[overlap[-1], "Close"]
+                readjusted = abs(new_close - old_close) > ADJUSTMENT_TOLERANCE * abs(old_close)
+            else:
+                readjusted = True
+            if readjusted:
+                # Different price basis (or a gap): the fetched period replaces the history
+                self.clear_state(ticker, interval, True)
+            else:
+                fetched = normalize_ohlcv(pd.concat([stored, fetched]))
+                if pd.Timestamp(meta["covered_from"]) < pd.Timestamp(covered["covered_from"]):
+                    covered = {"covered_from": meta["covered_from"], "covered_period": meta["covered_period"]}
+        self.save(ticker, interval, True, fetched, {**covered, "fetched_at": time.time()})
+        return fetched
+
+    def derived_path(self, ticker: str, base: str, interval: str, auto_adjust: bool = True) -> Path:
+        kind = "adj" if auto_adjust else "raw"
+        return self.root / "derived" / f"{base}-{interval}" / kind / f"{ticker.upper()}.parquet"
+
+    def read_interval(self, ticker: str, period: str, interval: str = "1d", auto_adjust: bool = True) -> pd.DataFrame:
+        """Bars at `interval`, derived locally from a finer stored base when possible
+
+        The base is the finest intraday interval whose Yahoo lookback covers
+        the period, so every coarser intraday interval for the same ticker and
+        period is served from one fetch; daily bars are always fetched as
+        such. Derived frames are cached on disk and rebuilt only when the
+        base series has changed.
+        """
+        return _slice_period(self._interval_series(ticker, period, interval, auto_adjust)[0], period)
+
+    def _interval_series(self, ticker: str, period: str, interval: str, auto_adjust: bool) -> tuple:
+        """(whole stored or derived series at `interval`, the Parquet file it lives in)"""
+        base = base_interval(PERIOD_OFFSETS[period], interval)
+        if base == interval:
+            return self.refresh(ticker, period, interval, auto_adjust), self.path(ticker, interval, auto_adjust)
+
+        path = self.derived_path(ticker, base, interval, auto_adjust)
+        base_df = self.refresh(ticker, period, base, auto_adjust)
+        if base_df.empty:
+            return base_df, path
+        # A refresh may revise the last base bar without adding one, so its values are part of the key
+        last_bar = base_df.iloc[-1]
+        key = {
+            "base_rows": len(base_df),
+            "base_last": base_df.index[-1].isoformat(),
+            "base_last_bar": [float(value) for value in last_bar.to_numpy(dtype=float)],
+        }
+        derived, meta = self._read_parquet(path)
+        if derived is None or meta != key:
+            derived = resample_ohlcv(base_df, interval)
+            self._write_parquet(path, derived, key)
+        return derived, path
+
+    def read_indicators(
+        self, ticker: str, period: str, interval: str = "1d", auto_adjust: bool = True
+    ) -> pd.DataFrame:
+        """RSI(14) and MACD(12, 26, 9) for the bars `read_interval` returns
+
+        Values are computed over the whole stored series and kept in a
+        sidecar file with the `IndicatorState` they end on. Each read only
+        feeds the bars added since then through the state (`incremental.advance`),
+        so a delta refresh costs O(new bars) instead of a full recompute.
+        """
+        bars, path = self._interval_series(ticker, period, interval, auto_adjust)
+        close = bars["Close"].dropna() if "Close" in bars.columns else pd.Series(dtype=float)
+        if close.empty:
+            return pd.DataFrame(columns=INDICATOR_COLUMNS, dtype=float)
+
+        sidecar = self.sidecar_path(path, "indicators")
+        values, meta = self._read_parquet(sidecar)
+        key = {"rows": len(close), "last": close.index[-1].isoformat(), "close": float(close.iloc[-1])}
+        if values is None or meta.get("key") != key:
+            state = IndicatorState.from_dict(meta["state"]) if values is not None and "state" in meta else None
+            state, fresh = advance(state, close)
+            if values is not None:
+                # Rows from the first re-fed bar on (the revised last bar included) are replaced
+                fresh = pd.concat([values[values.index < fresh.index[0]], fresh])
+            values = fresh
+            self._write_parquet(sidecar, values, {"key": key, "state": state.to_dict()})
+        return _slice_period(values, period)
+
+
+def _slice_period(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    if df.empty:
+        return df
+    start = period_start(period)
+    index = df.index
+    if index.tz is None:
+        start = start.tz_localize(None)
+    else:
+        start = start.tz_convert(index.tz)
+    return df[index >= start]
+
+
+_default_store: Optional[OHLCVStore] = None
+
+
+def get_store() -> OHLCVStore:
+    """Process-wide store rooted at FINSTAT_DATA_DIR"""
+    global _default_store
+    if _default_store is None:
+        _default_store = OHLCVStore()
+    return _default_store
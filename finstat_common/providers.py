@@ -0,0 +1,600 @@
+"""Pluggable market-data providers.
+
+Every price, statement and info request made by the apps and tools goes
+through one `MarketDataProvider`:
+
+- `download(ticker, interval, auto_adjust, start=..., period=...)`: OHLCV
+  bars in yfinance's layout
+- `download_many(tickers, period, interval)`: bars for several tickers with
+  (field, ticker) columns
+- `fundamentals(ticker, field)`: a statement (line items x period ends) or
+  the info dict
+
+Backends:
+
+- `YFinanceProvider` (default): Yahoo Finance through the shared request
+  gateway
+- `LocalProvider`: Parquet or CSV fixture files in a directory;
+  `snapshot` records them from any other provider
+- `SyntheticProvider`: deterministic generated prices and statements for
+  any ticker, interval and bar count, with no network access
+
+`FINSTAT_PROVIDER` picks the backend for every app and tool: "yfinance",
+"local:<dir>" or "synthetic[:<seed>]". Data cached from a fixture or
+synthetic backend is kept apart from cached Yahoo data.
+
+Usage:
+    FINSTAT_PROVIDER=synthetic streamlit run stock-candlestick-viewer/app.py
+    python -m finstat_common.providers snapshot RELIANCE.NS INFY.NS --to fixtures --provider synthetic
+    FINSTAT_PROVIDER=local:fixtures streamlit run ohlc-fundamentals-plot/app.py
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from finstat_common.gateway import get_gateway
+from finstat_common.resample import NSE_TZ, SESSION_CLOSE, SESSION_OPEN
+
+PROVIDER_ENV = "FINSTAT_PROVIDER"
+DEFAULT_PROVIDER = "yfinance"
+
+STATEMENT_ROWS = {
+    "balance_sheet": [
+        "Total Assets",
+        "Total Liabilities Net Minority Interest",
+        "Stockholders Equity",
+        "Current Assets",
+        "Current Liabilities",
+        "Working Capital",
+        "Total Debt",
+        "Cash And Cash Equivalents",
+        "Inventory",
+    ],
+    "income_stmt": ["Total Revenue", "Gross Profit", "Operating Income", "EBIT", "Net Income"],
+    "cashflow": ["Operating Cash Flow", "Capital Expenditure", "Free Cash Flow"],
+}
+
+
+def interval_minutes(interval: str) -> int:
+    """Bar length in minutes for yfinance interval strings such as "15m", "1h" or "1d" """
+    match = re.fullmatch(r"(\d+)(m|h|d)", interval)
+    if match is None:
+        raise ValueError(f"Unsupported interval {interval!r}")
+    return int(match.group(1)) * {"m": 1, "h": 60, "d": 24 * 60}[match.group(2)]
+
+
+def _window_start(start=None, period: Optional[str] = None) -> Optional[pd.Timestamp]:
+    """UTC timestamp a download starts at, from an explicit start or a period string"""
+    if start is not None:
+        start = pd.Timestamp(start)
+        return start.tz_localize(NSE_TZ).tz_convert("UTC") if start.tz is None else start.tz_convert("UTC")
+    if period is not None:
+        # Imported here: ohlcv_store picks its default fetch from this module
+        from finstat_common.ohlcv_store import period_start
+
+        return period_start(period)
+    return None
+
+
+def _since(df: pd.DataFrame, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+    """Rows at or after a UTC `start` (naive indexes are session dates in IST)"""
+    if start is None or df.empty:
+        return df
+    index = df.index
+    local = index.tz_localize(NSE_TZ) if index.tz is None else index
+    if index.tz is None:
+        # A daily bar belongs to the window if its session date is on or after the start date
+        start = start.tz_convert(NSE_TZ).normalize()
+    return df[local >= start]
+
+
+def _adjust(df: pd.DataFrame, auto_adjust: bool) -> pd.DataFrame:
+    """yfinance's column layout: adjusted OHLC without "Adj Close", or raw OHLC with it"""
+    if "Adj Close" not in df.columns:
+        return df if auto_adjust else df.assign(**{"Adj Close": df["Close"]})
+    if not auto_adjust:
+        return df
+    factor = df["Adj Close"] / df["Close"]
+    adjusted = df.drop(columns="Adj Close")
+    for column in ("Open", "High", "Low", "Close"):
+        adjusted[column] = df[column] * factor
+    return adjusted
+
+
+class MarketDataProvider(ABC):
+    """Interface shared by all backends; `download_many` defaults to one `download` per ticker"""
+
+    name = "base"
+    # Subdirectory for data cached from this provider (None: the data root itself)
+    namespace: Optional[str] = None
+
+    @abstractmethod
+    def download(
+        self, ticker: str, interval: str = "1d", auto_adjust: bool = True, start=None, period: Optional[str] = None
+    ) -> pd.DataFrame:
+        """OHLCV bars for one ticker from `start`, or over `period` when no start is given"""
+
+    def download_many(self, tickers: Iterable[str], period: str, interval: str = "1d") -> pd.DataFrame:
+        frames = {ticker: self.download(ticker, interval, True, period=period) for ticker in tickers}
+        frames = {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1, level=0, sort_remaining=False)
+
+    @abstractmethod
+    def fundamentals(self, ticker: str, field: str):
+        """A statement ("balance_sheet", "income_stmt", ...) or the "info" dict"""
+
+
+class EmptyDownloadError(RuntimeError):
+    """A download returned no rows; the message carries the errors yfinance logged for it"""
+
+
+class _ThreadErrors(logging.Handler):
+    """Collects error records logged from the thread that installed it"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.thread = threading.get_ident()
+        self.messages = []
+
+    def emit(self, record):
+        if record.thread == self.thread:
+            self.messages.append(record.getMessage())
+
+
+def checked_download(download, *args, **kwargs) -> pd.DataFrame:
+    """`download(*args, **kwargs)`, raising EmptyDownloadError instead of returning no rows
+
+    `yf.download` catches per-ticker failures, rate limits included, logs
+    them and returns an empty frame. Raising lets the gateway retry rate
+    limits with backoff and keeps an empty frame out of its result memo.
+    The logged errors go into the message so `is_rate_limited` can tell a
+    rate limit from a ticker with no data.
+    """
+    logger = logging.getLogger("yfinance")
+    errors = _ThreadErrors()
+    logger.addHandler(errors)
+    try:
+        data = download(*args, **kwargs)
+    finally:
+        logger.removeHandler(errors)
+    if data is None or data.empty:
+        raise EmptyDownloadError("; ".join(errors.messages) or "no data returned")
+    return data
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance via yfinance; every request is coalesced and rate limited by the gateway
+
+    A download that still comes back empty after the gateway's retries is
+    returned as an empty frame, like `yf.download` itself.
+    """
+
+    name = "yfinance"
+
+    def download(self, ticker, interval="1d", auto_adjust=True, start=None, period=None):
+        import yfinance as yf
+
+        kwargs = dict(start=start) if start is not None else dict(period=period)
+        key = ("download", ticker.upper(), interval, auto_adjust, str(start), period)
+        try:
+            return get_gateway().call(
+                key,
+                checked_download,
+                yf.download,
+                ticker,
+                interval=interval,
+                auto_adjust=auto_adjust,
+                progress=False,
+                **kwargs,
+            )
+        except EmptyDownloadError:
+            return pd.DataFrame()
+
+    def download_many(self, tickers, period, interval="1d"):
+        import yfinance as yf
+
+        tickers = list(tickers)
+        try:
+            return get_gateway().call(
+                ("download", tuple(tickers), period, interval),
+                checked_download,
+                yf.download,
+                tickers,
+                period=period,
+                interval=interval,
+                auto_adjust=True,
+                group_by="column",
+                threads=True,
+                progress=False,
+            )
+        except EmptyDownloadError:
+            return pd.DataFrame()
+
+    def fundamentals(self, ticker, field):
+        import yfinance as yf
+
+        return get_gateway().call(("fundamentals", ticker.upper(), field), lambda: getattr(yf.Ticker(ticker), field))
+
+
+class LocalProvider(MarketDataProvider):
+    """Fixture files under `root`, in Parquet or CSV:
+
+        prices/<interval>/<TICKER>.parquet      OHLCV bars (with "Adj Close" to serve both adjustments)
+        fundamentals/<TICKER>/<field>.parquet   statements, line items x period ends
+        fundamentals/<TICKER>/info.json
+
+    A missing file gives an empty frame (or an empty info dict), as Yahoo
+    does for an unknown ticker. Period requests return every stored bar, so
+    recorded fixtures keep working as they age.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        digest = hashlib.blake2b(str(self.root.resolve()).encode(), digest_size=4).hexdigest()
+        self.namespace = f"local-{digest}"
+
+    def _find(self, path: Path) -> Optional[Path]:
+        """`path` or its CSV twin, whichever exists"""
+        for candidate in (path, path.with_suffix(".csv")):
+            if candidate.exists():
+                return candidate
+        return None
+
+    def price_path(self, ticker: str, interval: str) -> Path:
+        return self.root / "prices" / interval / f"{ticker.upper()}.parquet"
+
+    def fundamentals_path(self, ticker: str, field: str) -> Path:
+        suffix = ".json" if field == "info" else ".parquet"
+        return self.root / "fundamentals" / ticker.upper() / f"{field}{suffix}"
+
+    def download(self, ticker, interval="1d", auto_adjust=True, start=None, period=None):
+        path = self._find(self.price_path(ticker, interval))
+        if path is None:
+            return pd.DataFrame()
+        if path.suffix == ".csv":
+            df = pd.read_csv(path, index_col=0)
+            df.index = pd.to_datetime(df.index, utc=df.index.str.contains(r"[+-]\d\d:\d\d$").any())
+            if df.index.tz is not None:
+                df.index = df.index.tz_convert(NSE_TZ)
+        else:
+            df = pd.read_parquet(path)
+        return _adjust(_since(df.sort_index(), _window_start(start)), auto_adjust)
+
+    def fundamentals(self, ticker, field):
+        if field == "info":
+            path = self.fundamentals_path(ticker, field)
+            return json.loads(path.read_text()) if path.exists() else {}
+        path = self._find(self.fundamentals_path(ticker, field))
+        if path is None:
+            return pd.DataFrame()
+        df = pd.read_csv(path, index_col=0) if path.suffix == ".csv" else pd.read_parquet(path)
+        periods = pd.to_datetime(df.columns, errors="coerce")
+        if len(periods) and periods.notna().all():
+            df.columns = periods
+        return df
+
+    def save_prices(self, ticker: str, interval: str, df: pd.DataFrame):
+        path = self.price_path(ticker, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path)
+
+    def save_fundamentals(self, ticker: str, field: str, value):
+        path = self.fundamentals_path(ticker, field)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if field == "info":
+            path.write_text(json.dumps(value, default=str, indent=1))
+        else:
+            # Parquet needs string column names; period ends are restored on read
+            value = value.copy()
+            value.columns = [str(column) for column in value.columns]
+            value.to_parquet(path)
+
+
+# Synthetic series are a pure function of (seed, ticker, interval, session),
+# built from hashed counters rather than a sequential RNG, so any window of
+# a series can be generated on its own and always agrees with every other
+# window (delta fetches splice cleanly onto stored bars).
+ANCHOR_DAY = np.datetime64("2000-01-03", "D")
+DAILY_VOL = 0.018
+DAILY_DRIFT = 0.0003
+OPEN_MINUTE = int(pd.Timedelta(SESSION_OPEN + ":00").total_seconds()) // 60
+SESSION_MINUTES = int(pd.Timedelta(SESSION_CLOSE + ":00").total_seconds()) // 60 - OPEN_MINUTE
+SECTORS = ["Technology", "Financial Services", "Energy", "Consumer Cyclical", "Industrials", "Healthcare"]
+
+
+def _key(*parts) -> np.uint64:
+    return np.uint64(int.from_bytes(hashlib.blake2b(repr(parts).encode(), digest_size=8).digest(), "little"))
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (uint64 arithmetic wraps by design)"""
+    with np.errstate(over="ignore"):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def _uniform(key: np.uint64, counters: np.ndarray) -> np.ndarray:
+    with np.errstate(over="ignore"):
+        bits = _mix(np.asarray(counters, dtype=np.int64).view(np.uint64) + key)
+    return ((bits >> np.uint64(11)).astype(np.float64) + 0.5) * 2.0**-53
+
+
+def _normal(key: np.uint64, counters: np.ndarray) -> np.ndarray:
+    """Standard normals that depend only on (key, counter)"""
+    counters = np.asarray(counters, dtype=np.int64) * 2
+    u1, u2 = _uniform(key, counters), _uniform(key, counters + 1)
+    return np.sqrt(-2 * np.log(u1)) * np.cos(2 * np.pi * u2)
+
+
+def synthetic_ohlcv(
+    ticker: str,
+    interval: str = "1d",
+    bars: Optional[int] = None,
+    start=None,
+    end=None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Deterministic OHLCV bars (with "Adj Close") for any ticker and interval
+
+    Bars follow NSE sessions: weekdays, 09:15–15:30 IST, intraday bars
+    anchored at the open and indexed in IST, daily bars by naive date.
+    Returns the last `bars` bars up to `end` (default now), or every bar
+    from `start`. Daily closes are a random walk and intraday bars bridge
+    each day's close to the next, so coarser and finer intervals of a
+    ticker tell the same story.
+    """
+    end = pd.Timestamp.now(tz=NSE_TZ) if end is None else pd.Timestamp(end)
+    end = end.tz_localize(NSE_TZ) if end.tz is None else end.tz_convert(NSE_TZ)
+    daily = interval == "1d"
+    width = SESSION_MINUTES if daily else interval_minutes(interval)
+    per_day = 1 if daily else -(-SESSION_MINUTES // width)
+
+    last_day = np.datetime64(end.date(), "D")
+    if bars is not None:
+        first_day = np.busday_offset(last_day, -(bars // per_day + 2), roll="backward")
+    else:
+        window = _window_start(start, "1mo")
+        first_day = np.datetime64(window.tz_convert(NSE_TZ).date(), "D")
+    days = np.arange(first_day, last_day + 1)
+    days = days[np.is_busday(days)]
+    if not len(days):
+        return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Adj Close", "Volume"], dtype=float)
+
+    # Log price per session relative to the anchor day, from hashed daily returns
+    day_index = np.busday_count(ANCHOR_DAY, days)
+    lo, hi = min(day_index[0] - 1, 0), max(day_index[-1], 0)
+    returns = DAILY_DRIFT + DAILY_VOL * _normal(_key(seed, ticker.upper(), "close"), np.arange(lo, hi + 1))
+    walk = np.cumsum(returns)
+    walk -= walk[-lo]
+    # Starting price between ₹50 and ₹3,000, log-uniform per ticker
+    base = np.log(50) + np.log(3000 / 50) * _uniform(_key(seed, ticker.upper(), "price"), 0)
+    close_day, prev_day = base + walk[day_index - lo], base + walk[day_index - 1 - lo]
+
+    key = _key(seed, ticker.upper(), interval)
+    counters = day_index[:, None] * 1024 + np.arange(per_day)[None, :]
+    step = DAILY_VOL / np.sqrt(per_day)
+    # Brownian bridge from the previous close to this session's close
+    path = np.cumsum(step * _normal(key, counters), axis=1)
+    fraction = np.arange(1, per_day + 1)[None, :] / per_day
+    log_close = prev_day[:, None] + fraction * (close_day - prev_day)[:, None] + path - fraction * path[:, -1:]
+    log_open = np.empty_like(log_close)
+    log_open[:, 0] = prev_day + 0.25 * DAILY_VOL * _normal(key, counters[:, 0] + 1001)
+    log_open[:, 1:] = log_close[:, :-1]
+    wick = 0.4 * step
+    high = np.maximum(log_open, log_close) + wick * np.abs(_normal(key, counters + 2_000_000_000_000))
+    low = np.minimum(log_open, log_close) - wick * np.abs(_normal(key, counters + 4_000_000_000_000))
+    volume = np.round(np.exp(13 - np.log(per_day) + 0.5 * _normal(key, counters + 6_000_000_000_000)))
+
+    if daily:
+        index = pd.DatetimeIndex(days.astype("datetime64[ns]"), name="Date")
+    else:
+        starts = days.astype("datetime64[m]")[:, None] + (OPEN_MINUTE + np.arange(per_day) * width)[None, :]
+        index = pd.DatetimeIndex(starts.ravel().astype("datetime64[ns]"), name="Date").tz_localize(NSE_TZ)
+    close = np.round(np.exp(log_close.ravel()), 2)
+    df = pd.DataFrame(
+        {
+            "Open": np.round(np.exp(log_open.ravel()), 2),
+            "High": np.round(np.exp(high.ravel()), 2),
+            "Low": np.round(np.exp(low.ravel()), 2),
+            "Close": close,
+            "Adj Close": close,
+            "Volume": volume.ravel(),
+        },
+        index=index,
+    )
+    local_end = end if not daily else end.tz_localize(None).normalize()
+    df = df[df.index <= local_end]
+    if bars is not None:
+        return df.iloc[-bars:]
+    return _since(df, _window_start(start))
+
+
+def synthetic_statement(ticker: str, field: str, end=None, seed: int = 0) -> pd.DataFrame:
+    """Deterministic yfinance-style statement: line items x period ends, latest first
+
+    Annual periods end on 31 March (the Indian fiscal year), quarterly ones
+    on calendar quarter ends. Only periods whose filing deadline has passed
+    by `end` are reported.
+    """
+    quarterly = field.startswith("quarterly_")
+    kind = field.removeprefix("quarterly_")
+    rows = STATEMENT_ROWS[kind]
+    end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+    end = (end.tz_localize(None) if end.tz is not None else end).normalize()
+    if quarterly:
+        periods = pd.date_range(end=end - pd.DateOffset(days=45), periods=5, freq="QE")
+    else:
+        periods = pd.date_range(end=end - pd.DateOffset(days=60), periods=4, freq="YE-MAR")
+    periods = pd.DatetimeIndex(periods[::-1], freq=None)
+
+    key = _key(seed, ticker.upper(), "fundamentals")
+    n = np.arange(len(periods))
+    counters = periods.year.to_numpy() * 16 + periods.month.to_numpy()
+    scale = np.exp(np.log(5e9) + 2.5 * _normal(key, 0))
+    revenue = scale * 1.08 ** ((periods.year.to_numpy() - 2000) + periods.month.to_numpy() / 12) * np.exp(
+        0.05 * _normal(key, counters)
+    )
+    if quarterly:
+        revenue = revenue / 4
+    flows = revenue[:, None] * (1 + 0.1 * _normal(key, counters[:, None] * 32 + np.arange(8)[None, :]))
+
+    gross_profit = flows[:, 0] * 0.35
+    operating_income = flows[:, 1] * 0.15
+    net_income = operating_income * 0.7
+    operating_cash_flow = net_income * (1.2 + 0.1 * _normal(key, counters + 7))
+    capex = -flows[:, 2] * 0.06
+    total_assets = revenue * (4 if quarterly else 1) * 1.3 * (1 + 0.05 * n[::-1] / 10)
+    current_assets = total_assets * 0.4
+    current_liabilities = current_assets / (1.2 + 0.8 * _uniform(key, counters + 11))
+    equity = total_assets * (0.35 + 0.25 * _uniform(key, 3))
+    total_liabilities = total_assets - equity
+    values = {
+        "Total Assets": total_assets,
+        "Total Liabilities Net Minority Interest": total_liabilities,
+        "Stockholders Equity": equity,
+        "Current Assets": current_assets,
+        "Current Liabilities": current_liabilities,
+        "Working Capital": current_assets - current_liabilities,
+        "Total Debt": total_liabilities * (0.2 + 0.4 * _uniform(key, 5)),
+        "Cash And Cash Equivalents": current_assets * 0.25,
+        "Inventory": current_assets * 0.3,
+        "Total Revenue": revenue,
+        "Gross Profit": gross_profit,
+        "Operating Income": operating_income,
+        "EBIT": operating_income * 1.02,
+        "Net Income": net_income,
+        "Operating Cash Flow": operating_cash_flow,
+        "Capital Expenditure": capex,
+        "Free Cash Flow": operating_cash_flow + capex,
+    }
+    return pd.DataFrame([np.round(values[row]) for row in rows], index=rows, columns=periods)
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Deterministic generated data for any ticker; `end` pins "now" for reproducible runs"""
+
+    name = "synthetic"
+
+    def __init__(self, seed: int = 0, end=None):
+        self.seed = seed
+        self.end = end
+        self.namespace = f"synthetic-{seed}"
+
+    def download(self, ticker, interval="1d", auto_adjust=True, start=None, period=None):
+        window = _window_start(start, period or "1mo")
+        df = synthetic_ohlcv(ticker, interval, start=window, end=self.end, seed=self.seed)
+        return _adjust(df, auto_adjust)
+
+    def fundamentals(self, ticker, field):
+        if field == "info":
+            key = _key(self.seed, ticker.upper(), "info")
+            last = synthetic_ohlcv(ticker, "1d", bars=1, end=self.end, seed=self.seed)["Close"]
+            price = float(last.iloc[-1]) if len(last) else None
+            return {
+                "symbol": ticker.upper(),
+                "longName": f"{ticker.upper().split('.')[0].title()} Ltd (synthetic)",
+                "sector": SECTORS[int(_uniform(key, 0) * len(SECTORS))],
+                "currency": "INR",
+                "exchange": "NSI",
+                "currentPrice": price,
+                "sharesOutstanding": int(1e8 * (1 + 20 * _uniform(key, 1))),
+            }
+        return synthetic_statement(ticker, field, self.end, self.seed)
+
+
+def make_provider(spec: str) -> MarketDataProvider:
+    """Provider for a FINSTAT_PROVIDER value: "yfinance", "local:<dir>" or "synthetic[:<seed>]" """
+    name, _, arg = spec.strip().partition(":")
+    if name == "yfinance":
+        return YFinanceProvider()
+    if name == "local":
+        if not arg:
+            raise ValueError("The local provider needs a directory, e.g. local:fixtures")
+        return LocalProvider(Path(arg).expanduser())
+    if name == "synthetic":
+        return SyntheticProvider(seed=int(arg) if arg else 0)
+    raise ValueError(f"Unknown data provider {spec!r}; expected yfinance, local:<dir> or synthetic[:<seed>]")
+
+
+def describe(provider: MarketDataProvider) -> str:
+    if isinstance(provider, LocalProvider):
+        return f"local fixtures in {provider.root}"
+    if isinstance(provider, SyntheticProvider):
+        return f"synthetic data (seed {provider.seed})"
+    return provider.name
+
+
+_default_provider: Optional[MarketDataProvider] = None
+_default_lock = threading.Lock()
+
+
+def get_provider() -> MarketDataProvider:
+    """Process-wide provider chosen by FINSTAT_PROVIDER (Yahoo Finance when unset)"""
+    global _default_provider
+    with _default_lock:
+        if _default_provider is None:
+            _default_provider = make_provider(os.environ.get(PROVIDER_ENV) or DEFAULT_PROVIDER)
+        return _default_provider
+
+
+def snapshot(
+    provider: MarketDataProvider,
+    root: Path,
+    tickers: Iterable[str],
+    intervals: Iterable[str] = ("1d",),
+    period: str = "1y",
+    fields: Optional[Iterable[str]] = None,
+) -> LocalProvider:
+    """Record prices and fundamentals from `provider` as LocalProvider fixtures under `root`"""
+    from finstat_common.fundamentals_cache import FIELDS
+    from finstat_common.ohlcv_store import normalize_ohlcv
+
+    fixtures = LocalProvider(root)
+    for ticker in tickers:
+        for interval in intervals:
+            # Unadjusted bars keep "Adj Close", so the fixture can serve both adjustments
+            bars = normalize_ohlcv(provider.download(ticker, interval, False, period=period))
+            if not bars.empty:
+                fixtures.save_prices(ticker, interval, bars)
+        for field in fields or FIELDS:
+            value = provider.fundamentals(ticker, field)
+            if value is not None and len(value):
+                fixtures.save_fundamentals(ticker, field, value)
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Market-data provider tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("snapshot", help="Record fixtures for the local provider")
+    record.add_argument("tickers", nargs="+")
+    record.add_argument("--to", type=Path, required=True, help="Fixture directory")
+    record.add_argument("--provider", default=DEFAULT_PROVIDER, help="Source: yfinance or synthetic[:<seed>]")
+    record.add_argument("--intervals", nargs="+", default=["1d"])
+    record.add_argument("--period", default="1y")
+    args = parser.parse_args()
+
+    source = make_provider(args.provider)
+    snapshot(source, args.to, args.tickers, args.intervals, args.period)
+    print(f"Recorded {len(args.tickers)} tickers from {describe(source)} -> {args.to}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Vectorized financial ratios over stacked statements.
+
+Statements arrive in yfinance layout (line items down the rows, one column
+per period end). `flatten_statements` turns any number of them into long
+(ticker, freq, period, item, value) rows with normalized snake_case item
+names, `widen` pivots those rows into a single (ticker, freq, period)
+indexed frame (`stack_statements` does both), and
+`compute_ratios` evaluates every ratio for every row as whole-column
+arithmetic. Divisions go through `safe_divide`, so a missing line item or a
+zero denominator gives NaN rather than inf or an exception.
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+INDEX_NAMES = ["ticker", "freq", "period"]
+
+# Canonical line items and the yfinance rows they are read from, first match wins
+LINE_ITEM_ALIASES = {
+    "total_assets": ("Total Assets",),
+    "total_liabilities": ("Total Liabilities Net Minority Interest", "Total Liabilities"),
+    "equity": ("Stockholders Equity", "Common Stock Equity", "Total Equity Gross Minority Interest"),
+    "current_assets": ("Current Assets",),
+    "current_liabilities": ("Current Liabilities",),
+    "total_debt": ("Total Debt",),
+    "cash": ("Cash And Cash Equivalents", "Cash Cash Equivalents And Short Term Investments"),
+    "inventory": ("Inventory",),
+    "revenue": ("Total Revenue", "Operating Revenue"),
+    "gross_profit": ("Gross Profit",),
+    "operating_income": ("Operating Income",),
+    "ebit": ("EBIT",),
+    "net_income": ("Net Income", "Net Income Common Stockholders"),
+    "operating_cash_flow": ("Operating Cash Flow",),
+    "capex": ("Capital Expenditure",),
+    "free_cash_flow": ("Free Cash Flow",),
+}
+
+RATIO_GROUPS = {
+    "liquidity": ["current_ratio", "quick_ratio", "cash_ratio", "working_capital"],
+    "leverage": ["debt_to_equity", "debt_to_assets", "equity_ratio", "net_debt"],
+    "profitability": ["gross_margin", "operating_margin", "net_margin", "roe", "roce"],
+    "cash_flow": ["free_cash_flow", "fcf_margin"],
+}
+
+
+def normalize_name(name: str) -> str:
+    """'Total Liabilities Net Minority Interest' -> 'total_liabilities_net_minority_interest'"""
+    return re.sub(r"[^0-9a-z]+", "_", str(name).lower()).strip("_")
+
+
+LONG_COLUMNS = ["ticker", "freq", "period", "item", "value"]
+
+
+def _canonicalize(wide: pd.DataFrame) -> pd.DataFrame:
+    """Add the canonical LINE_ITEM_ALIASES columns to a frame of normalized line items"""
+    canonical = {}
+    for item, aliases in LINE_ITEM_ALIASES.items():
+        present = [normalize_name(alias) for alias in aliases if normalize_name(alias) in wide.columns]
+        if present:
+            series = wide[present[0]]
+            for alias in present[1:]:
+                series = series.fillna(wide[alias])
+            canonical[item] = series
+    return wide.assign(**canonical)
+
+
+def flatten_statements(statements: Dict[str, Iterable[pd.DataFrame]], freq: str = "annual") -> pd.DataFrame:
+    """{ticker: [statements]} as long (ticker, freq, period, item, value) rows with normalized item names
+
+    Each statement is flattened with plain NumPy reshapes; names are
+    normalized once per distinct line item. A line item reported in two
+    statements for the same period keeps its first value.
+    """
+    tickers, items, periods, values = [], [], [], []
+    for ticker, parts in statements.items():
+        for part in parts:
+            if part is None or part.empty:
+                continue
+            n_items, n_periods = part.shape
+            tickers.append(np.full(part.size, ticker, dtype=object))
+            items.append(np.repeat(part.index.to_numpy(dtype=object), n_periods))
+            periods.append(np.tile(part.columns.to_numpy(dtype=object), n_items))
+            values.append(part.to_numpy(dtype=object).ravel())
+    if not values:
+        return pd.DataFrame({column: [] for column in LONG_COLUMNS})
+
+    codes, raw_names = pd.factorize(np.concatenate(items))
+    names = np.array([normalize_name(name) for name in raw_names], dtype=object)
+    long = pd.DataFrame(
+        {
+            "ticker": np.concatenate(tickers),
+            "freq": freq,
+            "period": pd.to_datetime(np.concatenate(periods), errors="coerce"),
+            "item": names[codes],
+            "value": pd.to_numeric(np.concatenate(values), errors="coerce"),
+        }
+    ).dropna()
+    return long.drop_duplicates(["ticker", "freq", "period", "item"]).reset_index(drop=True)
+
+
+def widen(long: pd.DataFrame) -> pd.DataFrame:
+    """Long line-item rows -> one row per (ticker, freq, period), with canonical columns added"""
+    if long.empty:
+        return pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=INDEX_NAMES))
+    wide = long.pivot(index=INDEX_NAMES, columns="item", values="value")
+    wide.columns.name = None
+    return _canonicalize(wide).sort_index()
+
+
+def stack_statements(statements: Dict[str, Iterable[pd.DataFrame]], freq: str = "annual") -> pd.DataFrame:
+    """Stack {ticker: [balance sheet, income statement, cash flow, ...]} into one wide frame
+
+    The result has one row per (ticker, freq, period) holding every line
+    item known for it. All statements are flattened into one long frame
+    and pivoted once, so the cost is a single reshape regardless of how
+    many tickers are stacked.
+    """
+    return widen(flatten_statements(statements, freq))
+
+
+def to_wide(statement: pd.DataFrame, ticker: str = "", freq: str = "annual") -> pd.DataFrame:
+    """One statement as rows of periods with normalized line-item columns, indexed (ticker, freq, period)"""
+    return stack_statements({ticker: [statement]}, freq)
+
+
+def safe_divide(numerator, denominator) -> pd.Series:
+    """Element-wise division with NaN wherever the denominator is 0 or missing"""
+    denominator = denominator.where(denominator != 0)
+    return numerator / denominator
+
+
+def compute_ratios(wide: pd.DataFrame) -> pd.DataFrame:
+    """Every ratio in RATIO_GROUPS for every row of a stacked statement frame
+
+    Line items a ticker never reported are treated as missing, so ratios
+    that need income or cash-flow data are NaN until those statements are
+    stacked in, and the quick ratio is NaN without an inventory figure.
+    Flow-based ratios use the period's own figures (quarterly ROE is not
+    annualized).
+    """
+    nan = pd.Series(np.nan, index=wide.index)
+
+    def col(name: str) -> pd.Series:
+        return wide[name] if name in wide.columns else nan
+
+    current_assets, current_liabilities = col("current_assets"), col("current_liabilities")
+    total_assets, equity, total_debt = col("total_assets"), col("equity"), col("total_debt")
+    cash, revenue = col("cash"), col("revenue")
+    ebit = col("ebit").fillna(col("operating_income"))
+    fcf = col("free_cash_flow").fillna(col("operating_cash_flow") - col("capex").abs())
+
+    ratios = pd.DataFrame(
+        {
+            "current_ratio": safe_divide(current_assets, current_liabilities),
+            "quick_ratio": safe_divide(current_assets - col("inventory"), current_liabilities),
+            "cash_ratio": safe_divide(cash, current_liabilities),
+            "working_capital": current_assets - current_liabilities,
+            "debt_to_equity": safe_divide(total_debt, equity),
+            "debt_to_assets": safe_divide(total_debt, total_assets),
+            "equity_ratio": safe_divide(equity, total_assets),
+            "net_debt": total_debt - cash,
+            "gross_margin": safe_divide(col("gross_profit"), revenue),
+            "operating_margin": safe_divide(col("operating_income"), revenue),
+            "net_margin": safe_divide(col("net_income"), revenue),
+            "roe": safe_divide(col("net_income"), equity),
+            "roce": safe_divide(ebit, total_assets - current_liabilities),
+            "free_cash_flow": fcf,
+            "fcf_margin": safe_divide(fcf, revenue),
+        },
+        index=wide.index,
+    )
+    return ratios.astype(float)
+
+
+def tidy(ratios: pd.DataFrame) -> pd.DataFrame:
+    """Long panel (ticker, freq, period, ratio, value) without missing values"""
+    long = ratios.rename_axis(columns="ratio").stack().rename("value").reset_index()
+    return long[np.isfinite(long["value"])].reset_index(drop=True)
+
+
+def ratio_panel(
+    balance_sheets: Dict[str, pd.DataFrame],
+    income_statements: Optional[Dict[str, pd.DataFrame]] = None,
+    cash_flows: Optional[Dict[str, pd.DataFrame]] = None,
+    freq: str = "annual",
+) -> pd.DataFrame:
+    """Wide ratio frame for many tickers from per-ticker statement dicts"""
+    income_statements, cash_flows = income_statements or {}, cash_flows or {}
+    statements = {
+        ticker: [balance, income_statements.get(ticker), cash_flows.get(ticker)]
+        for ticker, balance in balance_sheets.items()
+    }
+    return compute_ratios(stack_statements(statements, freq))
@@ -0,0 +1,85 @@
+"""Session-aware OHLCV resampling for NSE bars.
+
+Coarser intraday intervals are derived locally from a finer base fetch
+(15m -> 30m -> 1h); daily bars always come from the provider. Intraday
+buckets are anchored at the 09:15 IST session open (so 1h bars run 09:15,
+10:15, ... like Yahoo's own), bars outside 09:15–15:30 are dropped, and
+empty buckets (nights, weekends, exchange holidays) never produce a bar
+because only bars that actually traded are aggregated.
+"""
+
+import pandas as pd
+
+NSE_TZ = "Asia/Kolkata"
+SESSION_OPEN = "09:15"
+SESSION_CLOSE = "15:30"
+
+INTERVAL_MINUTES = {"15m": 15, "30m": 30, "1h": 60, "1d": 24 * 60}
+# Intervals that may be derived from one another; daily bars are never derived
+INTRADAY_INTERVALS = ("15m", "30m", "1h")
+
+# Longest history Yahoo serves for each interval (None = unlimited)
+MAX_LOOKBACK = {
+    "15m": pd.DateOffset(days=60),
+    "30m": pd.DateOffset(days=60),
+    "1h": pd.DateOffset(days=730),
+    "1d": None,
+}
+
+AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+}
+
+
+def base_interval(period_offset: pd.DateOffset, interval: str) -> str:
+    """Finest intraday interval at or below `interval` whose lookback covers the period
+
+    Daily bars are always fetched natively: Yahoo's daily OHLC uses the
+    exchange's official close (not the last trade) and carries dividend
+    and split adjustment, which intraday bars do not reproduce.
+    """
+    if interval not in INTRADAY_INTERVALS:
+        return interval
+    now = pd.Timestamp.now()
+    wanted_from = now - period_offset
+    for candidate in sorted(INTRADAY_INTERVALS, key=INTERVAL_MINUTES.get):
+        if INTERVAL_MINUTES[candidate] > INTERVAL_MINUTES[interval]:
+            break
+        lookback = MAX_LOOKBACK[candidate]
+        if lookback is None or now - lookback <= wanted_from:
+            return candidate
+    return interval
+
+
+def to_session_time(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert to IST and keep only bars that start inside the trading session"""
+    index = df.index
+    local = df.tz_localize(NSE_TZ) if index.tz is None else df.tz_convert(NSE_TZ)
+    return local.between_time(SESSION_OPEN, SESSION_CLOSE, inclusive="left")
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Aggregate finer OHLCV bars into `interval` bars on NSE session boundaries
+
+    Intraday results keep an IST-aware index; daily results are indexed by
+    naive session dates, matching yfinance's daily frames.
+    """
+    aggregations = {col: how for col, how in AGGREGATIONS.items() if col in df.columns}
+    session = to_session_time(df)
+
+    if interval == "1d":
+        dates = session.index.tz_localize(None).normalize()
+        out = session.groupby(dates).agg(aggregations)
+        out.index.name = df.index.name
+        return out
+
+    minutes = INTERVAL_MINUTES[interval]
+    open_minutes = pd.Timedelta(SESSION_OPEN + ":00").total_seconds() // 60
+    offset = pd.Timedelta(minutes=open_minutes % minutes)
+    out = session.resample(f"{minutes}min", offset=offset, label="left", closed="left").agg(aggregations)
+    return out.dropna(subset=["Open"])
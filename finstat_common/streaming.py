@@ -0,0 +1,558 @@
+"""Tick-to-candle streaming aggregation for live charts.
+
+A feed delivers ticks as `TickBatch` arrays (symbol index, UTC timestamp in
+ns, price, size). `CandleAggregator.update` folds a whole batch into OHLCV
+bars with one sort and a few `reduceat` calls. Ticks are grouped by
+(symbol, bar); a group for a symbol's forming bar is merged into it, and
+groups for later bars close it. Buckets follow `resample.resample_ohlcv`:
+intraday bars are anchored at the 09:15 IST open, ticks outside the session
+are dropped and daily bars are indexed by naive session date, so live bars
+line up with stored history.
+
+RSI and MACD advance through `finstat_common.incremental` once per closed
+bar. The forming bar's values are previews (`peek`) that leave the state
+alone. Each update reports which symbols' last bar changed, so a chart can
+cache its closed bars and rebuild only that bar's traces.
+
+`TickFeed` plays recorded or synthetic ticks as an async stream, paced at
+`speed` market seconds per wall second (or as fast as possible), and
+`StreamRunner` runs the ingestion loop on a background thread for Streamlit,
+optionally stopping it after a lifetime cap or once nobody is watching.
+
+Usage (throughput benchmark):
+    python -m finstat_common.streaming --symbols 50 --ticks 2000000 --interval 1m
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import uuid
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from finstat_common.incremental import IndicatorState
+from finstat_common.resample import INTERVAL_MINUTES, NSE_TZ, SESSION_CLOSE, SESSION_OPEN
+
+STREAM_INTERVALS = {"1m": 1, "5m": 5, **INTERVAL_MINUTES}
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+INDICATOR_COLUMNS = ["RSI", "MACD", "Signal", "Hist"]
+
+# IST has no daylight saving, so exchange wall time is a fixed offset from UTC
+IST_OFFSET_NS = pd.Timedelta(hours=5, minutes=30).value
+NS_PER_MINUTE = 60 * 10**9
+OPEN_MINUTE = int(pd.Timedelta(SESSION_OPEN + ":00").total_seconds()) // 60
+CLOSE_MINUTE = int(pd.Timedelta(SESSION_CLOSE + ":00").total_seconds()) // 60
+SESSION_SECONDS = (CLOSE_MINUTE - OPEN_MINUTE) * 60
+NO_BAR = np.iinfo(np.int64).min
+
+DEFAULT_MAX_BARS = 5_000
+DEFAULT_BATCH_SIZE = 5_000
+# Paced feeds release ticks in slices of this much wall time
+PACE_SECONDS = 0.1
+# Gaps between ticks longer than this (nights, weekends) are not waited out
+MAX_IDLE_SECONDS = 60.0
+# How often a StreamRunner checks its lifetime and idle limits
+WATCH_SECONDS = 0.5
+
+
+class TickBatch(NamedTuple):
+    symbol: np.ndarray
+    timestamp: np.ndarray
+    price: np.ndarray
+    size: np.ndarray
+
+
+class BarUpdate(NamedTuple):
+    ticks: int
+    dropped: int
+    changed: np.ndarray
+    closed: int
+
+
+def _take(batch: TickBatch, index) -> TickBatch:
+    return TickBatch(*(column[index] for column in batch))
+
+
+def concat_batches(batches: Iterable[TickBatch]) -> TickBatch:
+    return TickBatch(*(np.concatenate(columns) for columns in zip(*batches)))
+
+
+class CandleAggregator:
+    """Forming and closed OHLCV bars, with incremental RSI/MACD, for every symbol of a watchlist
+
+    `update` may be called from a feed thread while `bars`, `snapshot` and
+    `revision` are read from another; a lock covers each call.
+    """
+
+    def __init__(self, symbols: Sequence[str], interval: str = "1m", max_bars: int = DEFAULT_MAX_BARS):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.daily = interval == "1d"
+        self.width = 24 * 60 if self.daily else STREAM_INTERVALS[interval]
+        # Intraday buckets start at the session open, like resample_ohlcv
+        self.offset = 0 if self.daily else OPEN_MINUTE % self.width
+        n = len(self.symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._bucket = np.full(n, NO_BAR, dtype=np.int64)
+        self._active = np.zeros(n, dtype=bool)
+        self._bars = np.full((n, len(BAR_COLUMNS)), np.nan)
+        self._history = [deque(maxlen=max_bars) for _ in range(n)]
+        self._states = [IndicatorState() for _ in range(n)]
+        self._revision = np.zeros(n, dtype=np.int64)
+        self._counters = dict.fromkeys(("ticks", "dropped", "bars_closed"), 0)
+        self._lock = threading.Lock()
+
+    def buckets(self, timestamp: np.ndarray) -> tuple:
+        """(bar start in IST minutes since the epoch, in-session mask) for UTC ns timestamps"""
+        local = (timestamp + IST_OFFSET_NS) // NS_PER_MINUTE
+        minute = local % (24 * 60)
+        in_session = (minute >= OPEN_MINUTE) & (minute < CLOSE_MINUTE)
+        return (local - self.offset) // self.width * self.width + self.offset, in_session
+
+    def seed(self, symbol: str, bars: pd.DataFrame):
+        """Start `symbol` from stored bars of the same interval: closed history plus warmed RSI/MACD state
+
+        Ticks that fall inside the last stored bar are dropped; the first
+        live bar is the one after it. No bar is forming until that first
+        tick arrives.
+        """
+        i = self._index[symbol]
+        bars = bars[BAR_COLUMNS].dropna()
+        state, values = IndicatorState.warm(bars["Close"])
+        local = bars.index.tz_convert(NSE_TZ).tz_localize(None) if bars.index.tz is not None else bars.index
+        buckets = local.as_unit("ns").asi8 // NS_PER_MINUTE
+        rows = np.column_stack([bars.to_numpy(dtype=float), values.to_numpy(dtype=float)])
+        with self._lock:
+            history = self._history[i]
+            history.clear()
+            history.extend(zip(buckets.tolist(), *rows.T.tolist()))
+            self._states[i] = state
+            # Lower bound for live ticks; `_active` stays False, so the first bar there opens fresh
+            self._bucket[i] = buckets[-1] + self.width if len(buckets) else NO_BAR
+            self._active[i] = False
+            self._revision[i] += 1
+
+    def update(self, batch: TickBatch) -> BarUpdate:
+        """Fold a batch of ticks (any order) into the bars
+
+        Ticks outside the session or older than a symbol's forming bar are
+        dropped.
+        """
+        n_ticks = len(batch.price)
+        bucket, keep = self.buckets(batch.timestamp)
+        with self._lock:
+            keep &= bucket >= self._bucket[batch.symbol]
+            if not keep.all():
+                batch, bucket = _take(batch, keep), bucket[keep]
+            self._counters["ticks"] += n_ticks
+            self._counters["dropped"] += n_ticks - len(batch.price)
+            if not len(batch.price):
+                return BarUpdate(n_ticks, n_ticks, np.empty(0, dtype=np.int64), 0)
+
+            order = np.lexsort((batch.timestamp, batch.symbol))
+            symbol, bucket = batch.symbol[order], bucket[order]
+            price, size = batch.price[order], batch.size[order]
+
+            # One group per (symbol, bar) in time order
+            starts = np.flatnonzero(np.r_[True, (symbol[1:] != symbol[:-1]) | (bucket[1:] != bucket[:-1])])
+            ends = np.r_[starts[1:], len(price)]
+            groups = np.column_stack(
+                [
+                    price[starts],
+                    np.maximum.reduceat(price, starts),
+                    np.minimum.reduceat(price, starts),
+                    price[ends - 1],
+                    np.add.reduceat(size, starts),
+                ]
+            )
+            g_symbol, g_bucket = symbol[starts], bucket[starts]
+
+            # A group for a symbol's forming bar (at most one per symbol) merges into it
+            same = (g_bucket == self._bucket[g_symbol]) & self._active[g_symbol]
+            if same.any():
+                merge, bars = groups[same], self._bars[g_symbol[same]]
+                bars[:, 1] = np.maximum(bars[:, 1], merge[:, 1])
+                bars[:, 2] = np.minimum(bars[:, 2], merge[:, 2])
+                bars[:, 3] = merge[:, 3]
+                bars[:, 4] += merge[:, 4]
+                self._bars[g_symbol[same]] = bars
+
+            closed = 0
+            new = ~same
+            if new.any():
+                n_symbol, n_bucket, n_groups = g_symbol[new], g_bucket[new], groups[new]
+                first = np.r_[True, n_symbol[1:] != n_symbol[:-1]]
+                last = np.r_[n_symbol[1:] != n_symbol[:-1], True]
+
+                # The first later bar closes the forming one; all but the last new bar close too
+                closing = n_symbol[first]
+                closing = closing[self._active[closing]]
+                closed_symbol = np.r_[closing, n_symbol[~last]]
+                closed_bucket = np.r_[self._bucket[closing], n_bucket[~last]]
+                closed_bars = np.concatenate([self._bars[closing], n_groups[~last]])
+                for j in np.lexsort((closed_bucket, closed_symbol)):
+                    self._close(closed_symbol[j], closed_bucket[j], closed_bars[j])
+                closed = len(closed_symbol)
+                self._counters["bars_closed"] += closed
+
+                self._bucket[n_symbol[last]] = n_bucket[last]
+                self._bars[n_symbol[last]] = n_groups[last]
+                self._active[n_symbol[last]] = True
+
+            return BarUpdate(n_ticks, n_ticks - len(price), np.unique(g_symbol), closed)
+
+    def _close(self, i: int, bucket: int, bar: np.ndarray):
+        state = self._states[i]
+        close = bar[3]
+        self._history[i].append((int(bucket), *bar.tolist(), state.rsi.update(close), *state.macd.update(close)))
+        self._revision[i] += 1
+
+    def _times(self, buckets) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(np.asarray(buckets, dtype=np.int64) * NS_PER_MINUTE)
+        return index if self.daily else index.tz_localize(NSE_TZ)
+
+    def revision(self, symbol: str) -> int:
+        """Changes whenever `symbol` closes a bar or is reseeded (a cache key for its history)"""
+        return int(self._revision[self._index[symbol]])
+
+    def bars(self, symbol: str, last: Optional[int] = None, forming: bool = True) -> pd.DataFrame:
+        """The last `last` closed bars with RSI/MACD, plus the forming bar with preview values"""
+        i = self._index[symbol]
+        with self._lock:
+            history = self._history[i]
+            rows = list(islice(history, max(len(history) - last, 0), None)) if last else list(history)
+            if forming and self._active[i]:
+                state, bar = self._states[i], self._bars[i].tolist()
+                rows.append((int(self._bucket[i]), *bar, state.rsi.peek(bar[3]), *state.macd.peek(bar[3])))
+        frame = pd.DataFrame(rows, columns=["bucket", *BAR_COLUMNS, *INDICATOR_COLUMNS])
+        frame.index = self._times(frame.pop("bucket"))
+        return frame
+
+    def snapshot(self) -> pd.DataFrame:
+        """One row per symbol: forming bar, last price and change from the previous close"""
+        with self._lock:
+            bars = self._bars.copy()
+            active = self._active.copy()
+            previous = [history[-1][4] if history else np.nan for history in self._history]
+            times = self._times(np.where(active, self._bucket, 0))
+        frame = pd.DataFrame(bars, index=pd.Index(self.symbols, name="Symbol"), columns=BAR_COLUMNS)
+        frame.loc[~active] = np.nan
+        frame.insert(0, "Bar", np.where(active, times.astype(str), ""))
+        frame["Change %"] = (frame["Close"] / np.array(previous) - 1) * 100
+        return frame
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+def ticks_from_bars(bars: Dict[str, pd.DataFrame], interval: str, ticks_per_bar: int = 8, seed: int = 0) -> tuple:
+    """(symbols, ticks) that re-trace each bar open -> extremes -> close, for replaying history
+
+    Aggregating the ticks at `interval` reproduces the bars exactly. Ticks are
+    spread evenly over the in-session part of each bar and merged across
+    symbols in time order.
+    """
+    ticks_per_bar = max(ticks_per_bar, 4)
+    rng = np.random.default_rng(seed)
+    symbols, batches = list(bars), []
+    for i, frame in enumerate(bars.values()):
+        frame = frame[BAR_COLUMNS].dropna()
+        if frame.empty:
+            continue
+        local = frame.index.tz_convert(NSE_TZ).tz_localize(None) if frame.index.tz is not None else frame.index
+        start = local.as_unit("ns").asi8
+        if interval == "1d":
+            start = start + OPEN_MINUTE * NS_PER_MINUTE
+        minute = start // NS_PER_MINUTE % (24 * 60)
+        width = np.minimum(STREAM_INTERVALS[interval], CLOSE_MINUTE - minute) * NS_PER_MINUTE
+        steps = np.arange(ticks_per_bar) / ticks_per_bar
+        timestamp = start[:, None] + (width[:, None] * steps).astype(np.int64) - IST_OFFSET_NS
+
+        o, h, l, c, v = (frame[column].to_numpy(dtype=float)[:, None] for column in BAR_COLUMNS)
+        price = l + (h - l) * rng.random((len(frame), ticks_per_bar))
+        rising = (c >= o)[:, 0]
+        price[:, 0], price[:, -1] = o[:, 0], c[:, 0]
+        # Rising bars dip to the low first, falling bars reach the high first
+        price[:, 1] = np.where(rising, l[:, 0], h[:, 0])
+        price[:, -2] = np.where(rising, h[:, 0], l[:, 0])
+        size = np.repeat(v / ticks_per_bar, ticks_per_bar, axis=1)
+        batches.append(
+            TickBatch(np.full(price.size, i, dtype=np.int32), timestamp.ravel(), price.ravel(), size.ravel())
+        )
+    if not batches:
+        return symbols, TickBatch(np.empty(0, np.int32), np.empty(0, np.int64), np.empty(0), np.empty(0))
+    ticks = concat_batches(batches)
+    return symbols, _take(ticks, np.argsort(ticks.timestamp, kind="stable"))
+
+
+def simulate_ticks(
+    prices: Sequence[float],
+    start,
+    rate: float = 1_000.0,
+    chunk_seconds: float = 1.0,
+    volatility: float = 2e-4,
+    seed: int = 0,
+) -> Iterator[TickBatch]:
+    """Endless random-walk ticks for len(prices) symbols, `rate` per market second in total
+
+    Market time runs through consecutive weekday sessions (09:15–15:30 IST)
+    from the session date `start`. Each chunk covers `chunk_seconds`.
+    """
+    rng = np.random.default_rng(seed)
+    log_price = np.log(np.asarray(prices, dtype=float))
+    first_day = np.datetime64(pd.Timestamp(start).date(), "D")
+    elapsed = 0.0
+    while True:
+        n = rng.poisson(rate * chunk_seconds)
+        seconds = elapsed + np.sort(rng.uniform(0, chunk_seconds, n))
+        elapsed += chunk_seconds
+        symbol = rng.integers(0, len(log_price), n, dtype=np.int32)
+        steps = rng.normal(0, volatility, n)
+
+        # Random walk per symbol, continuing from its last price
+        order = np.argsort(symbol, kind="stable")
+        sorted_symbol, sorted_steps = symbol[order], steps[order]
+        path = np.cumsum(sorted_steps)
+        starts = np.flatnonzero(np.r_[True, sorted_symbol[1:] != sorted_symbol[:-1]]) if n else np.empty(0, int)
+        path -= np.repeat(path[starts] - sorted_steps[starts], np.diff(np.r_[starts, n]))
+        path += log_price[sorted_symbol]
+        walk = np.empty(n)
+        walk[order] = path
+        if n:
+            last = np.r_[starts[1:], n] - 1
+            log_price[sorted_symbol[last]] = path[last]
+
+        day, within = np.divmod(seconds, SESSION_SECONDS)
+        dates = np.busday_offset(first_day, day.astype(np.int64), roll="forward")
+        local = dates.astype("datetime64[ns]").astype(np.int64) + OPEN_MINUTE * NS_PER_MINUTE + (within * 1e9).astype(np.int64)
+        size = rng.integers(1, 500, n).astype(float)
+        yield TickBatch(symbol, local - IST_OFFSET_NS, np.round(np.exp(walk), 2), size)
+
+
+def write_ticks(path: Path, symbols: Sequence[str], ticks: TickBatch):
+    """Record ticks as Parquet (timestamp, symbol, price, size) for later replay"""
+    frame = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(ticks.timestamp, utc=True),
+            "symbol": pd.Categorical.from_codes(ticks.symbol, categories=list(symbols)),
+            "price": ticks.price,
+            "size": ticks.size,
+        }
+    )
+    frame.to_parquet(path, index=False)
+
+
+def read_ticks(path: Path) -> tuple:
+    """(symbols, ticks) from a file written by `write_ticks`, in time order"""
+    frame = pd.read_parquet(path).sort_values("timestamp", kind="stable")
+    symbol = frame["symbol"].astype("category")
+    ticks = TickBatch(
+        symbol.cat.codes.to_numpy(dtype=np.int32),
+        frame["timestamp"].dt.tz_convert("UTC").dt.tz_localize(None).astype("datetime64[ns]").to_numpy().astype(np.int64),
+        frame["price"].to_numpy(dtype=float),
+        frame["size"].to_numpy(dtype=float),
+    )
+    return list(symbol.cat.categories), ticks
+
+
+class TickFeed:
+    """Async stream of tick batches for `symbols` from time-ordered chunks
+
+    With `speed=None` batches of `batch_size` go out as fast as they are
+    consumed. Otherwise each slice of PACE_SECONDS wall time is released
+    when its first tick is due at `speed` market seconds per wall second;
+    idle market time (nights, weekends) is skipped.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        chunks: Iterable[TickBatch],
+        speed: Optional[float] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        self.symbols = list(symbols)
+        self.chunks = chunks
+        self.speed = speed
+        self.batch_size = batch_size
+
+    def __aiter__(self):
+        return self._batches()
+
+    async def _batches(self):
+        wall_start, market, previous = time.monotonic(), 0.0, None
+        for chunk in self.chunks:
+            timestamp, i = chunk.timestamp, 0
+            while i < len(timestamp):
+                if self.speed is None:
+                    j = min(i + self.batch_size, len(timestamp))
+                    await asyncio.sleep(0)
+                else:
+                    window = int(self.speed * PACE_SECONDS * 1e9)
+                    j = min(int(np.searchsorted(timestamp, timestamp[i] + window)), i + self.batch_size)
+                    j = max(j, i + 1)
+                    if previous is not None:
+                        market += min((timestamp[i] - previous) / 1e9, MAX_IDLE_SECONDS)
+                    previous = timestamp[j - 1]
+                    delay = market / self.speed - (time.monotonic() - wall_start)
+                    await asyncio.sleep(max(delay, 0))
+                    market += (timestamp[j - 1] - timestamp[i]) / 1e9
+                yield _take(chunk, slice(i, j))
+                i = j
+
+
+async def run_feed(
+    feed: TickFeed, aggregator: CandleAggregator, on_update: Optional[Callable[[BarUpdate], None]] = None
+) -> int:
+    """Ingestion loop: fold every batch from `feed` into `aggregator`; returns the ticks consumed"""
+    if feed.symbols != aggregator.symbols:
+        raise ValueError("Feed and aggregator must list the same symbols in the same order")
+    total = 0
+    async for batch in feed:
+        update = aggregator.update(batch)
+        total += update.ticks
+        if on_update is not None:
+            on_update(update)
+    return total
+
+
+class StreamRunner:
+    """Runs `run_feed` on a daemon thread with its own event loop until the feed ends or `stop` is called
+
+    An endless feed can be bounded with `max_seconds` (wall time since
+    `start`) and `idle_seconds` (wall time since the last `touch`, for a
+    viewer that went away without calling `stop`); `stop_reason` says which
+    limit ended the stream. `id` is unique per runner, for cache keys.
+    """
+
+    def __init__(
+        self,
+        feed: TickFeed,
+        aggregator: CandleAggregator,
+        max_seconds: Optional[float] = None,
+        idle_seconds: Optional[float] = None,
+    ):
+        self.feed = feed
+        self.aggregator = aggregator
+        self.max_seconds = max_seconds
+        self.idle_seconds = idle_seconds
+        self.id = uuid.uuid4().hex
+        self.error: Optional[BaseException] = None
+        self.stop_reason: Optional[str] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._seen = time.monotonic()
+        self._loop = asyncio.new_event_loop()
+        self._task = None
+        self._thread = None
+
+    def start(self) -> "StreamRunner":
+        self._task = self._loop.create_task(self._main())
+        self._thread = threading.Thread(target=self._run, name="tick-stream", daemon=True)
+        self.started = self._seen = time.monotonic()
+        self._thread.start()
+        return self
+
+    def touch(self):
+        """Mark the stream as watched, resetting the `idle_seconds` clock"""
+        self._seen = time.monotonic()
+
+    def _expired(self) -> Optional[str]:
+        now = time.monotonic()
+        if self.max_seconds is not None and now - self.started > self.max_seconds:
+            return f"time limit of {self.max_seconds:,.0f}s reached"
+        if self.idle_seconds is not None and now - self._seen > self.idle_seconds:
+            return f"not viewed for {self.idle_seconds:,.0f}s"
+        return None
+
+    async def _main(self) -> int:
+        ingest = asyncio.ensure_future(run_feed(self.feed, self.aggregator))
+        while not ingest.done():
+            reason = self._expired()
+            if reason is not None:
+                self.stop_reason = reason
+                ingest.cancel()
+                break
+            await asyncio.wait({ingest}, timeout=WATCH_SECONDS)
+        return await ingest
+
+    def _run(self):
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.error = e
+        finally:
+            # `stop` cancels the watcher while it waits; cancel the ingestion task with it
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.finished = time.monotonic()
+            self._loop.close()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, timeout: float = 2.0):
+        if self.running:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                # The loop closed between the check and the call
+                pass
+            self._thread.join(timeout)
+
+    def rate(self) -> float:
+        """Ticks ingested per wall-clock second since `start`"""
+        if self.started is None:
+            return 0.0
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.aggregator.stats()["ticks"] / elapsed if elapsed > 0 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tick-to-candle aggregation throughput benchmark")
+    parser.add_argument("--symbols", type=int, default=50, help="Watchlist size")
+    parser.add_argument("--ticks", type=int, default=2_000_000, help="Simulated ticks to ingest")
+    parser.add_argument("--interval", choices=list(STREAM_INTERVALS), default="1m")
+    parser.add_argument("--rate", type=float, default=2_000, help="Simulated ticks per market second")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Ticks per feed batch")
+    parser.add_argument("--replay", type=Path, default=None, help="Replay recorded ticks (Parquet) instead")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        symbols, ticks = read_ticks(args.replay)
+    else:
+        symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+        chunks, total = [], 0
+        for chunk in simulate_ticks(np.full(args.symbols, 100.0), "2026-01-05", args.rate, chunk_seconds=10.0):
+            chunks.append(chunk)
+            total += len(chunk.price)
+            if total >= args.ticks:
+                break
+        ticks = _take(concat_batches(chunks), slice(0, args.ticks))
+
+    aggregator = CandleAggregator(symbols, args.interval)
+    start = time.perf_counter()
+    total = asyncio.run(run_feed(TickFeed(symbols, [ticks], batch_size=args.batch_size), aggregator))
+    elapsed = time.perf_counter() - start
+    stats = aggregator.stats()
+    print(
+        f"{total:,} ticks for {len(symbols):,} symbols in {elapsed:.2f}s ({total / elapsed:,.0f} ticks/s); "
+        f"{stats['bars_closed']:,} bars closed, {stats['dropped']:,} ticks dropped"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Columnar fundamentals warehouse for cross-sectional screening.
+
+`FundamentalsWarehouse.ingest` pulls statements for a list of tickers (for
+example an index's constituents) through the fundamentals cache with a
+bounded thread pool. For each ticker it writes one long-format Parquet part
+with columns (ticker, freq, period, item, value) and normalized line-item
+names. A ticker that already has a part is skipped, so an interrupted run
+picks up where it stopped. A ticker whose statements came back empty (no
+data, or a throttled request) gets no part and is retried next run.
+
+`compact` merges the parts into a single line-item table, pivots the whole
+universe once and precomputes every ratio (plus the canonical line items
+from `ratios.LINE_ITEM_ALIASES`) into a screening table. `screen` filters
+and ranks that table in memory. A query over thousands of tickers is a boolean
+mask and a sort, with no reshaping or I/O.
+
+Usage:
+    python -m finstat_common.warehouse ingest ind_nifty500list.csv --workers 8
+    python -m finstat_common.warehouse screen "current_ratio > 1.5 and debt_to_equity < 0.5" --sort working_capital
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from finstat_common.fundamentals_cache import FundamentalsCache, get_fundamentals_cache, statement_freq
+from finstat_common.ohlcv_store import default_root, write_atomic
+from finstat_common.ratios import INDEX_NAMES, LINE_ITEM_ALIASES, compute_ratios, flatten_statements, widen
+
+DEFAULT_FIELDS = ("balance_sheet", "quarterly_balance_sheet")
+DEFAULT_WORKERS = 8
+
+LINE_ITEM_SCHEMA = pa.schema(
+    [
+        ("ticker", pa.string()),
+        ("freq", pa.string()),
+        ("period", pa.timestamp("ns")),
+        ("item", pa.string()),
+        ("value", pa.float64()),
+    ]
+)
+
+
+class IngestReport(NamedTuple):
+    ingested: List[str]
+    skipped: List[str]
+    failed: Dict[str, str]
+    # Fetched without error but with no line items; retried on the next run
+    empty: List[str]
+
+
+def read_constituents(path: Path, suffix: str = ".NS") -> List[str]:
+    """Tickers from an index constituents file
+
+    Accepts NSE's published CSVs (a "Symbol" column) or a plain list with
+    one symbol per line. Symbols without an exchange suffix get `suffix`.
+    """
+    path = Path(path)
+    lines = [line.strip() for line in path.read_text().splitlines() if line.strip()]
+    if lines and "," in lines[0]:
+        symbols = pd.read_csv(path)["Symbol"].astype(str).str.strip().tolist()
+    else:
+        symbols = lines
+    return [s.upper() if "." in s else f"{s.upper()}{suffix}" for s in symbols]
+
+
+class FundamentalsWarehouse:
+    """Local Parquet warehouse of normalized statements and precomputed ratios
+
+    Statements are read through `cache` (the shared fundamentals cache by
+    default), so ingestion reuses anything the apps have already fetched.
+    """
+
+    def __init__(self, root: Optional[Path] = None, cache: Optional[FundamentalsCache] = None):
+        if cache is None:
+            cache = FundamentalsCache(root) if root is not None else get_fundamentals_cache()
+        self.root = (Path(root) if root is not None else default_root()) / "warehouse"
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._table = None
+        self._version = None
+        self._snapshots = {}
+
+    @property
+    def parts_dir(self) -> Path:
+        return self.root / "parts"
+
+    @property
+    def line_items_path(self) -> Path:
+        return self.root / "line_items.parquet"
+
+    @property
+    def screen_path(self) -> Path:
+        return self.root / "screen.parquet"
+
+    def part_path(self, ticker: str) -> Path:
+        return self.parts_dir / f"{ticker.upper()}.parquet"
+
+    def ingest_ticker(self, ticker: str, fields: Iterable[str] = DEFAULT_FIELDS) -> int:
+        """Fetch one ticker's statements and write its part; returns the number of line-item rows
+
+        Nothing is written when no line items came back, so the ticker is
+        not mistaken for done on a resumed run.
+        """
+        frames = []
+        for freq in ("annual", "quarterly"):
+            # Inline refreshes, so the caller's pool is the only concurrency
+            parts = [self.cache.get(ticker, field, background=False) for field in fields if statement_freq(field) == freq]
+            frames.append(flatten_statements({ticker.upper(): parts}, freq))
+        long = pd.concat(frames, ignore_index=True)
+        if long.empty:
+            return 0
+
+        table = pa.Table.from_pandas(long, schema=LINE_ITEM_SCHEMA, preserve_index=False)
+        write_atomic(self.part_path(ticker), lambda tmp: pq.write_table(table, tmp))
+        return len(long)
+
+    def ingest(
+        self,
+        tickers: Iterable[str],
+        fields: Iterable[str] = DEFAULT_FIELDS,
+        max_workers: int = DEFAULT_WORKERS,
+        refresh: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> IngestReport:
+        """Ingest every ticker without a part (all of them with `refresh`), then compact
+
+        At most `max_workers` tickers are fetched at once. Failures and
+        tickers that returned no line items are reported separately and left
+        without a part, so the next run retries them.
+        """
+        fields = tuple(fields)
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        pending = [t for t in tickers if refresh or not self.part_path(t).exists()]
+        skipped = [t for t in tickers if t not in set(pending)]
+
+        ingested, empty, failed = [], [], {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warehouse-ingest") as pool:
+            futures = {pool.submit(self.ingest_ticker, ticker, fields): ticker for ticker in pending}
+            for done, future in enumerate(as_completed(futures), start=1):
+                ticker = futures[future]
+                try:
+                    (ingested if future.result() else empty).append(ticker)
+                except Exception as e:
+                    failed[ticker] = str(e)
+                if progress is not None:
+                    progress(done, len(pending))
+
+        if ingested or not self.screen_path.exists():
+            self.compact()
+        return IngestReport(ingested, skipped, failed, empty)
+
+    def compact(self) -> int:
+        """Merge all parts into the line-item table and rebuild the screening table"""
+        parts = sorted(self.parts_dir.glob("*.parquet"))
+        tables = [pq.read_table(path, schema=LINE_ITEM_SCHEMA) for path in parts]
+        line_items = pa.concat_tables(tables) if tables else LINE_ITEM_SCHEMA.empty_table()
+        line_items = line_items.sort_by([("ticker", "ascending"), ("freq", "ascending"), ("period", "ascending")])
+        write_atomic(self.line_items_path, lambda tmp: pq.write_table(line_items, tmp))
+
+        long = line_items.to_pandas()
+        if long.empty:
+            screen = pd.DataFrame(columns=INDEX_NAMES)
+        else:
+            # One pivot for the whole universe; parts only hold flat rows
+            wide = widen(long)
+            ratios = compute_ratios(wide)
+            # Free cash flow is both a line item and a ratio; the ratio (with its fallback) wins
+            items = wide.reindex(columns=[name for name in LINE_ITEM_ALIASES if name not in ratios.columns])
+            screen = pd.concat([ratios, items], axis=1).reset_index()
+        write_atomic(self.screen_path, lambda tmp: screen.to_parquet(tmp, index=False))
+        return line_items.num_rows
+
+    def line_items(self, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Long line-item rows, optionally for some tickers only (read with a predicate pushdown)"""
+        filters = [("ticker", "in", [t.upper() for t in tickers])] if tickers is not None else None
+        return pq.read_table(self.line_items_path, filters=filters).to_pandas()
+
+    def table(self) -> pd.DataFrame:
+        """Ratios and canonical line items for every (ticker, freq, period), reloaded when compacted"""
+        version = self.screen_path.stat().st_mtime_ns if self.screen_path.exists() else None
+        with self._lock:
+            if version != self._version:
+                self._table = pd.read_parquet(self.screen_path) if version is not None else pd.DataFrame(columns=INDEX_NAMES)
+                self._version = version
+                self._snapshots = {}
+            return self._table
+
+    def snapshot(self, freq: str = "quarterly", period=None) -> pd.DataFrame:
+        """One row per ticker: its latest `freq` period, or the given period end"""
+        table = self.table()
+        if period is not None:
+            rows = table[(table["freq"] == freq) & (table["period"] == pd.Timestamp(period))]
+            return rows.set_index("ticker")
+
+        with self._lock:
+            if freq not in self._snapshots:
+                rows = table[table["freq"] == freq]
+                # The table is sorted by (ticker, freq, period), so the last row per ticker is the latest
+                self._snapshots[freq] = rows[~rows["ticker"].duplicated(keep="last")].set_index("ticker")
+            return self._snapshots[freq]
+
+    def screen(
+        self,
+        where: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        ascending: bool = False,
+        freq: str = "quarterly",
+        period=None,
+        limit: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Filter and rank tickers on ratios and canonical line items
+
+        `where` is a `DataFrame.query` expression over the snapshot columns,
+        e.g. "current_ratio > 1.5 and debt_to_equity < 0.5". Rows whose sort
+        value is missing go last.
+        """
+        rows = self.snapshot(freq, period)
+        if where:
+            rows = rows.query(where)
+        if sort_by:
+            rows = rows.sort_values(sort_by, ascending=ascending, na_position="last")
+        return rows.head(limit) if limit else rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk fundamentals warehouse for cross-sectional screening")
+    parser.add_argument("--root", type=Path, default=None, help="Data directory (default: FINSTAT_DATA_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Fetch statements for every constituent into the warehouse")
+    ingest.add_argument("constituents", type=Path, help="Index constituents CSV (Symbol column) or one ticker per line")
+    ingest.add_argument("--fields", nargs="+", default=list(DEFAULT_FIELDS), help="Statement fields to ingest")
+    ingest.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Tickers fetched concurrently")
+    ingest.add_argument("--refresh", action="store_true", help="Re-ingest tickers that already have a part")
+
+    screen = commands.add_parser("screen", help="Filter and rank the latest period of every ticker")
+    screen.add_argument("where", nargs="?", default=None, help='e.g. "current_ratio > 1.5 and debt_to_equity < 0.5"')
+    screen.add_argument("--sort", default=None, help="Column to rank by")
+    screen.add_argument("--ascending", action="store_true", help="Rank smallest first")
+    screen.add_argument("--freq", choices=["annual", "quarterly"], default="quarterly")
+    screen.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    warehouse = FundamentalsWarehouse(args.root)
+    start = time.perf_counter()
+    if args.command == "ingest":
+        tickers = read_constituents(args.constituents)
+        report = warehouse.ingest(
+            tickers,
+            args.fields,
+            args.workers,
+            args.refresh,
+            progress=lambda done, total: print(f"\r{done:,}/{total:,} tickers", end="", flush=True),
+        )
+        print(
+            f"\nIngested {len(report.ingested):,}, skipped {len(report.skipped):,}, "
+            f"no data {len(report.empty):,}, failed {len(report.failed):,} "
+            f"in {time.perf_counter() - start:.1f}s -> {warehouse.root}"
+        )
+        if report.empty:
+            print(f"  No statements (retried next run): {', '.join(sorted(report.empty))}")
+        for ticker, error in sorted(report.failed.items()):
+            print(f"  {ticker}: {error}")
+    else:
+        warehouse.table()
+        start = time.perf_counter()
+        result = warehouse.screen(args.where, args.sort, args.ascending, args.freq, limit=args.limit)
+        elapsed = time.perf_counter() - start
+        print(result.to_string())
+        print(f"{len(result):,} rows in {elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,28 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import mplfinance as mpf
-import matplotlib.pyplot as plt
-from io import BytesIO
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from finstat_common.fundamentals_cache import get_fundamentals_cache
+from finstat_common.incremental import INCREMENTAL_SPECS, spec_values
+from finstat_common.indicators import compute
+from finstat_common.instrument import add_collector, debug_panel, miss, span, start_rerun, traced
+from finstat_common.ohlcv_store import get_store
+from finstat_common.providers import DEFAULT_PROVIDER, describe, get_provider
+from finstat_common.ratios import RATIO_GROUPS, compute_ratios, stack_statements, tidy
+from loader import load_concurrently
+from render_cache import EXPORT_DPI, SCREEN_DPI, RenderCache, render_png
 
 st.set_page_config(
     page_title="OHLC Fundamentals Plot",
     page_icon="📊",
     layout="wide"
 )
+start_rerun("ohlc-fundamentals-plot")
 
 st.title("📊 OHLC Fundamentals Plot")
 st.caption("Combine Technical OHLC Charts with Fundamental Balance Sheet Metrics")
@@ -27,29 +39,139 @@ timeframe = st.sidebar.selectbox(
     index=1
 )
 
+# Chart indicators as finstat_common.indicators specs; overlays share the
+# price panel, oscillators get a panel of their own below volume
+PRICE_OVERLAYS = {
+    "SMA 20": "sma_20",
+    "SMA 50": "sma_50",
+    "EMA 20": "ema_20",
+    "Bollinger Bands (20, 2)": "bbands_20_2",
+    "VWAP": "vwap"
+}
+OSCILLATORS = {
+    "RSI (14)": "rsi_14",
+    "ATR (14)": "atr_14",
+    "Stochastic (14, 3)": "stoch_14_3",
+    "OBV": "obv"
+}
+
+chart_style = st.sidebar.selectbox(
+    "Chart style",
+    ["yahoo", "charles", "binance", "classic", "nightclouds"],
+    index=0
+)
+
+selected_indicators = st.sidebar.multiselect(
+    "Chart indicators",
+    list(PRICE_OVERLAYS) + list(OSCILLATORS),
+    default=["SMA 20", "SMA 50"]
+)
+
 st.sidebar.info(
     "Examples: RELIANCE.NS, HDFCBANK.NS, INFY.NS, TCS.NS, TATAMOTORS.NS"
 )
 
-@st.cache_data(show_spinner=True)
+if get_provider().name != DEFAULT_PROVIDER:
+    st.sidebar.caption(f"🧪 Data provider: {describe(get_provider())} (set by FINSTAT_PROVIDER)")
+
+# Per-call timeouts (seconds) for the concurrent loads below
+LOAD_TIMEOUTS = {
+    "price": 30,
+    "balance_sheet": 15,
+    "quarterly_balance_sheet": 15,
+    "income_stmt": 15,
+    "quarterly_income_stmt": 15,
+    "cashflow": 15,
+    "quarterly_cashflow": 15,
+    "info": 10
+}
+
+# Statements stacked per frequency for the ratio engine
+STATEMENTS = {
+    "annual": ["balance_sheet", "income_stmt", "cashflow"],
+    "quarterly": ["quarterly_balance_sheet", "quarterly_income_stmt", "quarterly_cashflow"]
+}
+
+# Line items shown in the balance-sheet tables
+BALANCE_ITEMS = [
+    "total_assets", "total_liabilities", "equity", "total_debt", "cash",
+    "current_assets", "current_liabilities", "inventory"
+]
+
+RATIO_LABELS = {
+    "current_ratio": "Current Ratio",
+    "quick_ratio": "Quick Ratio",
+    "cash_ratio": "Cash Ratio",
+    "working_capital": "Working Capital",
+    "debt_to_equity": "Debt-to-Equity",
+    "debt_to_assets": "Debt-to-Assets",
+    "equity_ratio": "Equity Ratio",
+    "net_debt": "Net Debt",
+    "gross_margin": "Gross Margin",
+    "operating_margin": "Operating Margin",
+    "net_margin": "Net Margin",
+    "roe": "ROE",
+    "roce": "ROCE",
+    "free_cash_flow": "Free Cash Flow",
+    "fcf_margin": "FCF Margin"
+}
+
+# Ratios shown as percentages, and amounts shown in rupees rather than as multiples
+PERCENT_RATIOS = {"gross_margin", "operating_margin", "net_margin", "roe", "roce", "fcf_margin"}
+AMOUNT_RATIOS = {"working_capital", "net_debt", "free_cash_flow"}
+
+@traced("load_price_data", cache=st.cache_data(show_spinner=False))
 def load_price_data(ticker: str, period: str) -> pd.DataFrame:
     """Load historical OHLC price data"""
-    df = yf.download(ticker, period=period, auto_adjust=False)
-    df.dropna(inplace=True)
-    return df
-
-@st.cache_data(show_spinner=True)
-def load_fundamentals(ticker: str):
-    """Load balance sheet fundamental data"""
-    stock = yf.Ticker(ticker)
-    
-    # Get balance sheet
-    balance_sheet = stock.balance_sheet
-    
-    # Get quarterly balance sheet for more recent data
-    quarterly_bs = stock.quarterly_balance_sheet
-    
-    return balance_sheet, quarterly_bs, stock.info
+    df = get_store().read(ticker, period, "1d", auto_adjust=False)
+    return df.dropna()
+
+@traced("load_fundamental", cache=st.cache_data(show_spinner=False, ttl=10 * 60))
+def load_fundamental(ticker: str, field: str):
+    """Load one fundamentals field (a statement or info) from the shared on-disk cache"""
+    return get_fundamentals_cache().get(ticker, field)
+
+@st.cache_resource
+def get_io_pool() -> ThreadPoolExecutor:
+    """Shared pool for data loads; a call that times out keeps running and fills the caches for the next rerun"""
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="finstat-io")
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    """Rendered chart images, shared by every session"""
+    return RenderCache()
+
+@traced("load_indicators", cache=st.cache_data(show_spinner=False))
+def load_indicators(ticker: str, period: str, specs: tuple) -> pd.DataFrame:
+    """Selected indicators computed in one batch pass over the price data
+
+    RSI comes from the store, which only advances it over new bars.
+    """
+    df = load_price_data(ticker, period)
+    values = compute(df, [spec for spec in specs if spec not in INCREMENTAL_SPECS])
+    incremental = [spec for spec in specs if spec in INCREMENTAL_SPECS]
+    if incremental:
+        frame = get_store().read_indicators(ticker, period, "1d", auto_adjust=False)
+        values.update(spec_values(frame, df.index, incremental))
+    return pd.DataFrame(values, index=df.index)
+
+def indicator_addplots(indicators: pd.DataFrame) -> list:
+    """mplfinance addplots: overlays on the price panel, one panel per oscillator"""
+    labels = {**PRICE_OVERLAYS, **OSCILLATORS}
+    addplots = []
+    next_panel = 2  # 0 = price, 1 = volume
+    for name in selected_indicators:
+        spec = labels[name]
+        columns = [c for c in indicators.columns if c == spec or c.startswith(spec + "_")]
+        columns = [c for c in columns if indicators[c].notna().any()]
+        if not columns:
+            continue
+        if spec in OSCILLATORS.values():
+            panel, next_panel = next_panel, next_panel + 1
+            addplots.append(mpf.make_addplot(indicators[columns], panel=panel, ylabel=name.split(" ")[0], width=1))
+        else:
+            addplots.append(mpf.make_addplot(indicators[columns], panel=0, width=1))
+    return addplots
 
 def format_number(num):
     """Format large numbers for readability"""
@@ -64,26 +186,51 @@ def format_number(num):
     else:
         return f"₹{num:,.0f}"
 
+def format_ratio(name: str, value) -> str:
+    if pd.isna(value):
+        return "N/A"
+    if name in PERCENT_RATIOS:
+        return f"{value:.1%}"
+    if name in AMOUNT_RATIOS:
+        return format_number(value)
+    return f"{value:.2f}"
+
+def ratio_status(value, threshold: float, good: str, bad: str, higher_is_better: bool = True) -> str:
+    if pd.isna(value):
+        return "N/A"
+    return good if (value > threshold) == higher_is_better else bad
+
 if not ticker:
     st.warning("⚠️ Enter a valid NSE ticker symbol to view analysis.")
     st.stop()
 
-# Load data
-try:
-    with st.spinner("🔄 Fetching price data..."):
-        df = load_price_data(ticker, timeframe)
-    
-    with st.spinner("🔄 Loading fundamental data..."):
-        balance_sheet, quarterly_bs, info = load_fundamentals(ticker)
-        
-    if df.empty:
-        st.error("❌ No price data returned. Check ticker symbol or timeframe.")
-        st.stop()
-        
-except Exception as e:
-    st.error(f"❌ Error loading data: {str(e)}")
+# Load price data and each fundamentals field concurrently, so the wait is
+# the slowest single call rather than the sum of all of them
+with st.spinner("🔄 Fetching price and fundamental data..."):
+    calls = {name: (load_fundamental, (ticker, name)) for name in LOAD_TIMEOUTS if name != "price"}
+    calls["price"] = (load_price_data, (ticker, timeframe))
+    with span("load_all"):
+        results, errors = load_concurrently(get_io_pool(), calls, LOAD_TIMEOUTS)
+
+if "price" in errors:
+    st.error(f"❌ Error loading data: {errors['price']}")
     st.stop()
 
+df = results["price"]
+if df.empty:
+    st.error("❌ No price data returned. Check ticker symbol or timeframe.")
+    st.stop()
+
+# Fundamentals are optional: anything that failed or timed out degrades to empty
+balance_sheet = results.get("balance_sheet", pd.DataFrame())
+info = results.get("info", {})
+fundamental_errors = {name: error for name, error in errors.items() if name != "price"}
+if fundamental_errors:
+    st.warning(
+        "⚠️ Some fundamental data is unavailable right now (showing the price chart anyway): "
+        + "; ".join(f"{name.replace('_', ' ')} {error}" for name, error in fundamental_errors.items())
+    )
+
 # Display company info
 st.subheader(f"🏢 {info.get('longName', ticker)}")
 
@@ -122,30 +269,40 @@ st.divider()
 st.subheader("🝯️ OHLC Candlestick Chart")
 
 try:
-    # Create mplfinance chart
-    fig, axes = mpf.plot(
-        df,
-        type='candle',
-        style='yahoo',
-        title=f'{ticker} - {timeframe}',
-        volume=True,
-        ylabel='Price (₹)',
-        ylabel_lower='Volume',
-        figsize=(14, 8),
-        returnfig=True
-    )
-    
-    # Display the chart in Streamlit
-    st.pyplot(fig)
-    
-    # Add download button for the chart
-    buf = BytesIO()
-    fig.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-    buf.seek(0)
-    
+    specs = tuple({**PRICE_OVERLAYS, **OSCILLATORS}[name] for name in selected_indicators)
+    data_version = (len(df), str(df.index[-1]))
+    chart_key = (ticker, timeframe, chart_style, specs, data_version)
+
+    def render_chart(dpi: int) -> bytes:
+        # Only runs on a cache miss, so indicator panels are built lazily too
+        miss()
+        addplots = indicator_addplots(load_indicators(ticker, timeframe, specs)) if specs else []
+        with span("render_png"):
+            return render_png(
+                df,
+                dpi,
+                type='candle',
+                style=chart_style,
+                title=f'{ticker} - {timeframe}',
+                volume=True,
+                ylabel='Price (₹)',
+                ylabel_lower='Volume',
+                figsize=(14, 8 + 2 * sum(ap['panel'] > 1 for ap in addplots)),
+                addplot=addplots
+            )
+
+    # Display the cached screen-resolution image
+    render_cache = get_render_cache()
+    add_collector("render_cache", render_cache.stats)
+    with span("chart_image", cached=True):
+        image = render_cache.get_or_render(chart_key + (SCREEN_DPI,), lambda: render_chart(SCREEN_DPI))
+    with span("st_image"):
+        st.image(image, use_container_width=True)
+
+    # The 300 DPI export is rendered only when the button is clicked
     st.download_button(
         label="💾 Download Chart as PNG",
-        data=buf,
+        data=lambda: render_cache.get_or_render(chart_key + (EXPORT_DPI,), lambda: render_chart(EXPORT_DPI)),
         file_name=f"{ticker}_ohlc_chart.png",
         mime="image/png"
     )
@@ -160,25 +317,25 @@ st.subheader("💼 Balance Sheet Metrics")
 
 if not balance_sheet.empty:
     try:
-        # Get the most recent balance sheet data
-        latest_bs = balance_sheet.iloc[:, 0]
-        
-        # Extract key metrics
-        total_assets = latest_bs.get('Total Assets', np.nan)
-        total_liabilities = latest_bs.get('Total Liabilities Net Minority Interest', np.nan)
-        stockholders_equity = latest_bs.get('Stockholders Equity', np.nan)
-        current_assets = latest_bs.get('Current Assets', np.nan)
-        current_liabilities = latest_bs.get('Current Liabilities', np.nan)
-        total_debt = latest_bs.get('Total Debt', np.nan)
-        cash = latest_bs.get('Cash And Cash Equivalents', np.nan)
-        inventory = latest_bs.get('Inventory', np.nan)
-        
-        # Calculate derived metrics
-        working_capital = current_assets - current_liabilities if not pd.isna(current_assets) and not pd.isna(current_liabilities) else np.nan
-        current_ratio = current_assets / current_liabilities if not pd.isna(current_assets) and not pd.isna(current_liabilities) and current_liabilities != 0 else np.nan
-        quick_ratio = (current_assets - inventory) / current_liabilities if not pd.isna(current_assets) and not pd.isna(inventory) and not pd.isna(current_liabilities) and current_liabilities != 0 else np.nan
-        debt_to_equity = total_debt / stockholders_equity if not pd.isna(total_debt) and not pd.isna(stockholders_equity) and stockholders_equity != 0 else np.nan
-        
+        # Every ratio for every annual and quarterly period in one vectorized pass
+        with span("ratios"):
+            line_items = {
+                freq: stack_statements({ticker: [results.get(name) for name in names]}, freq)
+                for freq, names in STATEMENTS.items()
+            }
+            ratios = compute_ratios(pd.concat(line_items.values()))
+            ratio_trends = tidy(ratios)
+
+        # Most recent annual period with balance-sheet figures; the income statement
+        # or cash flow can report a newer fiscal year before the balance sheet does
+        annual = line_items["annual"]
+        reported = annual.dropna(how="all", subset=[name for name in BALANCE_ITEMS if name in annual.columns])
+        latest = (reported if not reported.empty else annual).iloc[-1]
+        latest_ratios = ratios.loc[latest.name]
+
+        def item(name):
+            return latest.get(name, np.nan)
+
         # Display metrics in columns
         col1, col2, col3 = st.columns(3)
         
@@ -193,11 +350,11 @@ if not balance_sheet.empty:
                     "Cash & Equivalents"
                 ],
                 "Value": [
-                    format_number(total_assets),
-                    format_number(total_liabilities),
-                    format_number(stockholders_equity),
-                    format_number(total_debt),
-                    format_number(cash)
+                    format_number(item("total_assets")),
+                    format_number(item("total_liabilities")),
+                    format_number(item("equity")),
+                    format_number(item("total_debt")),
+                    format_number(item("cash"))
                 ]
             }
             st.dataframe(pd.DataFrame(metrics_data), use_container_width=True, hide_index=True)
@@ -212,16 +369,17 @@ if not balance_sheet.empty:
                     "Inventory"
                 ],
                 "Value": [
-                    format_number(current_assets),
-                    format_number(current_liabilities),
-                    format_number(working_capital),
-                    format_number(inventory)
+                    format_number(item("current_assets")),
+                    format_number(item("current_liabilities")),
+                    format_number(latest_ratios["working_capital"]),
+                    format_number(item("inventory"))
                 ]
             }
             st.dataframe(pd.DataFrame(wc_data), use_container_width=True, hide_index=True)
         
         with col3:
             st.markdown("### 📈 Financial Ratios")
+            current_ratio, quick_ratio, debt_to_equity = latest_ratios[["current_ratio", "quick_ratio", "debt_to_equity"]]
             ratios_data = {
                 "Metric": [
                     "Current Ratio",
@@ -229,18 +387,62 @@ if not balance_sheet.empty:
                     "Debt-to-Equity"
                 ],
                 "Value": [
-                    f"{current_ratio:.2f}" if not pd.isna(current_ratio) else "N/A",
-                    f"{quick_ratio:.2f}" if not pd.isna(quick_ratio) else "N/A",
-                    f"{debt_to_equity:.2f}" if not pd.isna(debt_to_equity) else "N/A"
+                    format_ratio("current_ratio", current_ratio),
+                    format_ratio("quick_ratio", quick_ratio),
+                    format_ratio("debt_to_equity", debt_to_equity)
                 ],
                 "Status": [
-                    "✅ Good" if not pd.isna(current_ratio) and current_ratio > 1.5 else "⚠️ Low" if not pd.isna(current_ratio) else "N/A",
-                    "✅ Good" if not pd.isna(quick_ratio) and quick_ratio > 1.0 else "⚠️ Low" if not pd.isna(quick_ratio) else "N/A",
-                    "✅ Conservative" if not pd.isna(debt_to_equity) and debt_to_equity < 1.0 else "⚠️ High" if not pd.isna(debt_to_equity) else "N/A"
+                    ratio_status(current_ratio, 1.5, "✅ Good", "⚠️ Low"),
+                    ratio_status(quick_ratio, 1.0, "✅ Good", "⚠️ Low"),
+                    ratio_status(debt_to_equity, 1.0, "✅ Conservative", "⚠️ High", higher_is_better=False)
                 ]
             }
             st.dataframe(pd.DataFrame(ratios_data), use_container_width=True, hide_index=True)
-        
+
+        # Margins, returns and cash flow need the income and cash-flow statements,
+        # so they come from the latest annual period that has any of them
+        profitability = RATIO_GROUPS["profitability"] + RATIO_GROUPS["cash_flow"]
+        profit_rows = ratios.loc[annual.index, profitability].dropna(how="all")
+        if not profit_rows.empty:
+            profit_ratios = profit_rows.iloc[-1]
+            st.markdown("### 💰 Profitability & Cash Flow")
+            st.dataframe(
+                pd.DataFrame({
+                    "Metric": [RATIO_LABELS[name] for name in profitability],
+                    "Value": [format_ratio(name, profit_ratios[name]) for name in profitability]
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+
+        # Ratio trends across every reported period
+        st.markdown("### 📉 Ratio Trends")
+        trend_col1, trend_col2 = st.columns([1, 3])
+        with trend_col1:
+            trend_freq = st.radio("Periods", ["annual", "quarterly"], format_func=str.title, horizontal=True)
+        available = [name for name in RATIO_LABELS if name in set(ratio_trends["ratio"])]
+        with trend_col2:
+            trend_ratios = st.multiselect(
+                "Ratios",
+                available,
+                default=[name for name in ["current_ratio", "quick_ratio", "debt_to_equity", "roe"] if name in available],
+                format_func=RATIO_LABELS.get
+            )
+
+        trend = ratio_trends[(ratio_trends["freq"] == trend_freq) & ratio_trends["ratio"].isin(trend_ratios)]
+        if trend.empty:
+            st.info(f"ℹ️ No {trend_freq} data for the selected ratios.")
+        else:
+            trend_table = trend.pivot(index="period", columns="ratio", values="value")
+            st.line_chart(trend_table.rename(columns=RATIO_LABELS), use_container_width=True)
+
+        with st.expander("🧮 View All Ratios by Period"):
+            ratio_table = ratios.xs(ticker, level="ticker").dropna(how="all")
+            st.dataframe(
+                ratio_table.rename(columns=RATIO_LABELS).sort_index(ascending=False),
+                use_container_width=True
+            )
+
         # Display full balance sheet in expander
         with st.expander("📝 View Full Balance Sheet"):
             st.dataframe(balance_sheet.head(20), use_container_width=True)
@@ -260,12 +462,18 @@ with st.expander("💡 How to Interpret This Data"):
     - **Red Candles**: Closing price < Opening price (Bearish)
     - **Volume**: High volume confirms price movements
     - **Trends**: Look for consistent patterns over time
+    - **Moving Averages / Bollinger Bands**: Price above a rising SMA = uptrend; touches of the bands = stretched moves
+    - **RSI / Stochastic**: Above 70-80 = overbought, below 20-30 = oversold
+    - **ATR**: Average daily range, a gauge of volatility
+    - **OBV**: Rising OBV with rising price confirms buying pressure
     
-    ### Fundamental Analysis (Balance Sheet)
+    ### Fundamental Analysis (Statements)
     - **Current Ratio > 2.0**: Healthy liquidity position
     - **Quick Ratio > 1.0**: Can meet short-term obligations without selling inventory
     - **Debt-to-Equity < 1.0**: Conservative leverage, lower financial risk
     - **Positive Working Capital**: Company can cover short-term liabilities
+    - **ROE / ROCE**: Return earned on shareholders' equity / on all long-term capital employed
+    - **Free Cash Flow**: Operating cash flow left after capital expenditure
     
     ### Combined Analysis
     1. **Strong Fundamentals + Bullish Technicals**: Good investment opportunity
@@ -282,3 +490,5 @@ st.markdown(
     Built with 🧡 by **Ankit** | Part of [FinStatAnalysis](https://github.com/Ank576/FinStatAnalysis)
     """
 )
+
+debug_panel()
@@ -0,0 +1,49 @@
+"""Concurrent data loads on a pool shared by every session.
+
+`load_concurrently` submits each call to the pool and waits for all of
+them, giving each its own timeout. The pool is shared, so a call's timeout
+counts from when it starts running rather than while it waits behind other
+sessions' loads. A call still waiting for a worker after `queue_timeout` is
+cancelled.
+"""
+
+import threading
+import time
+from concurrent.futures import Executor, TimeoutError as FuturesTimeout
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from finstat_common.instrument import propagate
+
+# Longest wait (seconds) for a free worker in the shared pool before a load is given up
+QUEUE_TIMEOUT = 30
+
+
+def load_concurrently(pool: Executor, calls: dict, timeouts: dict, queue_timeout: float = QUEUE_TIMEOUT):
+    """Run {name: (fn, args)} on `pool` and return (results, errors), both keyed by name"""
+    ctx = get_script_run_ctx()
+    started = {name: threading.Event() for name in calls}
+    start_times = {}
+
+    def run(name, fn, args):
+        start_times[name] = time.monotonic()
+        started[name].set()
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    queued = time.monotonic()
+    # propagate() records the workers' spans in this rerun's trace
+    futures = {name: pool.submit(propagate(run), name, fn, args) for name, (fn, args) in calls.items()}
+    results, errors = {}, {}
+    for name, future in futures.items():
+        if not started[name].wait(max(queued + queue_timeout - time.monotonic(), 0)) and future.cancel():
+            errors[name] = f"still waiting for a worker after {queue_timeout}s"
+            continue
+        started[name].wait()
+        try:
+            results[name] = future.result(timeout=max(start_times[name] + timeouts[name] - time.monotonic(), 0))
+        except FuturesTimeout:
+            errors[name] = f"timed out after {timeouts[name]}s"
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
@@ -0,0 +1,79 @@
+"""Byte-capped LRU cache of rendered mplfinance charts.
+
+Charts are stored as PNG bytes, never as live matplotlib figures: every
+figure is closed as soon as it has been saved, and the cache evicts the
+least recently used images once their total size passes `max_bytes`. One
+cache is shared by all sessions, so memory stays flat however many
+sessions render the same or different charts.
+"""
+
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Callable, Hashable
+
+import matplotlib.pyplot as plt
+import mplfinance as mpf
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+SCREEN_DPI = 110
+EXPORT_DPI = 300
+
+
+class RenderCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # pyplot keeps global state, so renders are serialized across sessions
+        self._render_lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """Cached image for `key`, calling `render()` on a miss"""
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+            self.misses += 1
+
+        with self._render_lock:
+            image = render()
+
+        with self._lock:
+            if key not in self._images:
+                self._images[key] = image
+                self._bytes += len(image)
+            self._evict()
+        return image
+
+    def _evict(self):
+        # Always keep the newest image, even if it alone is over the cap
+        while self._bytes > self.max_bytes and len(self._images) > 1:
+            _, image = self._images.popitem(last=False)
+            self._bytes -= len(image)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "images": len(self._images),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+def render_png(df, dpi: int, **plot_kwargs) -> bytes:
+    """Render an mplfinance chart to PNG bytes and close the figure"""
+    fig, _ = mpf.plot(df, returnfig=True, **plot_kwargs)
+    try:
+        buf = BytesIO()
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        plt.close(fig)
@@ -1,20 +1,43 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from finstat_common.incremental import INCREMENTAL_SPECS, spec_values
+from finstat_common.indicators import compute
+from finstat_common.instrument import debug_panel, span, start_rerun, traced
+from finstat_common.ohlcv_store import get_store
+from finstat_common.providers import DEFAULT_PROVIDER, describe, get_provider
+from finstat_common.streaming import CandleAggregator, StreamRunner, TickFeed, simulate_ticks, ticks_from_bars
+from backtest import BARS_PER_YEAR, backtest, bar_returns, macd_grid, rank_params, rsi_grid, sweep
+from downsample import target_points
+from panels import (
+    RENDER_MODES,
+    WEBGL_THRESHOLD,
+    compose_figure,
+    live_traces,
+    macd_panel,
+    price_panel,
+    rsi_panel,
+    use_webgl,
+    with_traces
+)
+from screener import SCREENS, download_universe, parse_universe, rank, screen
 
 st.set_page_config(
     page_title="Stock Candlestick Viewer",
     page_icon="📊",
     layout="wide"
 )
+start_rerun("stock-candlestick-viewer")
 
 st.title("📈 Stock Candlestick Viewer")
 st.caption("Interactive NSE candlestick charts with RSI & MACD overlays - Three Panel Layout")
 
 # Sidebar inputs
+mode = st.sidebar.radio("Mode", ["Chart", "Screener", "Backtest", "Live"], horizontal=True)
+
 st.sidebar.header("Chart Settings")
 
 default_ticker = "TATAMOTORS.NS"
@@ -32,199 +55,503 @@ interval = st.sidebar.selectbox(
     index=0
 )
 
-show_rsi = st.sidebar.checkbox("Show RSI", value=True)
-show_macd = st.sidebar.checkbox("Show MACD", value=True)
+# Price-scale overlays, as indicator specs for finstat_common.indicators.compute
+OVERLAYS = {
+    "SMA 20": "sma_20",
+    "SMA 50": "sma_50",
+    "EMA 20": "ema_20",
+    "Bollinger Bands (20, 2)": "bbands_20_2",
+    "VWAP": "vwap"
+}
+
+overlays = st.sidebar.multiselect("Price overlays", list(OVERLAYS), default=["SMA 20"])
+
+chart_width = st.sidebar.number_input(
+    "Chart width (px)",
+    min_value=400,
+    max_value=4000,
+    value=1400,
+    step=100,
+    help="Series longer than about one candle per 2 px are aggregated before plotting"
+)
+
+full_resolution = st.sidebar.checkbox(
+    "Full resolution",
+    value=False,
+    help="Send every bar in the visible range instead of aggregating to the chart width"
+)
+
+render_mode = st.sidebar.selectbox(
+    "Rendering",
+    RENDER_MODES,
+    index=0,
+    help=f"Auto switches to WebGL above {WEBGL_THRESHOLD:,} bars in the visible range"
+)
+
+price_band = st.sidebar.checkbox(
+    "Price as high/low band",
+    value=False,
+    help="In WebGL mode, draw price as a GL high/low band with a close line instead of SVG candlesticks"
+)
 
 st.sidebar.info(
     "Examples: RELIANCE.NS, HDFCBANK.NS, INFY.NS, TCS.NS"
 )
 
-@st.cache_data(show_spinner=True)
+if get_provider().name != DEFAULT_PROVIDER:
+    st.sidebar.caption(f"🧪 Data provider: {describe(get_provider())} (set by FINSTAT_PROVIDER)")
+
+@traced("load_data", cache=st.cache_data(show_spinner=True))
 def load_data(ticker: str, period: str, interval: str) -> pd.DataFrame:
-    df = yf.download(ticker, period=period, interval=interval, auto_adjust=True)
-    df.dropna(inplace=True)
-    return df
-
-def compute_rsi(series: pd.Series, period: int = 14) -> pd.Series:
-    delta = series.diff()
-    gain = np.where(delta > 0, delta, 0.0)
-    loss = np.where(delta < 0, -delta, 0.0)
-    gain_ema = pd.Series(gain, index=series.index).ewm(alpha=1/period, adjust=False).mean()
-    loss_ema = pd.Series(loss, index=series.index).ewm(alpha=1/period, adjust=False).mean()
-    rs = gain_ema / loss_ema
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def compute_macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-    macd = ema_fast - ema_slow
-    signal_line = macd.ewm(span=signal, adjust=False).mean()
-    hist = macd - signal_line
-    return macd, signal_line, hist
+    df = get_store().read_interval(ticker, period, interval, auto_adjust=True)
+    return df.dropna()
 
-if not ticker:
-    st.warning("Enter a valid NSE ticker symbol to view the chart.")
-    st.stop()
+@traced("load_indicators", cache=st.cache_data(show_spinner=False))
+def load_indicators(ticker: str, period: str, interval: str, specs: tuple) -> dict:
+    # Keyed on the specs so toggling an overlay reuses everything already computed.
+    # RSI and MACD come from the store, which only advances them over new bars.
+    df = load_data(ticker, period, interval)
+    values = compute(df, [spec for spec in specs if spec not in INCREMENTAL_SPECS])
+    incremental = [spec for spec in specs if spec in INCREMENTAL_SPECS]
+    if incremental:
+        frame = get_store().read_indicators(ticker, period, interval, auto_adjust=True)
+        values.update(spec_values(frame, df.index, incremental))
+    return values
 
-with st.spinner("Fetching market data..."):
-    df = load_data(ticker, timeframe, interval)
+def visible(frame, view_start, view_end):
+    """Rows inside the visible range (all rows if the range matches nothing)"""
+    local_index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+    window = frame[(local_index >= view_start) & (local_index <= view_end)]
+    return window if not window.empty else frame
 
-if df.empty:
-    st.error("No data returned. Check ticker or timeframe.")
-    st.stop()
+# Each panel is cached as built Plotly traces, keyed on data identity (ticker,
+# period, interval, row count, and the last bar's timestamp and values) plus the
+# visible range and point budget, so showing or hiding one panel never rebuilds another.
+@traced("build_price_panel", cache=st.cache_resource(show_spinner=False, max_entries=32))
+def build_price_panel(data_key: tuple, view: tuple, max_points: int, overlays: tuple, webgl: bool, price_band: bool):
+    ticker, period, interval, _ = data_key
+    df = load_data(ticker, period, interval)
+    specs = tuple(OVERLAYS[name] for name in overlays)
+    if specs:
+        df = df.assign(**load_indicators(ticker, period, interval, specs))
+    labels = {OVERLAYS[name]: name for name in overlays}
+    return price_panel(visible(df, *view), max_points, labels, webgl, price_band)
 
-# Compute indicators
-close = df["Close"]
-if show_rsi:
-    df["RSI"] = compute_rsi(close)
-if show_macd:
-    macd, signal_line, hist = compute_macd(close)
-    df["MACD"] = macd
-    df["Signal"] = signal_line
-    df["Hist"] = hist
-
-# Create subplots: 3 rows, 1 column
-# Row 1: Candlestick + Volume (shared x-axis, dual y-axis)
-# Row 2: RSI
-# Row 3: MACD
-rows = 3
-row_heights = [0.5, 0.25, 0.25]
-
-fig = make_subplots(
-    rows=rows,
-    cols=1,
-    shared_xaxes=True,
-    row_heights=row_heights,
-    vertical_spacing=0.08,
-    subplot_titles=("Price & Volume", "RSI (14)", "MACD (12, 26, 9)"),
-    specs=[
-        [{"secondary_y": True}],  # Row 1: dual y-axis
-        [{"secondary_y": False}],  # Row 2
-        [{"secondary_y": False}]   # Row 3
-    ]
-)
+@traced("build_rsi_panel", cache=st.cache_resource(show_spinner=False, max_entries=32))
+def build_rsi_panel(data_key: tuple, view: tuple, max_points: int, webgl: bool):
+    ticker, period, interval, _ = data_key
+    df = load_data(ticker, period, interval)
+    rsi = pd.Series(load_indicators(ticker, period, interval, ("rsi_14",))["rsi_14"], index=df.index)
+    return rsi_panel(visible(rsi, *view), max_points, webgl=webgl)
 
-# Row 1: Candlestick
-fig.add_trace(
-    go.Candlestick(
-        x=df.index,
-        open=df["Open"],
-        high=df["High"],
-        low=df["Low"],
-        close=df["Close"],
-        name="Price",
-        showlegend=True
-    ),
-    row=1,
-    col=1,
-    secondary_y=False
-)
+@traced("build_macd_panel", cache=st.cache_resource(show_spinner=False, max_entries=32))
+def build_macd_panel(data_key: tuple, view: tuple, max_points: int, webgl: bool):
+    ticker, period, interval, _ = data_key
+    df = load_data(ticker, period, interval)
+    values = load_indicators(ticker, period, interval, ("macd_12_26_9",))
+    macd = pd.DataFrame(
+        {
+            "MACD": values["macd_12_26_9"],
+            "Signal": values["macd_12_26_9_signal"],
+            "Hist": values["macd_12_26_9_hist"]
+        },
+        index=df.index
+    )
+    macd = visible(macd, *view)
+    return macd_panel(macd["MACD"], macd["Signal"], macd["Hist"], max_points, webgl)
 
-# Row 1: Volume (right y-axis)
-fig.add_trace(
-    go.Bar(
-        x=df.index,
-        y=df["Volume"],
-        name="Volume",
-        marker=dict(color="rgba(128, 128, 128, 0.3)"),
-        showlegend=True
-    ),
-    row=1,
-    col=1,
-    secondary_y=True
-)
+@traced("build_chart", cache=st.cache_resource(show_spinner=False, max_entries=32))
+def build_chart(
+    data_key: tuple,
+    view: tuple,
+    max_points: int,
+    overlays: tuple,
+    webgl: bool,
+    price_band: bool,
+    show_rsi: bool,
+    show_macd: bool
+):
+    """Figure composed from cached panels, plus (candles, bars per candle, JSON bytes)"""
+    price, candles, bars_per_candle = build_price_panel(data_key, view, max_points, overlays, webgl, price_band)
+    panels = [price]
+    if show_rsi:
+        panels.append(build_rsi_panel(data_key, view, max_points, webgl))
+    if show_macd:
+        panels.append(build_macd_panel(data_key, view, max_points, webgl))
+    ticker, period, interval, _ = data_key
+    fig = compose_figure(panels, f"<b>{ticker} Technical Analysis</b> ({period}, {interval})")
+    payload = 0
+    if bars_per_candle > 1:
+        with span("figure_to_json"):
+            payload = len(fig.to_json())
+    return fig, len(candles), bars_per_candle, payload
 
-# Row 2: RSI
-if show_rsi and "RSI" in df.columns:
-    fig.add_trace(
-        go.Scatter(
-            x=df.index,
-            y=df["RSI"],
-            name="RSI",
-            line=dict(color="blue", width=2),
-            showlegend=True
-        ),
-        row=2,
-        col=1
+@st.fragment
+def chart_section(
+    data_key: tuple, view: tuple, max_points: int, overlays: tuple, webgl: bool, price_band: bool, n_view: int
+):
+    # Panel toggles rerun only this fragment, and every panel comes from cache
+    col1, col2, _ = st.columns([1, 1, 6])
+    with col1:
+        show_rsi = st.toggle("Show RSI", value=True)
+    with col2:
+        show_macd = st.toggle("Show MACD", value=True)
+
+    fig, n_candles, bars_per_candle, payload = build_chart(
+        data_key, view, max_points, overlays, webgl, price_band, show_rsi, show_macd
     )
-    
-    # RSI reference lines (30, 70)
-    fig.add_hline(y=30, line_dash="dash", line_color="red", row=2, col=1, opacity=0.5)
-    fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1, opacity=0.5)
-
-# Row 3: MACD
-if show_macd and {"MACD", "Signal", "Hist"}.issubset(df.columns):
-    # Histogram
-    colors = ["green" if x >= 0 else "red" for x in df["Hist"]]
-    fig.add_trace(
-        go.Bar(
-            x=df.index,
-            y=df["Hist"],
-            name="Histogram",
-            marker=dict(color=colors),
-            showlegend=True
-        ),
-        row=3,
-        col=1
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    if webgl:
+        price_style = "a high/low band with close" if price_band else "SVG candlesticks"
+        st.caption(f"⚡ WebGL rendering: {n_candles:,} bars; indicators drawn as GL lines, price as {price_style}.")
+
+    if bars_per_candle > 1:
+        # Serializing the full-resolution figure just to measure it would defeat
+        # the purpose, so its size is scaled from the downsampled payload.
+        full_payload = payload * n_view / n_candles
+        st.caption(
+            f"Downsampled {n_view:,} bars to {n_candles:,} candles ({bars_per_candle} bars each); "
+            f"payload ≈ {full_payload / 1e6:,.1f} MB → {payload / 1e6:,.2f} MB. Narrow the visible range for full detail."
+        )
+
+@traced("load_universe_close", cache=st.cache_data(show_spinner=False, ttl=15 * 60))
+def load_universe_close(tickers: tuple, period: str, interval: str) -> pd.DataFrame:
+    return download_universe(tickers, period, interval)["Close"]
+
+if mode == "Screener":
+    st.subheader("🔎 RSI & MACD Screener")
+    st.write("Scan a whole universe in one vectorized pass over a time × ticker price matrix.")
+
+    universe_text = st.text_area(
+        "Universe (NSE symbols, comma or newline separated)",
+        "RELIANCE, HDFCBANK, INFY, TCS, ICICIBANK, ITC, SBIN, LT, BHARTIARTL, HINDUNILVR, MARUTI, SUNPHARMA, WIPRO, POWERGRID",
+        height=100
     )
-    
-    # MACD line
-    fig.add_trace(
-        go.Scatter(
-            x=df.index,
-            y=df["MACD"],
-            name="MACD",
-            line=dict(color="blue", width=2),
-            showlegend=True
+    universe_file = st.file_uploader("...or upload an index constituents CSV (with a Symbol column)", type="csv")
+    if universe_file is not None:
+        constituents = pd.read_csv(universe_file)
+        symbol_col = next(
+            (c for c in constituents.columns if c.strip().lower() in ("symbol", "ticker")),
+            constituents.columns[0]
+        )
+        universe_text = "\n".join(constituents[symbol_col].astype(str))
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        screen_name = st.selectbox("Screen", list(SCREENS))
+    with col2:
+        oversold = st.number_input("Oversold RSI", 0, 100, 30)
+    with col3:
+        overbought = st.number_input("Overbought RSI", 0, 100, 70)
+    with col4:
+        cross_lookback = st.number_input("Cross lookback (bars)", 1, 50, 3)
+
+    universe = parse_universe(universe_text)
+    if not universe:
+        st.warning("Add at least one ticker to the universe.")
+        st.stop()
+
+    with st.spinner(f"Downloading {len(universe)} tickers..."):
+        universe_close = load_universe_close(tuple(universe), timeframe, interval)
+    if universe_close.empty:
+        st.error("No data returned for this universe.")
+        st.stop()
+
+    with span("screen"):
+        table = screen(universe_close, oversold=oversold, overbought=overbought, cross_lookback=int(cross_lookback))
+        ranked = rank(table, screen_name)
+    st.caption(
+        f"{len(ranked)} of {len(table)} tickers match · "
+        f"{len(universe_close):,} bars × {universe_close.shape[1]} tickers"
+    )
+    st.dataframe(
+        ranked.style.format(
+            {
+                "Close": "₹{:.2f}",
+                "Change %": "{:+.2f}%",
+                "RSI": "{:.1f}",
+                "MACD": "{:.2f}",
+                "Signal": "{:.2f}",
+                "Hist": "{:+.2f}"
+            }
         ),
-        row=3,
-        col=1
+        use_container_width=True
     )
-    
-    # Signal line
-    fig.add_trace(
-        go.Scatter(
-            x=df.index,
-            y=df["Signal"],
-            name="Signal",
-            line=dict(color="orange", width=2),
-            showlegend=True
+    debug_panel()
+    st.stop()
+
+@traced("run_sweep", cache=st.cache_data(show_spinner=False))
+def run_sweep(ticker: str, period: str, interval: str, strategy: str, grid: tuple, cost_bps: float) -> pd.DataFrame:
+    close = load_data(ticker, period, interval)[["Close"]].rename(columns={"Close": ticker})
+    results = sweep(close, strategy, [dict(params) for params in grid], cost_bps, BARS_PER_YEAR[interval], max_workers=1)
+    return rank_params(results, strategy)
+
+if mode == "Backtest":
+    st.subheader("🧪 Signal Backtest")
+    st.write("Trade the chart's RSI and MACD signals on past data: positions on each bar's close, P&L on the next bar, costs on every trade.")
+
+    if not ticker:
+        st.warning("Enter a valid NSE ticker symbol to backtest.")
+        st.stop()
+    with st.spinner("Fetching market data..."):
+        df = load_data(ticker, timeframe, interval)
+    if len(df) < 30:
+        st.error("Not enough data to backtest. Choose a longer timeframe.")
+        st.stop()
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        strategy = st.selectbox("Strategy", ["rsi", "macd"], format_func={"rsi": "RSI mean reversion", "macd": "MACD crossover"}.get)
+    with col5:
+        cost_bps = st.number_input("Cost per trade (bps)", 0.0, 100.0, 10.0, step=1.0)
+    if strategy == "rsi":
+        with col2:
+            period = st.number_input("RSI period", 2, 100, 14)
+        with col3:
+            oversold = st.number_input("Buy below", 0, 100, 30)
+        with col4:
+            overbought = st.number_input("Sell above", 0, 100, 70)
+        params = {"period": period, "oversold": oversold, "overbought": overbought}
+    else:
+        with col2:
+            fast = st.number_input("Fast EMA", 2, 100, 12)
+        with col3:
+            slow = st.number_input("Slow EMA", 3, 200, 26)
+        with col4:
+            signal_period = st.number_input("Signal EMA", 2, 100, 9)
+        allow_short = st.checkbox("Go short below the signal line")
+        params = {"fast": fast, "slow": slow, "signal": signal_period, "allow_short": allow_short}
+
+    close = df["Close"].to_numpy(dtype=float)
+    with span("backtest"):
+        result = backtest(close, strategy, params, cost_bps, BARS_PER_YEAR[interval])
+        buy_hold = (1 + bar_returns(close)).cumprod()
+
+    metrics = result.metrics
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Total Return", f"{metrics['total_return']:+.1%}", f"{metrics['total_return'] - (buy_hold[-1] - 1):+.1%} vs buy & hold")
+    col2.metric("CAGR", f"{metrics['cagr']:+.1%}")
+    col3.metric("Sharpe", f"{metrics['sharpe']:.2f}" if pd.notna(metrics["sharpe"]) else "N/A")
+    col4.metric("Max Drawdown", f"{metrics['max_drawdown']:.1%}")
+    col5.metric("Trades", f"{int(metrics['trades'])}", f"{metrics['exposure']:.0%} of bars in market", delta_color="off")
+
+    chart_index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+    st.line_chart(
+        pd.DataFrame({"Strategy": result.equity, "Buy & Hold": buy_hold}, index=chart_index),
+        use_container_width=True
+    )
+
+    with st.expander("🔁 Parameter sweep"):
+        st.caption("Every combination is backtested on this ticker and ranked by Sharpe. For many tickers, run `python backtest.py` from the command line.")
+        if strategy == "rsi":
+            periods = st.slider("RSI periods", 2, 50, (5, 25))
+            lows = st.slider("Buy below", 5, 50, (15, 40), step=5)
+            highs = st.slider("Sell above", 50, 95, (60, 85), step=5)
+            grid = rsi_grid(range(periods[0], periods[1] + 1), range(lows[0], lows[1] + 1, 5), range(highs[0], highs[1] + 1, 5))
+        else:
+            fasts = st.slider("Fast EMA", 2, 30, (6, 16), step=2)
+            slows = st.slider("Slow EMA", 10, 80, (20, 40), step=4)
+            signals = st.slider("Signal EMA", 3, 21, (5, 13), step=2)
+            grid = macd_grid(range(fasts[0], fasts[1] + 1, 2), range(slows[0], slows[1] + 1, 4), range(signals[0], signals[1] + 1, 2))
+            for combo in grid:
+                combo["allow_short"] = allow_short
+        st.caption(f"{len(grid):,} combinations")
+        if grid and st.button("Run sweep"):
+            with st.spinner(f"Backtesting {len(grid):,} combinations..."):
+                ranked = run_sweep(ticker, timeframe, interval, strategy, tuple(tuple(combo.items()) for combo in grid), cost_bps)
+            st.dataframe(
+                ranked.head(20).style.format(
+                    {
+                        "total_return": "{:+.1%}",
+                        "cagr": "{:+.1%}",
+                        "sharpe": "{:.2f}",
+                        "max_drawdown": "{:.1%}",
+                        "trades": "{:.0f}",
+                        "exposure": "{:.0%}"
+                    }
+                ),
+                use_container_width=True,
+                hide_index=True
+            )
+    debug_panel()
+    st.stop()
+
+# Closed bars kept on the live chart, and how often it refreshes
+LIVE_BARS = 240
+LIVE_REFRESH_SECONDS = 1.0
+# A stream stops once its chart has not refreshed for this long (the session
+# ended or the tab was closed); simulated ticks never run out on their own,
+# so they are also capped in total
+LIVE_IDLE_SECONDS = 120.0
+LIVE_MAX_SECONDS = 30 * 60.0
+
+# A running tick stream belongs to the session that started it
+live_runner = st.session_state.get("live_runner")
+if mode != "Live" and live_runner is not None:
+    live_runner.stop()
+
+@traced("build_live_panels", cache=st.cache_resource(show_spinner=False, max_entries=16))
+def build_live_panels(runner_id: str, symbol: str, revision: int, _aggregator: CandleAggregator) -> tuple:
+    # Keyed on the runner's unique id and the symbol's revision, so closed bars
+    # are only re-plotted when a bar closes, and never shared across streams
+    bars = _aggregator.bars(symbol, last=LIVE_BARS, forming=False)
+    price, _, _ = price_panel(bars, len(bars), {})
+    return (
+        price,
+        rsi_panel(bars["RSI"], len(bars)),
+        macd_panel(bars["MACD"], bars["Signal"], bars["Hist"], len(bars))
+    )
+
+def start_stream(symbols: list, source: str, speed: float, replay_bars: int, rate: float) -> StreamRunner:
+    aggregator = CandleAggregator(symbols, interval)
+    frames = {symbol: load_data(symbol, timeframe, interval) for symbol in symbols}
+    if source == "Replay history":
+        # Seed with the older bars and replay the rest as ticks
+        for symbol, frame in frames.items():
+            aggregator.seed(symbol, frame.iloc[:-replay_bars])
+        _, ticks = ticks_from_bars({symbol: frame.iloc[-replay_bars:] for symbol, frame in frames.items()}, interval)
+        feed = TickFeed(symbols, [ticks], speed)
+        max_seconds = None
+    else:
+        for symbol, frame in frames.items():
+            aggregator.seed(symbol, frame)
+        last_session = max(frame.index[-1] for frame in frames.values())
+        start = (last_session.tz_localize(None) if last_session.tz is not None else last_session) + pd.offsets.BDay(1)
+        prices = [frame["Close"].iloc[-1] for frame in frames.values()]
+        feed = TickFeed(symbols, simulate_ticks(prices, start.normalize(), rate, chunk_seconds=speed), speed)
+        max_seconds = LIVE_MAX_SECONDS
+    return StreamRunner(feed, aggregator, max_seconds=max_seconds, idle_seconds=LIVE_IDLE_SECONDS).start()
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_section(runner: StreamRunner):
+    runner.touch()
+    aggregator = runner.aggregator
+    stats = aggregator.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Ticks", f"{stats['ticks']:,}")
+    col2.metric("Ticks / s", f"{runner.rate():,.0f}")
+    col3.metric("Bars closed", f"{stats['bars_closed']:,}")
+    col4.metric("Dropped", f"{stats['dropped']:,}", help="Ticks outside the session or older than the forming bar")
+    if runner.error is not None:
+        st.error(f"Tick stream stopped: {runner.error}")
+    elif not runner.running and runner.stop_reason is not None:
+        st.caption(f"⏹️ Stream stopped: {runner.stop_reason}. Start again to resume.")
+    elif not runner.running:
+        st.caption("⏹️ Stream finished. Start again to replay.")
+
+    symbol = st.selectbox("Chart", aggregator.symbols)
+    price, rsi, macd = build_live_panels(runner.id, symbol, aggregator.revision(symbol), aggregator)
+    tail = aggregator.bars(symbol, last=1)
+    panels = [price, rsi, macd]
+    if len(tail) == 2:
+        # Only the forming bar's traces are built on each refresh; closed-bar panels come from
+        # cache. The composed figure is still sent to the browser in full every time.
+        live = live_traces(tail)
+        panels = [with_traces(panel, *live[name]) for panel, name in zip(panels, ("price", "rsi", "macd"))]
+    fig = compose_figure(panels, f"<b>{symbol} Live</b> ({interval})")
+    # Keeps zoom and pan across refreshes
+    fig.update_layout(uirevision=symbol, showlegend=False)
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(
+        aggregator.snapshot().style.format(
+            {
+                "Open": "₹{:.2f}",
+                "High": "₹{:.2f}",
+                "Low": "₹{:.2f}",
+                "Close": "₹{:.2f}",
+                "Volume": "{:,.0f}",
+                "Change %": "{:+.2f}%"
+            },
+            na_rep="—"
         ),
-        row=3,
-        col=1
+        use_container_width=True
     )
 
-# Update layout
-fig.update_layout(
-    title=f"<b>{ticker} Technical Analysis</b> ({timeframe}, {interval})",
-    xaxis_rangeslider_visible=False,
-    template="plotly_white",
-    height=900,
-    hovermode="x unified",
-    margin=dict(l=50, r=50, t=80, b=50),
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1.02,
-        xanchor="right",
-        x=1,
-        bgcolor="rgba(255, 255, 255, 0.8)",
-        bordercolor="gray",
-        borderwidth=1
+if mode == "Live":
+    st.subheader("📡 Live Candles")
+    st.write(
+        "Ticks are aggregated into candles for the sidebar interval as they arrive. RSI and MACD advance "
+        "once per closed candle. Closed candles are plotted once; each refresh rebuilds only the forming candle "
+        "and resends the chart."
     )
-)
 
-# Update y-axes labels
-fig.update_yaxes(title_text="Price (₹)", row=1, col=1, secondary_y=False)
-fig.update_yaxes(title_text="Volume", row=1, col=1, secondary_y=True)
-fig.update_yaxes(title_text="RSI", row=2, col=1, range=[0, 100])
-fig.update_yaxes(title_text="MACD", row=3, col=1)
+    watchlist_text = st.text_input("Watchlist", f"{ticker}, RELIANCE.NS, INFY.NS")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        source = st.radio("Tick source", ["Replay history", "Simulated ticks"], horizontal=True)
+    with col2:
+        speed = st.select_slider(
+            "Speed (market seconds per second)",
+            [1, 10, 60, 300, 1800, 3600],
+            value=300,
+            help="Nights and weekends are skipped"
+        )
+    with col3:
+        if source == "Replay history":
+            replay_bars = st.number_input("Bars to replay", 10, 2000, 50)
+            rate = 0.0
+        else:
+            rate = st.number_input("Ticks per market second", 1.0, 100_000.0, 50.0)
+            replay_bars = 0
+
+    symbols = parse_universe(watchlist_text)
+    col1, col2, _ = st.columns([1, 1, 6])
+    if col1.button("▶️ Start", type="primary", disabled=not symbols):
+        if live_runner is not None:
+            live_runner.stop()
+        with st.spinner("Loading history..."):
+            available = [symbol for symbol in symbols if len(load_data(symbol, timeframe, interval)) > replay_bars]
+        missing = sorted(set(symbols) - set(available))
+        if missing:
+            st.warning(f"Not enough history for: {', '.join(missing)}")
+        if available:
+            live_runner = start_stream(available, source, speed, replay_bars, rate)
+            st.session_state["live_runner"] = live_runner
+    if col2.button("⏹️ Stop", disabled=live_runner is None or not live_runner.running):
+        live_runner.stop()
+
+    if live_runner is None:
+        st.info("Press Start to stream ticks for the watchlist.")
+    else:
+        live_section(live_runner)
+    debug_panel()
+    st.stop()
+
+if not ticker:
+    st.warning("Enter a valid NSE ticker symbol to view the chart.")
+    st.stop()
+
+with st.spinner("Fetching market data..."):
+    df = load_data(ticker, timeframe, interval)
 
-# Update x-axes
-fig.update_xaxes(title_text="Date", row=3, col=1)
+if df.empty:
+    st.error("No data returned. Check ticker or timeframe.")
+    st.stop()
 
-st.plotly_chart(fig, use_container_width=True)
+# Visible range: only this window is sent to the browser, at full resolution
+# when it fits the chart width and aggregated otherwise
+local_index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+view_start, view_end = local_index[0].to_pydatetime(), local_index[-1].to_pydatetime()
+if len(df) > target_points(chart_width) and view_start < view_end:
+    view_start, view_end = st.sidebar.slider(
+        "Visible range",
+        min_value=view_start,
+        max_value=view_end,
+        value=(view_start, view_end),
+        format="YYYY-MM-DD HH:mm"
+    )
+
+# The forming bar keeps its timestamp while its prices and volume change, so its values are part of the key
+data_key = (ticker, timeframe, interval, (len(df), str(df.index[-1]), tuple(df.iloc[-1].astype(float))))
+view = (view_start, view_end)
+n_view = len(visible(df, *view))
+max_points = n_view if full_resolution else target_points(chart_width)
+webgl = use_webgl(n_view, render_mode)
+chart_section(data_key, view, max_points, tuple(overlays), webgl, price_band and webgl, n_view)
 
 # Data info section
 with st.expander("📊 Data Info"):
@@ -251,11 +578,15 @@ st.markdown(
 
 1. Enter an NSE ticker in Yahoo format (e.g., `TATAMOTORS.NS`, `RELIANCE.NS`, `HDFCBANK.NS`).
 2. Choose timeframe (1 month to 5 years) and interval (daily to 15-minute).
-3. Toggle RSI and MACD indicators in the sidebar.
+3. Toggle the RSI and MACD panels above the chart and pick price overlays (SMA, EMA, Bollinger Bands, VWAP) in the sidebar.
 4. Hover over charts for detailed values. Use zoom and pan for deeper analysis.
 
 **Indicator Meanings**
 - **RSI (14)**: Relative Strength Index. Values above 70 = overbought, below 30 = oversold.
 - **MACD**: Momentum indicator. Blue line (MACD) crossing orange line (Signal) = potential trend change.
+- **Bollinger Bands**: 20-period SMA ± 2 standard deviations. Price near the bands = stretched move.
+- **VWAP**: Volume-weighted average price, reset each session on intraday intervals.
 """
 )
+
+debug_panel()
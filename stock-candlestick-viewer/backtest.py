@@ -0,0 +1,304 @@
+"""Vectorized RSI/MACD signal backtester with parallel parameter sweeps.
+
+Signals come from the same `finstat_common.indicators` kernels the chart and
+screener use. Positions, costs and P&L are whole-array operations on time x
+ticker matrices, so one backtest over hundreds of tickers is a handful of
+NumPy passes.
+
+- RSI: go long when RSI drops below `oversold` and stay long until it rises
+  above `overbought`.
+- MACD: long while MACD is above its signal line (short while below, with
+  `allow_short`).
+
+A position is decided on a bar's close and earns the next bar's return.
+Every change in position pays `cost_bps` per unit traded.
+
+`sweep` evaluates a parameter grid in a process pool. The price matrix is
+written once into shared memory, and every worker maps it instead of
+receiving a pickled copy. Combinations are sorted so each chunk reuses its
+RSI/EMA arrays across thresholds.
+
+Needs `finstat_common` importable (`pip install -e .` at the repository root).
+
+Usage:
+    python backtest.py universe.txt sweep.parquet --strategy rsi --period 5y --workers 8
+"""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from finstat_common import indicators
+
+STRATEGIES = ("rsi", "macd")
+PARAM_NAMES = {
+    "rsi": ("period", "oversold", "overbought"),
+    "macd": ("fast", "slow", "signal"),
+}
+METRICS = ("total_return", "cagr", "sharpe", "max_drawdown", "trades", "exposure")
+
+DEFAULT_COST_BPS = 10.0
+DEFAULT_CHUNK_SIZE = 50
+
+# NSE session is 9:15-15:30, so intraday bars per day round the 6h15m up
+BARS_PER_YEAR = {"1d": 252, "1h": 252 * 7, "30m": 252 * 13, "15m": 252 * 25}
+
+
+class BacktestResult(NamedTuple):
+    position: np.ndarray
+    returns: np.ndarray
+    equity: np.ndarray
+    metrics: Dict[str, np.ndarray]
+
+
+def hold_state(enter: np.ndarray, exit: np.ndarray) -> np.ndarray:
+    """1.0 from each entry bar until the next exit bar, else 0.0
+
+    A vectorized latch: the most recent entry or exit event is carried
+    forward with a running maximum of its row number. A bar that is both an
+    entry and an exit counts as an exit.
+    """
+    rows = np.arange(enter.shape[0]).reshape((-1,) + (1,) * (enter.ndim - 1))
+    last_event = np.maximum.accumulate(np.where(enter | exit, rows, -1), axis=0)
+    state = np.take_along_axis(enter & ~exit, np.maximum(last_event, 0), axis=0)
+    return (state & (last_event >= 0)).astype(float)
+
+
+def rsi_positions(rsi: np.ndarray, oversold: float, overbought: float) -> np.ndarray:
+    return hold_state(rsi < oversold, rsi > overbought)
+
+
+def macd_positions(macd_line: np.ndarray, signal_line: np.ndarray, allow_short: bool = False) -> np.ndarray:
+    position = (macd_line > signal_line).astype(float)
+    if allow_short:
+        position -= macd_line < signal_line
+    return position
+
+
+def bar_returns(close: np.ndarray) -> np.ndarray:
+    """Simple returns per bar, 0 on the first bar and wherever a price is missing"""
+    returns = np.zeros_like(close, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = close[1:] / close[:-1] - 1
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def simulate(returns: np.ndarray, position: np.ndarray, cost_bps: float = DEFAULT_COST_BPS) -> np.ndarray:
+    """Net per-bar strategy returns: the previous bar's position times this bar's return, less trading costs"""
+    held = np.zeros_like(position)
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(position, axis=0, prepend=0))
+    return held * returns - turnover * (cost_bps / 1e4)
+
+
+def performance(returns: np.ndarray, position: np.ndarray, bars_per_year: int = 252) -> Dict[str, np.ndarray]:
+    """METRICS for every column of a net-returns array"""
+    equity = np.cumprod(1 + returns, axis=0)
+    final = equity[-1]
+    years = len(returns) / bars_per_year
+    std = returns.std(axis=0, ddof=1) if len(returns) > 1 else np.zeros_like(final)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cagr = np.where(final > 0, np.power(np.maximum(final, 0), 1 / years) - 1, -1.0)
+        sharpe = np.where(std > 0, returns.mean(axis=0) / std * np.sqrt(bars_per_year), np.nan)
+    entries = (position != 0) & (np.diff(position, axis=0, prepend=0) != 0)
+    return {
+        "total_return": final - 1,
+        "cagr": cagr,
+        "sharpe": sharpe,
+        "max_drawdown": (equity / np.maximum.accumulate(equity, axis=0) - 1).min(axis=0),
+        "trades": entries.sum(axis=0).astype(float),
+        "exposure": (position != 0).mean(axis=0),
+    }
+
+
+def _positions(close: np.ndarray, strategy: str, params: dict, cache: Optional[dict] = None) -> np.ndarray:
+    """Positions for one parameter set; `cache` keeps RSI/EMA arrays for reuse across a chunk"""
+    cache = {} if cache is None else cache
+
+    def cached(key, compute):
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
+    if strategy == "rsi":
+        period = int(params["period"])
+        rsi = cached(("rsi", period), lambda: indicators.rsi(close, period))
+        return rsi_positions(rsi, params["oversold"], params["overbought"])
+    if strategy == "macd":
+        # indicators.macd, with each EMA computed once per chunk
+        fast, slow, signal = int(params["fast"]), int(params["slow"]), int(params["signal"])
+        macd_line = cached(
+            ("macd", fast, slow),
+            lambda: cached(("ema", fast), lambda: indicators.ema(close, fast))
+            - cached(("ema", slow), lambda: indicators.ema(close, slow)),
+        )
+        signal_line = indicators.ema(macd_line, signal)
+        return macd_positions(macd_line, signal_line, params.get("allow_short", False))
+    raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+
+
+def backtest(
+    close,
+    strategy: str,
+    params: dict,
+    cost_bps: float = DEFAULT_COST_BPS,
+    bars_per_year: int = 252,
+) -> BacktestResult:
+    """Backtest one parameter set over a close series (1-D) or time x ticker matrix (2-D)"""
+    close = np.asarray(close, dtype=float)
+    position = _positions(close, strategy, params)
+    returns = simulate(bar_returns(close), position, cost_bps)
+    return BacktestResult(
+        position=position,
+        returns=returns,
+        equity=np.cumprod(1 + returns, axis=0),
+        metrics=performance(returns, position, bars_per_year),
+    )
+
+
+def rsi_grid(periods: Iterable[int], oversold: Iterable[float], overbought: Iterable[float]) -> List[dict]:
+    return [
+        {"period": p, "oversold": lo, "overbought": hi}
+        for p, lo, hi in product(periods, oversold, overbought)
+        if lo < hi
+    ]
+
+
+def macd_grid(fast: Iterable[int], slow: Iterable[int], signal: Iterable[int]) -> List[dict]:
+    return [{"fast": f, "slow": s, "signal": g} for f, s, g in product(fast, slow, signal) if f < s]
+
+
+def _evaluate(close: np.ndarray, strategy: str, grid: List[dict], cost_bps: float, bars_per_year: int) -> np.ndarray:
+    """(combinations, metrics, tickers) array for one chunk of the grid"""
+    cache = {}
+    returns = bar_returns(close)
+    out = np.empty((len(grid), len(METRICS), close.shape[1]))
+    for i, params in enumerate(grid):
+        position = _positions(close, strategy, params, cache)
+        stats = performance(simulate(returns, position, cost_bps), position, bars_per_year)
+        out[i] = [stats[name] for name in METRICS]
+    return out
+
+
+# Set in each worker by _attach: the shared-memory block and the price matrix viewing it
+_shared = {}
+
+
+def _attach(name: str, shape: tuple, dtype: str):
+    block = shared_memory.SharedMemory(name=name)
+    _shared["block"] = block
+    _shared["close"] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _run_chunk(args) -> np.ndarray:
+    strategy, grid, cost_bps, bars_per_year = args
+    return _evaluate(_shared["close"], strategy, grid, cost_bps, bars_per_year)
+
+
+def sweep(
+    close: pd.DataFrame,
+    strategy: str,
+    grid: List[dict],
+    cost_bps: float = DEFAULT_COST_BPS,
+    bars_per_year: int = 252,
+    max_workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """Every (parameter set, ticker) result as one row of parameters, ticker and METRICS
+
+    `close` is a time x ticker frame; gaps are forward-filled. With
+    `max_workers=1` (or a single chunk) everything runs in this process.
+    """
+    values = np.ascontiguousarray(close.ffill().to_numpy(dtype=np.float64))
+    names = PARAM_NAMES[strategy]
+    grid = sorted(grid, key=lambda params: tuple(params[name] for name in names))
+    chunks = [grid[start : start + chunk_size] for start in range(0, len(grid), chunk_size)]
+
+    if len(chunks) <= 1 or max_workers == 1:
+        results = [_evaluate(values, strategy, chunk, cost_bps, bars_per_year) for chunk in chunks]
+    else:
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_attach,
+                initargs=(block.name, values.shape, values.dtype.str),
+            ) as pool:
+                results = list(pool.map(_run_chunk, [(strategy, chunk, cost_bps, bars_per_year) for chunk in chunks]))
+        finally:
+            block.close()
+            block.unlink()
+
+    n_tickers = values.shape[1]
+    metrics = np.concatenate(results) if results else np.empty((0, len(METRICS), n_tickers))
+    params = pd.DataFrame(grid, columns=list(grid[0]) if grid else list(names))
+    out = params.loc[params.index.repeat(n_tickers)].reset_index(drop=True)
+    out["ticker"] = np.tile(close.columns.to_numpy(), len(grid))
+    out[list(METRICS)] = metrics.transpose(0, 2, 1).reshape(-1, len(METRICS))
+    return out
+
+
+def rank_params(results: pd.DataFrame, strategy: str, metric: str = "sharpe") -> pd.DataFrame:
+    """Median of every metric across tickers for each parameter set, highest `metric` first"""
+    summary = results.groupby(list(PARAM_NAMES[strategy]))[list(METRICS)].median()
+    return summary.sort_values(metric, ascending=False).reset_index()
+
+
+def parse_range(text: str) -> List[int]:
+    """'5:30:5' -> [5, 10, ..., 30] (inclusive); '9,12,26' -> [9, 12, 26]"""
+    if ":" in text:
+        start, stop, *step = (int(part) for part in text.split(":"))
+        return list(range(start, stop + 1, step[0] if step else 1))
+    return [int(part) for part in text.split(",") if part.strip()]
+
+
+def main():
+    from screener import download_universe, parse_universe
+
+    parser = argparse.ArgumentParser(description="Parameter sweep of RSI/MACD signal strategies over many tickers")
+    parser.add_argument("universe", type=Path, help="Tickers, comma or newline separated (NSE symbols get .NS)")
+    parser.add_argument("output", type=Path, help="Parquet file for per-(parameters, ticker) results")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="rsi")
+    parser.add_argument("--period", default="5y", help="Price history to test on")
+    parser.add_argument("--interval", choices=list(BARS_PER_YEAR), default="1d")
+    parser.add_argument("--cost-bps", type=float, default=DEFAULT_COST_BPS, help="Cost per unit traded, in bps")
+    parser.add_argument("--rsi-periods", default="2:30", help="RSI periods as start:stop[:step] or a list")
+    parser.add_argument("--oversold", default="10:40:5", help="Oversold thresholds")
+    parser.add_argument("--overbought", default="60:90:5", help="Overbought thresholds")
+    parser.add_argument("--fast", default="4:20:2", help="MACD fast EMA periods")
+    parser.add_argument("--slow", default="20:60:4", help="MACD slow EMA periods")
+    parser.add_argument("--signal", default="3:15:2", help="MACD signal EMA periods")
+    parser.add_argument("--allow-short", action="store_true", help="MACD: short while below the signal line")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.strategy == "rsi":
+        grid = rsi_grid(parse_range(args.rsi_periods), parse_range(args.oversold), parse_range(args.overbought))
+    else:
+        grid = macd_grid(parse_range(args.fast), parse_range(args.slow), parse_range(args.signal))
+        for params in grid:
+            params["allow_short"] = args.allow_short
+
+    tickers = parse_universe(args.universe.read_text())
+    close = download_universe(tickers, args.period, args.interval)["Close"].dropna(axis=1, how="all")
+
+    start = time.perf_counter()
+    results = sweep(close, args.strategy, grid, args.cost_bps, BARS_PER_YEAR[args.interval], args.workers)
+    results.to_parquet(args.output, index=False)
+    print(
+        f"Backtested {len(grid):,} parameter sets x {close.shape[1]:,} tickers x {len(close):,} bars "
+        f"in {time.perf_counter() - start:.1f}s -> {args.output}"
+    )
+    print(rank_params(results, args.strategy).head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Server-side downsampling for large candlestick series.
+
+Candles and bar-style series are aggregated into fixed-size buckets of
+consecutive bars (open=first, high=max, low=min, close=last, volume=sum),
+and indicator lines are thinned with Largest-Triangle-Three-Buckets (LTTB),
+which keeps the visually important peaks and troughs.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+# Roughly how many horizontal pixels one candle needs to stay readable
+PIXELS_PER_CANDLE = 2
+
+
+def target_points(pixel_width: int, pixels_per_point: float = PIXELS_PER_CANDLE) -> int:
+    return max(int(pixel_width / pixels_per_point), 2)
+
+
+def bucket_size(n_bars: int, max_points: int) -> int:
+    """Bars per bucket so that at most `max_points` buckets remain (1 = full resolution)"""
+    return max(math.ceil(n_bars / max_points), 1)
+
+
+def bucket_starts(n_bars: int, size: int) -> np.ndarray:
+    return np.arange(0, n_bars, size)
+
+
+def aggregate_ohlcv(df: pd.DataFrame, size: int) -> pd.DataFrame:
+    """Collapse every `size` consecutive bars into one OHLCV bar stamped at its first bar"""
+    if size <= 1:
+        return df
+    starts = bucket_starts(len(df), size)
+    ends = np.minimum(starts + size, len(df)) - 1
+    out = {
+        "Open": df["Open"].to_numpy()[starts],
+        "High": np.maximum.reduceat(df["High"].to_numpy(), starts),
+        "Low": np.minimum.reduceat(df["Low"].to_numpy(), starts),
+        "Close": df["Close"].to_numpy()[ends],
+    }
+    if "Volume" in df.columns:
+        out["Volume"] = np.add.reduceat(df["Volume"].to_numpy(), starts)
+    return pd.DataFrame(out, index=df.index[starts])
+
+
+def aggregate_extreme(series: pd.Series, size: int) -> pd.Series:
+    """Keep the largest-magnitude value of each bucket (for histogram bars)"""
+    if size <= 1:
+        return series
+    values = series.to_numpy(dtype=float)
+    starts = bucket_starts(len(values), size)
+    filled = np.nan_to_num(values, nan=0.0)
+    peak = np.maximum.reduceat(filled, starts)
+    trough = np.minimum.reduceat(filled, starts)
+    return pd.Series(np.where(np.abs(peak) >= np.abs(trough), peak, trough), index=series.index[starts])
+
+
+def lttb(series: pd.Series, n_out: int) -> pd.Series:
+    """Largest-Triangle-Three-Buckets downsampling of a line series"""
+    series = series.dropna()
+    n = len(series)
+    if n_out >= n or n_out < 3:
+        return series
+
+    x = np.arange(n, dtype=float)
+    y = series.to_numpy(dtype=float)
+    # Interior points are split into n_out - 2 buckets; first and last points are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    bucket_means = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1) / np.diff(edges)
+    bucket_x = (edges[:-1] + edges[1:] - 1) / 2
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 1 < n_out - 2:
+            next_x, next_y = bucket_x[i + 1], bucket_means[i + 1]
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[lo:hi] - y[previous]) - (x[previous] - x[lo:hi]) * (next_y - y[previous])
+        )
+        previous = lo + int(area.argmax())
+        selected[i + 1] = previous
+
+    return series.iloc[selected]
+
+
+def downsample_chart(df: pd.DataFrame, max_points: int, line_columns=(), bar_columns=()) -> tuple:
+    """Downsample OHLCV plus indicator columns for plotting
+
+    Returns (candles, lines, bars, bars_per_bucket): candles is the
+    aggregated OHLCV frame, lines maps each line column to its LTTB series,
+    and bars maps each bar column to its bucketed series. Below `max_points`
+    bars everything is returned at full resolution.
+    """
+    size = bucket_size(len(df), max_points)
+    candles = aggregate_ohlcv(df, size)
+    lines = {col: lttb(df[col], max_points) if size > 1 else df[col] for col in line_columns if col in df}
+    bars = {col: aggregate_extreme(df[col], size) for col in bar_columns if col in df}
+    return candles, lines, bars, size
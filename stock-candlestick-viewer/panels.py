@@ -0,0 +1,314 @@
+"""Independently built chart panels for the candlestick viewer.
+
+Each panel (price, RSI, MACD) is a list of ready-made Plotly traces plus
+its axis settings, so the app can cache panels separately and compose a
+figure from whichever ones are switched on without rebuilding the rest.
+
+Above WEBGL_THRESHOLD bars in the visible range the panels switch to a
+WebGL encoding: lines become `Scattergl`, bars become GL "stems" (vertical
+segments separated by NaN gaps), and all data is sent as numeric typed
+arrays (x as epoch milliseconds, y as float32). Price stays a candlestick
+trace, which Plotly only draws in SVG; `price_band` opts into a GL
+high/low envelope with a close line instead.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from downsample import aggregate_extreme, aggregate_ohlcv, bucket_size, lttb
+
+OVERLAY_COLORS = ["#8e44ad", "#16a085", "#d35400", "#2c3e50", "#c0392b"]
+
+# Bars in the visible range above which "Auto" rendering switches from SVG to WebGL
+WEBGL_THRESHOLD = 5_000
+RENDER_MODES = ["Auto", "SVG", "WebGL"]
+
+
+def use_webgl(n_bars: int, mode: str = "Auto") -> bool:
+    """Whether to draw with WebGL, given the bar count before any downsampling"""
+    return mode == "WebGL" or (mode == "Auto" and n_bars > WEBGL_THRESHOLD)
+
+
+def x_values(index: pd.DatetimeIndex, webgl: bool = False) -> np.ndarray:
+    """x values in exchange wall time: datetime64, or epoch ms floats for WebGL
+
+    Tz-aware timestamps become an object array that Plotly copies and
+    serializes one element at a time; datetime64 goes through in bulk, and
+    float64 milliseconds (read as dates by a date axis) go as a typed array.
+    """
+    naive = (index.tz_localize(None) if index.tz is not None else index).to_numpy()
+    return naive.astype("datetime64[ms]").astype(np.float64) if webgl else naive
+
+
+def y_values(series: pd.Series, webgl: bool = False):
+    return series.to_numpy(dtype=np.float32) if webgl else series
+
+
+def stems(x: np.ndarray, y: np.ndarray) -> tuple:
+    """Bars as one GL polyline: (x, 0) -> (x, y) per bar, separated by NaN gaps"""
+    x3 = np.repeat(x, 3)
+    y3 = np.empty(len(y) * 3, dtype=np.float32)
+    y3[0::3], y3[1::3], y3[2::3] = 0, y, np.nan
+    return x3, y3
+
+
+def bar_traces(x: np.ndarray, y: np.ndarray, name: str, colors: tuple, webgl: bool) -> list:
+    """Bars split into a non-negative and a negative trace, one color each
+
+    Two traces replace the per-point color list; with one color the split is
+    skipped. In WebGL mode the bars are drawn as Scattergl stems.
+    """
+    y = np.asarray(y, dtype=np.float32 if webgl else np.float64)
+    if len(colors) == 1:
+        groups = [(np.ones(len(y), dtype=bool), colors[0], name)]
+    else:
+        rising = np.nan_to_num(y) >= 0
+        groups = [(rising, colors[0], name), (~rising, colors[1], name)]
+
+    traces = []
+    for i, (mask, color, label) in enumerate(groups):
+        common = dict(name=label, legendgroup=name, showlegend=i == 0)
+        if webgl:
+            sx, sy = stems(x[mask], y[mask])
+            traces.append(go.Scattergl(x=sx, y=sy, mode="lines", line=dict(color=color, width=1), **common))
+        else:
+            traces.append(go.Bar(x=x[mask], y=y[mask], marker=dict(color=color), **common))
+    return traces
+
+
+@dataclass
+class Panel:
+    title: str
+    height: float
+    traces: list
+    yaxis: dict = field(default_factory=dict)
+    hlines: Sequence[float] = ()
+    # Only the price panel plots volume on a secondary y-axis
+    secondary: List[bool] = None
+
+    def __post_init__(self):
+        self.secondary = self.secondary or [False] * len(self.traces)
+
+
+def price_panel(
+    frame: pd.DataFrame, max_points: int, overlays: Dict[str, str], webgl: bool = False, price_band: bool = False
+) -> tuple:
+    """Candles, volume and price overlays; returns (panel, candles, bars_per_candle)
+
+    `overlays` maps indicator columns in `frame` (e.g. "sma_20") to legend
+    labels. Band columns ("<spec>_upper"/"<spec>_lower") are drawn dotted in
+    their middle line's color. With `webgl` and `price_band`, price is drawn
+    as a GL high/low envelope with a close line instead of candles.
+    """
+    size = bucket_size(len(frame), max_points)
+    candles = aggregate_ohlcv(frame, size)
+    x = x_values(candles.index, webgl)
+    if webgl and price_band:
+        # Plotly has no GL candlestick; a high/low envelope keeps the range visible
+        traces = [
+            go.Scattergl(
+                x=x,
+                y=y_values(candles["Low"], webgl),
+                name="Low",
+                mode="lines",
+                line=dict(color="rgba(31, 119, 180, 0.3)", width=0.5),
+                legendgroup="Price",
+                showlegend=False
+            ),
+            go.Scattergl(
+                x=x,
+                y=y_values(candles["High"], webgl),
+                name="High",
+                mode="lines",
+                line=dict(color="rgba(31, 119, 180, 0.3)", width=0.5),
+                fill="tonexty",
+                fillcolor="rgba(31, 119, 180, 0.15)",
+                legendgroup="Price",
+                showlegend=False
+            ),
+            go.Scattergl(
+                x=x,
+                y=y_values(candles["Close"], webgl),
+                name="Price",
+                mode="lines",
+                line=dict(color="#1f77b4", width=1),
+                legendgroup="Price",
+                showlegend=True
+            )
+        ]
+    else:
+        traces = [
+            go.Candlestick(
+                x=x,
+                open=y_values(candles["Open"], webgl),
+                high=y_values(candles["High"], webgl),
+                low=y_values(candles["Low"], webgl),
+                close=y_values(candles["Close"], webgl),
+                name="Price",
+                showlegend=True
+            )
+        ]
+    secondary = [False] * len(traces)
+
+    traces += bar_traces(x, candles["Volume"].to_numpy(), "Volume", ("rgba(128, 128, 128, 0.3)",), webgl)
+    secondary.append(True)
+
+    scatter = go.Scattergl if webgl else go.Scatter
+    for i, (spec, label) in enumerate(overlays.items()):
+        color = OVERLAY_COLORS[i % len(OVERLAY_COLORS)]
+        band_lines = ((spec, "", "solid"), (f"{spec}_upper", " upper", "dot"), (f"{spec}_lower", " lower", "dot"))
+        for key, suffix, dash in band_lines:
+            if key not in frame:
+                continue
+            line = lttb(frame[key], max_points) if size > 1 else frame[key]
+            traces.append(
+                scatter(
+                    x=x_values(line.index, webgl),
+                    y=y_values(line, webgl),
+                    name=label + suffix,
+                    line=dict(color=color, width=1.5, dash=dash),
+                    showlegend=True
+                )
+            )
+            secondary.append(False)
+
+    panel = Panel("Price & Volume", 0.5, traces, dict(title_text="Price (₹)"), secondary=secondary)
+    return panel, candles, size
+
+
+def rsi_panel(rsi: pd.Series, max_points: int, period: int = 14, webgl: bool = False) -> Panel:
+    line = lttb(rsi, max_points)
+    scatter = go.Scattergl if webgl else go.Scatter
+    trace = scatter(
+        x=x_values(line.index, webgl),
+        y=y_values(line, webgl),
+        name="RSI",
+        line=dict(color="blue", width=2),
+        showlegend=True
+    )
+    return Panel(f"RSI ({period})", 0.25, [trace], dict(title_text="RSI", range=[0, 100]), hlines=(30, 70))
+
+
+def macd_panel(
+    macd: pd.Series, signal_line: pd.Series, hist: pd.Series, max_points: int, webgl: bool = False
+) -> Panel:
+    size = bucket_size(len(hist), max_points)
+    bars = aggregate_extreme(hist, size)
+    traces = bar_traces(x_values(bars.index, webgl), bars.to_numpy(), "Histogram", ("green", "red"), webgl)
+    scatter = go.Scattergl if webgl else go.Scatter
+    for series, name, color in ((macd, "MACD", "blue"), (signal_line, "Signal", "orange")):
+        line = lttb(series, max_points) if size > 1 else series
+        traces.append(
+            scatter(
+                x=x_values(line.index, webgl),
+                y=y_values(line, webgl),
+                name=name,
+                line=dict(color=color, width=2),
+                showlegend=True
+            )
+        )
+    return Panel("MACD (12, 26, 9)", 0.25, traces, dict(title_text="MACD"))
+
+
+def compose_figure(panels: Sequence[Panel], title: str) -> go.Figure:
+    """Stack panels into one shared-x figure; the first panel gets the volume axis"""
+    fig = make_subplots(
+        rows=len(panels),
+        cols=1,
+        shared_xaxes=True,
+        row_heights=[panel.height for panel in panels],
+        vertical_spacing=0.08,
+        subplot_titles=[panel.title for panel in panels],
+        specs=[[{"secondary_y": i == 0}] for i in range(len(panels))]
+    )
+
+    traces, rows, secondary = [], [], []
+    for row, panel in enumerate(panels, start=1):
+        traces += panel.traces
+        rows += [row] * len(panel.traces)
+        secondary += panel.secondary
+    fig.add_traces(traces, rows=rows, cols=[1] * len(traces), secondary_ys=secondary)
+
+    for row, panel in enumerate(panels, start=1):
+        for y in panel.hlines:
+            fig.add_hline(y=y, line_dash="dash", line_color="red", row=row, col=1, opacity=0.5)
+        fig.update_yaxes(row=row, col=1, secondary_y=False, **panel.yaxis)
+    fig.update_yaxes(title_text="Volume", row=1, col=1, secondary_y=True)
+    # Explicit date type so epoch-millisecond x values (WebGL mode) read as dates
+    fig.update_xaxes(type="date")
+    fig.update_xaxes(title_text="Date", row=len(panels), col=1)
+
+    fig.update_layout(
+        title=title,
+        xaxis_rangeslider_visible=False,
+        template="plotly_white",
+        height=450 + 225 * (len(panels) - 1),
+        hovermode="x unified",
+        # Split histogram traces cover disjoint bars, so they never overlap
+        barmode="relative",
+        margin=dict(l=50, r=50, t=80, b=50),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1,
+            bgcolor="rgba(255, 255, 255, 0.8)",
+            bordercolor="gray",
+            borderwidth=1
+        )
+    )
+    return fig
+
+
+def with_traces(panel: Panel, traces: list, secondary: Sequence[bool] = ()) -> Panel:
+    """Copy of a (possibly cached) panel with extra traces drawn on top"""
+    secondary = list(secondary) or [False] * len(traces)
+    return Panel(panel.title, panel.height, panel.traces + traces, panel.yaxis, panel.hlines, panel.secondary + secondary)
+
+
+def live_traces(tail: pd.DataFrame) -> dict:
+    """Traces for a forming bar, keyed "price", "rsi" and "macd" as (traces, secondary)
+
+    `tail` holds the last closed bar and the forming bar (OHLCV plus RSI,
+    MACD, Signal, Hist). The candle is drawn alone and the indicator lines
+    as dotted segments from the closed bar, so the closed-bar panels never
+    change while the bar forms.
+    """
+    x = x_values(tail.index)
+    live = tail.iloc[-1]
+    style = dict(showlegend=False, hoverinfo="x+y")
+    candle = go.Candlestick(
+        x=x[-1:],
+        open=[live["Open"]],
+        high=[live["High"]],
+        low=[live["Low"]],
+        close=[live["Close"]],
+        name="Forming",
+        increasing=dict(line=dict(color="#2ecc71"), fillcolor="rgba(46, 204, 113, 0.4)"),
+        decreasing=dict(line=dict(color="#e74c3c"), fillcolor="rgba(231, 76, 60, 0.4)"),
+        showlegend=False
+    )
+    volume = go.Bar(x=x[-1:], y=[live["Volume"]], marker=dict(color="rgba(128, 128, 128, 0.5)"), name="Volume", **style)
+
+    def segment(column: str, color: str) -> go.Scatter:
+        return go.Scatter(x=x, y=tail[column], mode="lines", name=column, line=dict(color=color, width=2, dash="dot"), **style)
+
+    hist_color = "green" if live["Hist"] >= 0 else "red"
+    return {
+        "price": ([candle, volume], [False, True]),
+        "rsi": ([segment("RSI", "blue")], [False]),
+        "macd": (
+            [
+                go.Bar(x=x[-1:], y=[live["Hist"]], marker=dict(color=hist_color, opacity=0.5), name="Histogram", **style),
+                segment("MACD", "blue"),
+                segment("Signal", "orange")
+            ],
+            [False] * 3
+        )
+    }
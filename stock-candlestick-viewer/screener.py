@@ -0,0 +1,144 @@
+"""Vectorized multi-ticker RSI/MACD screener.
+
+Prices for a whole universe are held as 2-D time x ticker float32 frames,
+and every indicator is computed for all columns in one pass, so scanning
+hundreds of tickers costs about the same Python overhead as one.
+"""
+
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from finstat_common import indicators
+from finstat_common.ohlcv_store import get_store
+
+DEFAULT_BATCH_SIZE = 100
+PRICE_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+# Columns of a screen table, so an empty universe still yields a rankable frame
+SCREEN_COLUMNS = {
+    "Close": np.float32,
+    "Change %": np.float32,
+    "RSI": np.float32,
+    "MACD": np.float32,
+    "Signal": np.float32,
+    "Hist": np.float32,
+    "Oversold": bool,
+    "Overbought": bool,
+    "Bullish Cross": bool,
+    "Bearish Cross": bool,
+}
+
+
+def parse_universe(text: str, suffix: str = ".NS") -> List[str]:
+    """Tickers from comma/newline separated text, adding the exchange suffix when missing"""
+    tickers = []
+    for raw in text.replace(",", "\n").splitlines():
+        symbol = raw.strip().upper()
+        if symbol and symbol not in ("SYMBOL", "TICKER"):
+            tickers.append(symbol if "." in symbol or symbol.startswith("^") else symbol + suffix)
+    return list(dict.fromkeys(tickers))
+
+
+def download_universe(
+    tickers: Iterable[str],
+    period: str,
+    interval: str = "1d",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    """Universe bars into {field: time x ticker float32 frame}
+
+    Bars go through the OHLCV store: tickers it already holds fresh are not
+    downloaded again, the rest are fetched in batches of `batch_size` and
+    stored for the next screen or chart.
+    """
+    series = get_store().read_many(tickers, period, interval, batch_size)
+    return {
+        field: (
+            pd.DataFrame({ticker: df[field] for ticker, df in series.items() if field in df.columns})
+            .sort_index()
+            .astype(np.float32)
+            if series
+            else pd.DataFrame(dtype=np.float32)
+        )
+        for field in PRICE_FIELDS
+    }
+
+
+def _panel(values: np.ndarray, like: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(values, index=like.index, columns=like.columns).astype(np.float32)
+
+
+def panel_rsi(close: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    """RSI for every column of a time x ticker close panel"""
+    return _panel(indicators.rsi(close.to_numpy(), period), close)
+
+
+def panel_macd(close: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9):
+    """MACD, signal and histogram panels for every column"""
+    return tuple(_panel(values, close) for values in indicators.macd(close.to_numpy(), fast, slow, signal))
+
+
+def screen(
+    close: pd.DataFrame,
+    rsi_period: int = 14,
+    oversold: float = 30,
+    overbought: float = 70,
+    cross_lookback: int = 3,
+) -> pd.DataFrame:
+    """One row per ticker with latest RSI/MACD readings and signal flags
+
+    A "fresh" MACD cross is a histogram sign change within the last
+    `cross_lookback` bars. Tickers with no data are dropped.
+    """
+    close = close.dropna(axis=1, how="all").ffill()
+    if close.empty:
+        empty = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in SCREEN_COLUMNS.items()})
+        empty.index.name = "Ticker"
+        return empty
+
+    rsi = panel_rsi(close, rsi_period)
+    macd, signal_line, hist = panel_macd(close)
+
+    sign = np.sign(hist.to_numpy())
+    crossed_up = (sign[1:] > 0) & (sign[:-1] <= 0)
+    crossed_down = (sign[1:] < 0) & (sign[:-1] >= 0)
+    recent = slice(-cross_lookback, None)
+
+    values = close.to_numpy()
+    first_valid = close.bfill().iloc[0].to_numpy()
+    table = pd.DataFrame(
+        {
+            "Close": values[-1],
+            "Change %": (values[-1] / first_valid - 1) * 100,
+            "RSI": rsi.iloc[-1].to_numpy(),
+            "MACD": macd.iloc[-1].to_numpy(),
+            "Signal": signal_line.iloc[-1].to_numpy(),
+            "Hist": hist.iloc[-1].to_numpy(),
+            "Oversold": rsi.iloc[-1].to_numpy() < oversold,
+            "Overbought": rsi.iloc[-1].to_numpy() > overbought,
+            "Bullish Cross": crossed_up[recent].any(axis=0),
+            "Bearish Cross": crossed_down[recent].any(axis=0),
+        },
+        index=close.columns,
+    )
+    table.index.name = "Ticker"
+    return table
+
+
+SCREENS = {
+    "Oversold (RSI)": (lambda t: t["Oversold"], "RSI", True),
+    "Overbought (RSI)": (lambda t: t["Overbought"], "RSI", False),
+    "Fresh bullish MACD cross": (lambda t: t["Bullish Cross"], "Hist", False),
+    "Fresh bearish MACD cross": (lambda t: t["Bearish Cross"], "Hist", True),
+    "All tickers": (lambda t: pd.Series(True, index=t.index), "Change %", False),
+}
+
+
+def rank(table: pd.DataFrame, screen_name: str) -> pd.DataFrame:
+    """Filter and sort a screen table using one of SCREENS"""
+    condition, sort_by, ascending = SCREENS[screen_name]
+    if table.empty:
+        return table.reindex(columns=list(SCREEN_COLUMNS))
+    return table[condition(table)].sort_values(sort_by, ascending=ascending)
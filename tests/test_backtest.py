@@ -0,0 +1,99 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+from finstat_common.providers import synthetic_ohlcv
+
+
+def test_hold_state_latches_from_entry_to_exit():
+    enter = np.array([0, 1, 0, 1, 0, 0, 1, 1], dtype=bool)
+    exit = np.array([1, 0, 0, 0, 1, 0, 1, 0], dtype=bool)
+    # A repeated entry while long changes nothing; a bar that is both entry and exit is an exit
+    expected = [0, 1, 1, 1, 0, 0, 0, 1]
+    np.testing.assert_array_equal(backtest.hold_state(enter, exit), expected)
+    # Columns latch independently
+    both = backtest.hold_state(np.column_stack([enter, exit]), np.column_stack([exit, enter]))
+    np.testing.assert_array_equal(both[:, 0], expected)
+
+
+def test_rsi_positions_enter_oversold_and_exit_overbought():
+    rsi = np.array([np.nan, 50, 25, 40, 65, 75, 50, 20])
+    np.testing.assert_array_equal(backtest.rsi_positions(rsi, 30, 70), [0, 0, 1, 1, 1, 0, 0, 1])
+
+
+def test_costs_and_returns_against_a_hand_computed_series():
+    close = np.array([100.0, 110.0, 99.0, 99.0, 108.9])
+    position = np.array([1.0, 1.0, 0.0, 0.0, 1.0])
+    net = backtest.simulate(backtest.bar_returns(close), position, cost_bps=10)
+    # Bar t earns position[t-1] * return[t]; every unit traded pays 10 bps on the bar it is traded
+    np.testing.assert_allclose(net, [-0.001, 0.1, -0.1 - 0.001, 0.0, -0.001])
+
+    metrics = backtest.performance(net, position, bars_per_year=5)
+    np.testing.assert_allclose(metrics["total_return"], np.prod(1 + net) - 1)
+    assert metrics["trades"] == 2 and metrics["exposure"] == pytest.approx(0.6)
+    equity = np.cumprod(1 + net)
+    np.testing.assert_allclose(metrics["max_drawdown"], np.min(equity / np.maximum.accumulate(equity) - 1))
+
+
+def test_macd_short_positions():
+    positions = backtest.macd_positions(np.array([1.0, -1.0, 0.0]), np.zeros(3), allow_short=True)
+    np.testing.assert_array_equal(positions, [1, -1, 0])
+
+
+@pytest.fixture
+def close() -> pd.DataFrame:
+    return pd.DataFrame({ticker: synthetic_ohlcv(ticker, "1d", bars=400)["Close"] for ticker in ("A.NS", "B.NS", "C.NS")})
+
+
+@pytest.mark.parametrize(
+    "strategy, grid",
+    [
+        ("rsi", backtest.rsi_grid([7, 14], [25, 30], [70, 75])),
+        ("macd", backtest.macd_grid([8, 12], [21, 26], [5, 9])),
+    ],
+)
+def test_pooled_sweep_matches_serial_sweep(close, strategy, grid):
+    serial = backtest.sweep(close, strategy, grid, max_workers=1)
+    pooled = backtest.sweep(close, strategy, grid, max_workers=2, chunk_size=3)
+    pd.testing.assert_frame_equal(pooled, serial)
+    assert len(serial) == len(grid) * close.shape[1]
+    # Each row is the single backtest of its parameters on its ticker
+    row = serial.iloc[4]
+    params = {name: row[name] for name in backtest.PARAM_NAMES[strategy]}
+    single = backtest.backtest(close[row["ticker"]].to_numpy(), strategy, params)
+    expected = [single.metrics[m] for m in backtest.METRICS]
+    np.testing.assert_allclose(row[list(backtest.METRICS)].to_numpy(dtype=float), expected)
+
+
+class RecordingSharedMemory(shared_memory.SharedMemory):
+    created = []
+
+    def __init__(self, name=None, create=False, size=0):
+        super().__init__(name=name, create=create, size=size)
+        if create:
+            RecordingSharedMemory.created.append(self.name)
+
+
+def _failing_chunk(args):
+    raise RuntimeError("worker failed")
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_shared_memory_is_unlinked(close, monkeypatch, fail):
+    RecordingSharedMemory.created = []
+    monkeypatch.setattr(backtest.shared_memory, "SharedMemory", RecordingSharedMemory)
+    if fail:
+        monkeypatch.setattr(backtest, "_run_chunk", _failing_chunk)
+    grid = backtest.rsi_grid([7, 14], [25, 30], [70, 75])
+    if fail:
+        with pytest.raises(RuntimeError, match="worker failed"):
+            backtest.sweep(close, "rsi", grid, max_workers=2, chunk_size=2)
+    else:
+        backtest.sweep(close, "rsi", grid, max_workers=2, chunk_size=2)
+
+    assert len(RecordingSharedMemory.created) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=RecordingSharedMemory.created[0])
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from batch_dcf import INPUT_COLUMNS, output_columns, run_batch, value_frame
+from dcf_engine import dcf_valuation
+
+
+@pytest.fixture
+def assumptions() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    n = 10
+    return pd.DataFrame(
+        {
+            "ticker": [f"T{i}" for i in range(n)],
+            "revenue_start": rng.uniform(100, 1_000, n),
+            "growth_rate": rng.uniform(0, 20, n),
+            "ebit_margin": rng.uniform(10, 30, n),
+            "tax_rate": np.full(n, 25.0),
+            "discount_rate": rng.uniform(9, 14, n),
+            "terminal_growth": np.full(n, 4.0),
+            "shares_out": np.full(n, 1e7),
+        }
+    )
+
+
+def test_per_row_years_with_blanks_use_default(assumptions):
+    assumptions["years"] = [5, np.nan] * 5
+    valued = value_frame(assumptions, years=10)
+    inputs = [assumptions[col].to_numpy() for col in INPUT_COLUMNS]
+    five = dcf_valuation(*inputs[:6], 5, inputs[6]).intrinsic_value_per_share
+    ten = dcf_valuation(*inputs[:6], 10, inputs[6]).intrinsic_value_per_share
+    np.testing.assert_allclose(valued["intrinsic_value_per_share"], np.where(assumptions["years"] == 5, five, ten))
+
+
+def test_invalid_years_raise(assumptions):
+    assumptions["years"] = 2.5
+    with pytest.raises(ValueError, match="years"):
+        value_frame(assumptions, years=10)
+
+
+def test_passthrough_column_null_in_one_chunk(assumptions, tmp_path):
+    assumptions["note"] = [None] * 5 + ["checked"] * 5
+    source, target = tmp_path / "in.parquet", tmp_path / "out.parquet"
+    assumptions.to_parquet(source)
+    assert run_batch(source, target, chunk_rows=5, max_workers=1) == 10
+    out = pd.read_parquet(target)
+    assert list(out["note"].iloc[5:]) == ["checked"] * 5
+    assert out["note"].iloc[:5].isna().all()
+
+
+def test_empty_input_writes_schema(assumptions, tmp_path):
+    source, target = tmp_path / "in.parquet", tmp_path / "out.parquet"
+    assumptions.iloc[:0].to_parquet(source)
+    assert run_batch(source, target) == 0
+    assert pq.read_schema(target).names == list(assumptions.columns) + output_columns()
+
+
+def test_output_column_clash_is_rejected(assumptions, tmp_path):
+    source = tmp_path / "in.csv"
+    assumptions.assign(enterprise_value=1.0).to_csv(source, index=False)
+    with pytest.raises(ValueError, match="clash"):
+        run_batch(source, tmp_path / "out.parquet")
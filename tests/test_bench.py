@@ -0,0 +1,55 @@
+import pytest
+
+from finstat_common import bench
+
+
+def run(seconds: float, peak_bytes: int) -> dict:
+    return {"seconds": seconds, "peak_bytes": peak_bytes}
+
+
+def results(**cases) -> dict:
+    return {"created": "2026-01-01T00:00:00+00:00", "environment": {}, "results": cases}
+
+
+def test_compare_flags_only_real_regressions():
+    mb = 1024 * 1024
+    baseline = results(
+        **{
+            "rsi/1000": run(0.100, 10 * mb),
+            "macd/1000": run(0.100, 10 * mb),
+            "tiny/1000": run(0.001, 10 * mb),
+            "gone/1000": run(0.100, 10 * mb),
+        }
+    )
+    current = results(
+        **{
+            # 50% slower and 3x the memory
+            "rsi/1000": run(0.150, 30 * mb),
+            # Within the 25% threshold
+            "macd/1000": run(0.120, 12 * mb),
+            # Triples, but by less than the 5 ms floor
+            "tiny/1000": run(0.003, 10 * mb),
+            "new/1000": run(9.0, 900 * mb),
+        }
+    )
+    regressions = bench.compare(current, baseline)
+    assert [(r.key, r.metric) for r in regressions] == [("rsi/1000", "seconds"), ("rsi/1000", "peak_bytes")]
+    assert regressions[0].change == pytest.approx(0.5)
+    assert bench.compare(current, baseline, threshold=0.6, memory_threshold=3.0) == []
+
+
+def test_report_exit_status(capsys):
+    baseline = results(**{"rsi/1000": run(0.1, 0)})
+    assert bench.report(results(**{"rsi/1000": run(0.1, 0)}), baseline, []) == 0
+    regressions = bench.compare(results(**{"rsi/1000": run(0.2, 0)}), baseline)
+    assert bench.report(results(**{"rsi/1000": run(0.2, 0)}), baseline, regressions) == 1
+    assert "REGRESSION rsi/1000" in capsys.readouterr().out
+
+
+def test_run_suite_honours_stages_cases_and_size_caps():
+    suite = bench.run_suite(stages=["compute"], sizes=[1_000, 200_000], cases=["rsi", "ratios"], repeat=1)
+    # ratios is capped at 100k ticker-periods
+    assert sorted(suite["results"]) == ["ratios/1000", "rsi/1000", "rsi/200000"]
+    measurement = suite["results"]["rsi/1000"]
+    assert measurement["stage"] == "compute" and measurement["runs"] == 1
+    assert measurement["seconds"] > 0 and measurement["peak_bytes"] > 0
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from dcf_engine import SENSITIVITY_INPUTS, dcf_sensitivities, dcf_valuation, sensitivity_grid
+
+BASE = {"revenue_start": 1_000.0, "ebit_margin": 18.0, "tax_rate": 25.0, "shares_out": 1e8}
+
+
+def loop_value(revenue_start, growth, margin, tax, wacc, g_terminal, years, shares_out):
+    """The app's original year-by-year valuation loop"""
+    fcf, pv = 0.0, 0.0
+    for year in range(1, years + 1):
+        revenue = revenue_start * (1 + growth / 100) ** year
+        fcf = revenue * margin / 100 * (1 - tax / 100)
+        pv += fcf / (1 + wacc / 100) ** year
+    terminal = fcf * (1 + g_terminal / 100) / (wacc / 100 - g_terminal / 100)
+    return (pv + terminal / (1 + wacc / 100) ** years) / shares_out
+
+
+def test_scalar_valuation_matches_the_loop():
+    result = dcf_valuation(1_000.0, 12.0, 18.0, 25.0, 11.0, 4.0, 10, 1e8)
+    expected = loop_value(1_000.0, 12.0, 18.0, 25.0, 11.0, 4.0, 10, 1e8)
+    assert result.intrinsic_value_per_share == pytest.approx(expected, rel=1e-12)
+    assert result.enterprise_value == pytest.approx(result.pv_fcf + result.terminal_pv, rel=1e-12)
+
+
+def test_grid_matches_scenario_by_scenario():
+    waccs, growths, terminals = [9.0, 11.0, 13.0], [0.0, 8.0, 15.0, 25.0], [2.0, 5.0]
+    grid = sensitivity_grid(BASE, waccs, growths, terminals, 7)
+    assert grid.shape == (3, 4, 2)
+    for i, wacc in enumerate(waccs):
+        for j, growth in enumerate(growths):
+            for k, g_terminal in enumerate(terminals):
+                expected = loop_value(1_000.0, growth, 18.0, 25.0, wacc, g_terminal, 7, 1e8)
+                assert grid[i, j, k] == pytest.approx(expected, rel=1e-12)
+
+
+def test_wacc_at_or_below_terminal_growth_is_nan():
+    values = dcf_valuation(1_000.0, 10.0, 18.0, 25.0, np.array([3.0, 4.0, 5.0]), 4.0, 5).intrinsic_value_per_share
+    assert np.isnan(values[:2]).all() and np.isfinite(values[2])
+
+
+INPUTS = {
+    "revenue_start": 1_000.0,
+    "growth_rate": 12.0,
+    "ebit_margin": 18.0,
+    "tax_rate": 25.0,
+    "discount_rate": 11.0,
+    "terminal_growth": 4.0,
+    "years": 10,
+    "shares_out": 1e8,
+}
+
+
+def value(**changes) -> float:
+    return float(dcf_valuation(**{**INPUTS, **changes}).intrinsic_value_per_share)
+
+
+def test_sensitivities_match_finite_differences():
+    result, partials, elasticities = dcf_sensitivities(**INPUTS)
+    assert result.intrinsic_value_per_share == pytest.approx(value(), rel=1e-12)
+    h = 1e-4
+    for name in SENSITIVITY_INPUTS:
+        if name == "years":
+            # One extra projection year, exactly
+            expected = value(years=INPUTS["years"] + 1) - value()
+        else:
+            expected = (value(**{name: INPUTS[name] + h}) - value(**{name: INPUTS[name] - h})) / (2 * h)
+        assert partials[name] == pytest.approx(expected, rel=1e-6), name
+        assert elasticities[name] == pytest.approx(partials[name] * INPUTS[name] / value(), rel=1e-12), name
+
+
+def test_sensitivities_broadcast_and_flag_invalid_scenarios():
+    waccs = np.array([3.0, 9.0, 12.0])
+    result, partials, _ = dcf_sensitivities(**{**INPUTS, "discount_rate": waccs})
+    assert np.isnan(result.intrinsic_value_per_share[0]) and np.isnan(partials["terminal_growth"][0])
+    for i, wacc in enumerate(waccs[1:], start=1):
+        _, single, _ = dcf_sensitivities(**{**INPUTS, "discount_rate": wacc})
+        for name in SENSITIVITY_INPUTS:
+            assert partials[name][i] == pytest.approx(single[name], rel=1e-12), name
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import aggregate_ohlcv, lttb
+
+
+@pytest.fixture
+def line() -> pd.Series:
+    rng = np.random.default_rng(7)
+    return pd.Series(np.cumsum(rng.normal(size=5_000)), index=pd.date_range("2024-01-01", periods=5_000, freq="h"))
+
+
+@pytest.mark.parametrize("n_out", [3, 10, 500, 4_999])
+def test_lttb_keeps_endpoints_and_size(line, n_out):
+    out = lttb(line, n_out)
+    assert len(out) == n_out
+    assert out.index[0] == line.index[0] and out.index[-1] == line.index[-1]
+    assert out.iloc[0] == line.iloc[0] and out.iloc[-1] == line.iloc[-1]
+    assert out.index.is_monotonic_increasing and out.index.is_unique
+
+
+def test_lttb_keeps_global_extremes_of_a_spike(line):
+    spiked = line.copy()
+    spiked.iloc[2_345] = 1_000.0
+    assert lttb(spiked, 100).max() == 1_000.0
+
+
+def test_lttb_passes_short_series_through(line):
+    assert lttb(line.iloc[:50], 100).equals(line.iloc[:50])
+
+
+def test_aggregate_ohlcv_buckets():
+    index = pd.date_range("2024-01-01", periods=7, freq="D")
+    df = pd.DataFrame(
+        {"Open": np.arange(7.0), "High": np.arange(7.0) + 2, "Low": np.arange(7.0) - 1, "Close": np.arange(7.0) + 1,
+         "Volume": np.ones(7)},
+        index=index,
+    )
+    out = aggregate_ohlcv(df, 3)
+    assert list(out.index) == list(index[[0, 3, 6]])
+    assert list(out["Open"]) == [0, 3, 6]
+    assert list(out["High"]) == [4, 7, 8]
+    assert list(out["Low"]) == [-1, 2, 5]
+    assert list(out["Close"]) == [3, 6, 7]
+    assert list(out["Volume"]) == [3, 3, 1]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from dcf_engine import dcf_valuation
+from fcf_schedule import project_schedule, schedule_valuation, stage_growth
+
+
+def test_constant_schedule_reduces_to_single_stage():
+    years = 10
+    result, _ = schedule_valuation(1_000.0, np.full(years, 12.0), 20.0, 25.0, 11.0, 4.0, shares_out=10.0)
+    single = dcf_valuation(1_000.0, 12.0, 20.0, 25.0, 11.0, 4.0, years, 10.0)
+    np.testing.assert_allclose(result.intrinsic_value_per_share, single.intrinsic_value_per_share, rtol=1e-12)
+
+
+def test_scalar_growth_is_a_one_year_schedule():
+    schedule = project_schedule(100.0, 10.0, 20.0, 25.0)
+    assert schedule["revenue"].shape == (1,)
+    assert schedule["revenue"][0] == pytest.approx(110.0)
+
+
+def test_scalar_growth_broadcasts_against_per_year_margins():
+    margins = np.array([10.0, 20.0, 30.0])
+    schedule = project_schedule(100.0, 10.0, margins, 0.0)
+    np.testing.assert_allclose(schedule["revenue"], [110.0, 121.0, 133.1])
+    np.testing.assert_allclose(schedule["ebit"], [11.0, 24.2, 39.93])
+
+
+def test_batch_inputs_broadcast_across_companies_and_years():
+    growth = stage_growth([20.0, 8.0], 3, 4.0, 2)
+    capex = np.array([[5.0], [2.0]])
+    schedule = project_schedule([100.0, 50.0], growth, 15.0, 25.0, capex=capex, depreciation=3.0, nwc=10.0)
+    assert all(values.shape == (2, 5) for values in schedule.values())
+    expected = project_schedule(50.0, growth[1], 15.0, 25.0, capex=2.0, depreciation=3.0, nwc=10.0)
+    for key, values in expected.items():
+        np.testing.assert_allclose(schedule[key][1], values, err_msg=key)
+
+
+@pytest.mark.parametrize("years", [5, 3])
+def test_per_company_vectors_apply_to_every_year(years):
+    # Three companies; with a 3-year schedule a 1-D vector could also be read as per-year
+    revenue = np.array([100.0, 50.0, 80.0])
+    growth = stage_growth([20.0, 8.0, 12.0], years - 1, 4.0, 1)
+    schedule = project_schedule(revenue, growth, [15.0, 10.0, 20.0], 25.0, capex=[5.0, 2.0, 4.0])
+    assert all(values.shape == (3, years) for values in schedule.values())
+    for i, (margin, capex) in enumerate([(15.0, 5.0), (10.0, 2.0), (20.0, 4.0)]):
+        expected = project_schedule(revenue[i], growth[i], margin, 25.0, capex=capex)
+        for key, values in expected.items():
+            np.testing.assert_allclose(schedule[key][i], values, err_msg=key)
+
+
+def test_batch_valuation_with_per_company_rates_matches_one_at_a_time():
+    growth = stage_growth([20.0, 8.0], 4, 4.0, 2)
+    result, _ = schedule_valuation([100.0, 50.0], growth, [15.0, 10.0], 25.0, [11.0, 9.0], 4.0, [10.0, 5.0])
+    for i, (revenue, margin, wacc, shares) in enumerate([(100.0, 15.0, 11.0, 10.0), (50.0, 10.0, 9.0, 5.0)]):
+        single, _ = schedule_valuation(revenue, growth[i], margin, 25.0, wacc, 4.0, shares)
+        assert result.intrinsic_value_per_share[i] == pytest.approx(single.intrinsic_value_per_share, rel=1e-12)
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from finstat_common import fundamentals_cache
+from finstat_common.fundamentals_cache import (
+    EMPTY_TTL,
+    FILING_LAG,
+    LOCK_TIMEOUT,
+    RETRY_TTL,
+    FundamentalsCache,
+    statement_expiry,
+)
+
+
+def statement(*periods: str) -> pd.DataFrame:
+    columns = pd.to_datetime(list(periods))
+    return pd.DataFrame([[100.0] * len(columns)], index=["Total Assets"], columns=columns)
+
+
+class Fetch:
+    """Serves `values` in turn; an Exception instance is raised instead of returned"""
+
+    def __init__(self, *values):
+        self.values, self.calls = list(values), 0
+
+    def __call__(self, ticker, field):
+        value = self.values[min(self.calls, len(self.values) - 1)]
+        self.calls += 1
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+def expire(cache: FundamentalsCache, ticker: str, field: str):
+    value, meta = cache.read(ticker, field)
+    cache.write(ticker, field, value, {**meta, "expires_at": 0})
+
+
+def wait_for_revalidation(cache: FundamentalsCache):
+    deadline = time.monotonic() + 5
+    while cache._inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not cache._inflight
+
+
+@pytest.mark.parametrize("field", ["balance_sheet", "quarterly_balance_sheet"])
+def test_statement_expiry_is_the_next_expected_filing(field):
+    latest = pd.Timestamp("2025-03-31")
+    expected = (latest + FILING_LAG[fundamentals_cache.statement_freq(field)]).timestamp()
+    before = pd.Timestamp("2025-04-15").timestamp()
+    assert statement_expiry(field, statement("2024-03-31", "2025-03-31"), before) == expected
+    # Once the filing is overdue, check again a day later rather than constantly
+    overdue = expected + 10
+    assert statement_expiry(field, statement("2025-03-31"), overdue) == overdue + RETRY_TTL
+
+
+def test_statement_expiry_for_empty_statements():
+    now = time.time()
+    assert statement_expiry("balance_sheet", pd.DataFrame(), now) == now + EMPTY_TTL
+    assert statement_expiry("balance_sheet", None, now) == now + EMPTY_TTL
+
+
+def test_stale_value_is_served_while_revalidating(tmp_path):
+    release = threading.Event()
+    old, new = statement("2024-03-31"), statement("2025-03-31")
+
+    def fetch(ticker, field):
+        if fetch.calls:
+            release.wait(5)
+            return new
+        fetch.calls += 1
+        return old
+
+    fetch.calls = 0
+    cache = FundamentalsCache(tmp_path, fetch)
+    cache.get("TCS.NS", "balance_sheet")
+    expire(cache, "TCS.NS", "balance_sheet")
+
+    pd.testing.assert_frame_equal(cache.get("TCS.NS", "balance_sheet"), old, check_freq=False)
+    assert cache._inflight == {("TCS.NS", "balance_sheet")}
+    release.set()
+    wait_for_revalidation(cache)
+    pd.testing.assert_frame_equal(cache.get("TCS.NS", "balance_sheet"), new, check_freq=False)
+
+
+def test_inline_refresh_falls_back_to_the_stale_copy(tmp_path):
+    old = statement("2024-03-31")
+    cache = FundamentalsCache(tmp_path, Fetch(old, RuntimeError("Yahoo is down")))
+    cache.get("TCS.NS", "balance_sheet")
+    expire(cache, "TCS.NS", "balance_sheet")
+    pd.testing.assert_frame_equal(cache.get("TCS.NS", "balance_sheet", background=False), old, check_freq=False)
+    assert cache.fetch.calls == 2
+
+
+@pytest.mark.parametrize("field, full, empty", [("info", {"sector": "Technology"}, {}), ("balance_sheet", None, None)])
+def test_empty_result_never_replaces_stored_data(tmp_path, field, full, empty):
+    full = statement("2024-03-31") if full is None else full
+    empty = pd.DataFrame() if empty is None else empty
+    cache = FundamentalsCache(tmp_path, Fetch(full, empty))
+    cache.get("TCS.NS", field)
+    expire(cache, "TCS.NS", field)
+
+    refreshed = cache.get("TCS.NS", field, background=False)
+    stored, _ = cache.read("TCS.NS", field)
+    for value in (refreshed, stored):
+        assert not fundamentals_cache.is_empty(value)
+    # The throttled field is not asked for again straight away
+    cache.get("TCS.NS", field, background=False)
+    assert cache.fetch.calls == 2
+
+
+def test_empty_result_is_only_kept_briefly(tmp_path):
+    cache = FundamentalsCache(tmp_path, Fetch({}))
+    before = time.time()
+    assert cache.get("NEW.NS", "info") == {}
+    _, meta = cache.read("NEW.NS", "info")
+    assert before + EMPTY_TTL <= meta["expires_at"] <= time.time() + EMPTY_TTL
+
+
+def test_abandoned_lock_is_broken(tmp_path):
+    cache = FundamentalsCache(tmp_path, Fetch({}))
+    lock = cache._lock_path("TCS.NS", "info")
+    assert cache._acquire(lock)
+    # A live lock held by another process is respected
+    assert not cache._acquire(lock)
+    stale = time.time() - LOCK_TIMEOUT - 1
+    os.utime(lock, (stale, stale))
+    assert cache._acquire(lock)
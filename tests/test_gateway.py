@@ -0,0 +1,62 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from finstat_common.gateway import RequestGateway
+from finstat_common.providers import EmptyDownloadError, checked_download, synthetic_ohlcv
+
+
+class RateLimitedDownload:
+    """Stands in for `yf.download`: logs a rate limit and returns no rows for the first `limited` calls"""
+
+    def __init__(self, limited: int, error: str = "YFRateLimitError('Too Many Requests. Rate limited.')"):
+        self.limited, self.error, self.calls = limited, error, 0
+
+    def __call__(self, ticker, **kwargs):
+        self.calls += 1
+        if self.calls <= self.limited:
+            logging.getLogger("yfinance").error(f"['{ticker}']: {self.error}")
+            return pd.DataFrame()
+        return synthetic_ohlcv(ticker, "1d", bars=30)
+
+
+@pytest.fixture
+def gateway():
+    return RequestGateway(rate=1000, burst=1000, backoff=0)
+
+
+def test_empty_rate_limited_download_is_retried(gateway):
+    download = RateLimitedDownload(limited=2)
+    data = gateway.call("TCS.NS", checked_download, download, "TCS.NS", period="1mo")
+    assert len(data) == 30 and download.calls == 3
+    stats = gateway.stats()
+    assert stats["retries"] == 2 and stats["failures"] == 0
+
+
+def test_empty_download_is_not_memoized(gateway):
+    download = RateLimitedDownload(limited=1, error="YFPricesMissingError('possibly delisted')")
+    with pytest.raises(EmptyDownloadError, match="delisted"):
+        gateway.call("GONE.NS", checked_download, download, "GONE.NS", period="1mo")
+    # Not a rate limit: no retry, and the next call goes upstream instead of reusing the failure
+    assert download.calls == 1 and gateway.stats()["retries"] == 0
+    assert len(gateway.call("GONE.NS", checked_download, download, "GONE.NS", period="1mo")) == 30
+
+
+def test_rate_limit_gives_up_after_max_retries(gateway):
+    download = RateLimitedDownload(limited=10)
+    with pytest.raises(EmptyDownloadError, match="Too Many Requests"):
+        gateway.call("TCS.NS", checked_download, download, "TCS.NS", period="1mo")
+    assert download.calls == gateway.max_retries + 1 and gateway.stats()["failures"] == 1
+
+
+def test_empty_results_are_not_reused(gateway):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return pd.DataFrame()
+
+    gateway.call("key", fetch)
+    gateway.call("key", fetch)
+    assert len(calls) == 2 and gateway.stats()["hits"] == 0
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finstat_common import indicators, ohlcv_store
+from finstat_common.incremental import EMAState, IndicatorState, advance
+from finstat_common.providers import synthetic_ohlcv
+
+
+@pytest.fixture
+def close() -> pd.Series:
+    return synthetic_ohlcv("INFY.NS", "15m", bars=600, end="2025-06-30 15:30")["Close"]
+
+
+def full_recompute(close: pd.Series) -> pd.DataFrame:
+    values = close.to_numpy()
+    macd, signal, hist = indicators.macd(values)
+    return pd.DataFrame(
+        {"RSI": indicators.rsi(values), "MACD": macd, "Signal": signal, "Hist": hist}, index=close.index
+    )
+
+
+def test_ema_state_matches_ewm(close):
+    state = EMAState(alpha=0.2)
+    values = [state.update(x) for x in close]
+    np.testing.assert_allclose(values, close.ewm(alpha=0.2, adjust=False).mean(), rtol=1e-12)
+
+
+def test_append_from_empty_matches_full_recompute(close):
+    frame = IndicatorState().append(close)
+    pd.testing.assert_frame_equal(frame, full_recompute(close), rtol=1e-9)
+
+
+def test_warm_then_append_matches_full_recompute(close):
+    state, warm = IndicatorState.warm(close.iloc[:400])
+    tail = state.append(close)
+    assert len(tail) == 200
+    pd.testing.assert_frame_equal(pd.concat([warm, tail]), full_recompute(close), rtol=1e-9)
+
+
+def test_state_round_trips_through_dict(close):
+    state, _ = IndicatorState.warm(close.iloc[:300])
+    restored = IndicatorState.from_dict(state.to_dict())
+    pd.testing.assert_frame_equal(restored.append(close), state.append(close))
+
+
+class RevisingFeed:
+    """Serves the first `upto` bars of `truth`, with a provisional close on the last one"""
+
+    def __init__(self, truth: pd.DataFrame, upto: int, factor: float = 1.00005):
+        self.truth, self.upto, self.factor, self.calls = truth, upto, factor, []
+
+    def __call__(self, ticker, interval, auto_adjust, start=None, period=None):
+        self.calls.append(start)
+        df = self.truth.iloc[: self.upto].copy()
+        # Within the store's adjustment tolerance, so a refresh splices it instead of re-downloading
+        df.iloc[-1, df.columns.get_loc("Close")] *= self.factor
+        return df[df.index >= start] if start is not None else df
+
+
+@pytest.fixture
+def live_bars() -> pd.DataFrame:
+    # Ends now so the store's period slicing keeps every bar
+    return synthetic_ohlcv("LIVE.NS", "15m", bars=300)
+
+
+@pytest.mark.parametrize("interval", ["15m", "30m"])
+def test_store_indicators_match_full_recompute_after_delta_refresh(tmp_path, monkeypatch, live_bars, interval):
+    monkeypatch.setattr(ohlcv_store, "REFRESH_SECONDS", {})
+    feed = RevisingFeed(live_bars, 200)
+    store = ohlcv_store.OHLCVStore(root=tmp_path, fetch=feed)
+
+    for upto in (200, 201, 260, 300):
+        feed.upto = upto
+        values = store.read_indicators("LIVE.NS", "1mo", interval)
+        bars = store.read_interval("LIVE.NS", "1mo", interval)
+        pd.testing.assert_frame_equal(values, full_recompute(bars["Close"]), rtol=1e-9, check_freq=False)
+    # Only the first read downloaded the whole history
+    assert feed.calls[0] is None and all(start is not None for start in feed.calls[1:])
+
+
+@pytest.mark.parametrize("interval", ["15m", "30m"])
+def test_store_indicators_follow_a_revised_last_bar(tmp_path, monkeypatch, live_bars, interval):
+    monkeypatch.setattr(ohlcv_store, "REFRESH_SECONDS", {})
+    feed = RevisingFeed(live_bars, 200)
+    store = ohlcv_store.OHLCVStore(root=tmp_path, fetch=feed)
+    before = store.read_indicators("LIVE.NS", "1mo", interval)
+
+    feed.factor = 0.99995
+    values = store.read_indicators("LIVE.NS", "1mo", interval)
+    bars = store.read_interval("LIVE.NS", "1mo", interval)
+    assert values["MACD"].iloc[-1] != before["MACD"].iloc[-1]
+    pd.testing.assert_frame_equal(values, full_recompute(bars["Close"]), rtol=1e-9, check_freq=False)
+
+
+def test_store_indicators_rebuild_after_history_is_readjusted(tmp_path, monkeypatch, live_bars):
+    monkeypatch.setattr(ohlcv_store, "REFRESH_SECONDS", {})
+    feed = RevisingFeed(live_bars, 250)
+    store = ohlcv_store.OHLCVStore(root=tmp_path, fetch=feed)
+    store.read_indicators("LIVE.NS", "1mo", "15m")
+
+    # A 1:2 split re-adjusts every stored close
+    adjusted = live_bars.copy()
+    adjusted[["Open", "High", "Low", "Close"]] /= 2
+    feed.truth, feed.upto = adjusted, 280
+    values = store.read_indicators("LIVE.NS", "1mo", "15m")
+    bars = store.read_interval("LIVE.NS", "1mo", "15m")
+    assert bars["Close"].iloc[0] == adjusted["Close"].iloc[0]
+    pd.testing.assert_frame_equal(values, full_recompute(bars["Close"]), rtol=1e-9, check_freq=False)
+
+
+def test_stale_state_is_rewarmed(close):
+    state, _ = IndicatorState.warm(close.iloc[:300])
+    # A state whose last close no longer matches the series is rebuilt from scratch
+    state.rsi.prev_close += 1.0
+    state, frame = advance(state, close)
+    pd.testing.assert_frame_equal(frame, full_recompute(close), rtol=1e-9)
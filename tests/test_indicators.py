@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from finstat_common import indicators
+from finstat_common.providers import synthetic_ohlcv
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    return synthetic_ohlcv("TEST.NS", "1h", bars=300)
+
+
+def wilder(values, period):
+    """Recursive Wilder smoothing seeded with the first value"""
+    out = np.empty(len(values))
+    out[0] = values[0]
+    for i in range(1, len(values)):
+        out[i] = out[i - 1] + (values[i] - out[i - 1]) / period
+    return out
+
+
+def test_rsi_matches_a_wilder_loop(bars):
+    close = bars["Close"].to_numpy()
+    delta = np.diff(close)
+    gain = wilder(np.r_[0.0, np.maximum(delta, 0)], 14)
+    loss = wilder(np.r_[0.0, np.maximum(-delta, 0)], 14)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = 100 - 100 / (1 + gain / loss)
+    np.testing.assert_allclose(indicators.rsi(close, 14)[1:], expected[1:], rtol=1e-10)
+
+
+def test_rolling_indicators_match_pandas(bars):
+    close = bars["Close"]
+    np.testing.assert_allclose(indicators.sma(close, 20), close.rolling(20).mean(), equal_nan=True)
+    np.testing.assert_allclose(indicators.ema(close, 20), close.ewm(span=20, adjust=False).mean())
+    middle, upper, lower = indicators.bollinger(close, 20, 2.0)
+    np.testing.assert_allclose(upper - middle, 2 * close.rolling(20).std(ddof=0), equal_nan=True)
+    np.testing.assert_allclose(middle - lower, upper - middle, equal_nan=True)
+
+    k, d = indicators.stochastic(bars["High"], bars["Low"], close, 14, 3)
+    highest, lowest = bars["High"].rolling(14).max(), bars["Low"].rolling(14).min()
+    np.testing.assert_allclose(k, 100 * (close - lowest) / (highest - lowest), equal_nan=True)
+    np.testing.assert_allclose(d, pd.Series(k).rolling(3).mean(), equal_nan=True)
+
+
+def test_atr_and_obv_match_loops(bars):
+    high, low, close, volume = (bars[col].to_numpy() for col in ("High", "Low", "Close", "Volume"))
+    ranges = [high[0] - low[0]] + [
+        max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])) for i in range(1, len(close))
+    ]
+    np.testing.assert_allclose(indicators.atr(high, low, close, 14), wilder(np.array(ranges), 14), rtol=1e-10)
+
+    balance = [0.0]
+    for i in range(1, len(close)):
+        balance.append(balance[-1] + np.sign(close[i] - close[i - 1]) * volume[i])
+    np.testing.assert_allclose(indicators.obv(close, volume), balance)
+
+
+def test_vwap_restarts_each_session(bars):
+    sessions = indicators.session_ids(bars.index)
+    assert sessions is not None
+    result = indicators.vwap(bars["High"], bars["Low"], bars["Close"], bars["Volume"], sessions)
+    typical = (bars["High"] + bars["Low"] + bars["Close"]) / 3
+    by_day = bars.index.normalize()
+    expected = (typical * bars["Volume"]).groupby(by_day).cumsum() / bars["Volume"].groupby(by_day).cumsum()
+    np.testing.assert_allclose(result, expected)
+    assert indicators.session_ids(synthetic_ohlcv("TEST.NS", "1d", bars=30).index) is None
+
+
+def test_two_dimensional_input_is_column_by_column(bars):
+    close = np.column_stack([bars["Close"], bars["Close"][::-1]])
+    for fn in (lambda v: indicators.sma(v, 10), lambda v: indicators.rsi(v, 14), lambda v: indicators.macd(v)[2]):
+        result = fn(close)
+        assert result.shape == close.shape
+        for j in range(close.shape[1]):
+            np.testing.assert_allclose(result[:, j], fn(close[:, j]), equal_nan=True)
+
+
+def test_compute_expands_specs_and_defaults(bars):
+    out = indicators.compute(bars, ["sma_50", "bbands", "macd_5_13_4", "stoch", "vwap"])
+    assert set(out) == {
+        "sma_50", "bbands", "bbands_upper", "bbands_lower", "macd_5_13_4", "macd_5_13_4_signal",
+        "macd_5_13_4_hist", "stoch", "stoch_d", "vwap",
+    }
+    np.testing.assert_allclose(out["sma_50"], indicators.sma(bars["Close"], 50), equal_nan=True)
+    np.testing.assert_allclose(out["macd_5_13_4_hist"], indicators.macd(bars["Close"], 5, 13, 4)[2])
+    assert indicators.parse_spec("bbands_10_1.5") == ("bbands", (10, 1.5))
+    with pytest.raises(ValueError, match="Unknown indicator"):
+        indicators.parse_spec("kama_10")
@@ -0,0 +1,137 @@
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from finstat_common import instrument
+from finstat_common.instrument import RERUN_METRIC, SPAN_METRIC, Histogram, Registry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Instrumentation switched on with a fresh registry and no rerun trace"""
+    registry = Registry()
+    monkeypatch.setattr(instrument, "_registry", registry)
+    monkeypatch.setattr(instrument, "_enabled", True)
+    trace_token, stack_token = instrument._trace.set(None), instrument._stack.set(())
+    yield registry
+    instrument._stack.reset(stack_token)
+    instrument._trace.reset(trace_token)
+
+
+def test_quantile_interpolates_inside_buckets():
+    histogram = Histogram()
+    assert math.isnan(histogram.quantile(0.5))
+    for seconds in (0.002, 0.002, 0.02, 0.02):
+        histogram.observe(seconds)
+    assert histogram.count == 4 and histogram.sum == pytest.approx(0.044)
+    # Two observations in (0.001, 0.0025] and two in (0.01, 0.025]
+    assert histogram.quantile(0.5) == pytest.approx(0.0025)
+    assert histogram.quantile(0.75) == pytest.approx(0.0175)
+    assert histogram.quantile(0.25) == pytest.approx(0.00175)
+
+
+def test_bucket_bounds_are_inclusive_and_overflow_reports_the_last_bound():
+    histogram = Histogram()
+    histogram.observe(0.001)
+    histogram.observe(60.0)
+    assert histogram.counts[0] == 1 and histogram.counts[-1] == 1
+    assert histogram.quantile(0.99) == instrument.BUCKETS[-1]
+
+
+def test_prometheus_exposition():
+    registry = Registry()
+    registry.observe(SPAN_METRIC, ("dcf", 'load "prices"', "hit"), 0.003)
+    registry.observe(SPAN_METRIC, ("dcf", 'load "prices"', "hit"), 0.2)
+    registry.observe(RERUN_METRIC, ("dcf", "", ""), 0.5)
+    registry.add_collector("demo", lambda: {"hits": 3, "ready": True, "name": "x"})
+    registry.add_collector("broken", lambda: 1 / 0)
+    lines = registry.prometheus().splitlines()
+
+    labels = 'app="dcf",span="load \\"prices\\"",cache="hit"'
+    assert lines.count(f"# TYPE {SPAN_METRIC} histogram") == 1
+    assert f'{SPAN_METRIC}_bucket{{{labels},le="0.0025"}} 0' in lines
+    assert f'{SPAN_METRIC}_bucket{{{labels},le="0.005"}} 1' in lines
+    assert f'{SPAN_METRIC}_bucket{{{labels},le="0.25"}} 2' in lines
+    assert f'{SPAN_METRIC}_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"{SPAN_METRIC}_count{{{labels}}} 2" in lines
+    assert f'{RERUN_METRIC}_bucket{{app="dcf",le="0.5"}} 1' in lines
+    # Only numeric collector values are exported, and a failing collector is skipped
+    assert "finstat_demo_hits 3.0" in lines
+    assert not [line for line in lines if "ready" in line or "name" in line or "broken" in line]
+
+
+def test_json_lines_export():
+    registry = Registry()
+    registry.observe(SPAN_METRIC, ("viewer", "indicators", ""), 0.004)
+    registry.observe(SPAN_METRIC, ("viewer", "indicators", ""), 0.04)
+    registry.add_collector("demo", lambda: {"hits": 3})
+    records = [json.loads(line) for line in registry.json_lines().splitlines()]
+
+    span, gauge = records
+    assert (span["metric"], span["app"], span["span"], span["cache"]) == (SPAN_METRIC, "viewer", "indicators", "")
+    assert span["count"] == 2 and span["sum"] == pytest.approx(0.044)
+    assert span["buckets"]["0.0025"] == 0 and span["buckets"]["0.005"] == 1 and span["buckets"]["+Inf"] == 2
+    assert (gauge["metric"], gauge["value"]) == ("finstat_demo_hits", 3.0)
+
+
+def memoize(fn):
+    """Stands in for st.cache_data: runs the body once per argument"""
+    values = {}
+
+    def call(*args):
+        if args not in values:
+            values[args] = fn(*args)
+        return values[args]
+
+    call.clear = values.clear
+    return call
+
+
+def test_traced_labels_cache_hits_and_misses(registry):
+    @instrument.traced("square", cache=memoize)
+    def square(x):
+        return x * x
+
+    trace = instrument.start_rerun("dcf")
+    assert [square(2), square(2), square(3)] == [4, 4, 9]
+    instrument.finish_rerun()
+
+    assert [(record.name, record.cache) for record in trace.spans] == [
+        ("square", "miss"),
+        ("square", "hit"),
+        ("square", "miss"),
+    ]
+    counts = {labels: counts for metric, labels, counts, _ in registry._snapshot() if metric == SPAN_METRIC}
+    assert sum(counts[("dcf", "square", "miss")]) == 2 and sum(counts[("dcf", "square", "hit")]) == 1
+    # The cache's clear stays reachable through the wrapper
+    square.clear()
+    square(2)
+    counts = {labels: counts for metric, labels, counts, _ in registry._snapshot() if metric == SPAN_METRIC}
+    assert sum(counts[("dcf", "square", "miss")]) == 3
+
+
+def test_traced_is_a_plain_call_when_disabled(registry, monkeypatch):
+    monkeypatch.setattr(instrument, "_enabled", False)
+    assert instrument.traced()(lambda x: x + 1)(1) == 2
+    assert instrument.span("noop") is instrument._NULL_SPAN
+    assert registry._snapshot() == []
+
+
+def test_propagate_joins_worker_spans_to_the_rerun(registry):
+    def work(name):
+        with instrument.span(name):
+            return name
+
+    trace = instrument.start_rerun("viewer")
+    with instrument.span("load"):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(instrument.propagate(work), "joined").result() == "joined"
+            assert pool.submit(work, "detached").result() == "detached"
+    instrument.finish_rerun()
+
+    # The propagated span nests under the caller's open span; the plain one only feeds the histograms
+    assert [(record.name, record.depth) for record in trace.spans] == [("joined", 1), ("load", 0)]
+    names = {labels[1] for _, labels, _, _ in registry._snapshot()}
+    assert {"joined", "detached", "load"} <= names
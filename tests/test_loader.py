@@ -0,0 +1,43 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from loader import load_concurrently
+
+
+@pytest.fixture
+def pool():
+    pool = ThreadPoolExecutor(max_workers=1)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def test_results_and_errors_are_keyed_by_name(pool):
+    def fail():
+        raise RuntimeError("no statements")
+
+    results, errors = load_concurrently(pool, {"a": (pow, (2, 3)), "b": (fail, ())}, {"a": 5, "b": 5})
+    assert results == {"a": 8} and errors == {"b": "no statements"}
+
+
+def test_timeout_counts_from_when_a_call_starts(pool):
+    # The only worker is busy for 0.3s, longer than the quick call's own timeout
+    calls = {"slow": (time.sleep, (0.3,)), "quick": (str.upper, ("ok",)), "hung": (time.sleep, (1.0,))}
+    results, errors = load_concurrently(pool, calls, {"slow": 1, "quick": 0.2, "hung": 0.1})
+    assert results == {"slow": None, "quick": "OK"}
+    assert errors == {"hung": "timed out after 0.1s"}
+
+
+def test_calls_that_never_get_a_worker_are_cancelled(pool):
+    release = threading.Event()
+    pool.submit(release.wait)  # another session's load holds the only worker
+    ran = []
+    try:
+        results, errors = load_concurrently(pool, {"a": (ran.append, (1,))}, {"a": 5}, queue_timeout=0.1)
+    finally:
+        release.set()
+    pool.shutdown(wait=True)
+    assert results == {} and errors == {"a": "still waiting for a worker after 0.1s"}
+    assert ran == []
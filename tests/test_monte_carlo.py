@@ -0,0 +1,95 @@
+import functools
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from monte_carlo import PERCENTILES, _histogram_percentiles, _pool_moments, _summarize, run_monte_carlo
+
+FIXED = {
+    "revenue_start": 1_000.0,
+    "growth_rate": 12.0,
+    "ebit_margin": 18.0,
+    "tax_rate": 25.0,
+    "discount_rate": 11.0,
+    "terminal_growth": 4.0,
+    "shares_out": 1e8,
+}
+
+
+def percentiles_from_histogram(values: np.ndarray, bin_edges: np.ndarray) -> dict:
+    counts, under, over, *_ = _summarize(values, bin_edges, None)
+    return _histogram_percentiles(counts, under, over, bin_edges, PERCENTILES)
+
+
+def test_histogram_percentiles_match_numpy():
+    values = np.random.default_rng(0).lognormal(3, 0.5, 200_000)
+    bin_edges = np.linspace(values.min(), values.max(), 4_001)
+    result = percentiles_from_histogram(values, bin_edges)
+    expected = np.percentile(values, PERCENTILES)
+    np.testing.assert_allclose(list(result.values()), expected, rtol=2e-3)
+
+
+def test_overflow_counts_toward_upper_percentiles():
+    values = np.random.default_rng(1).normal(100, 10, 100_000)
+    # Histogram covers only up to the 80th percentile; the rest overflows
+    bin_edges = np.linspace(values.min(), np.percentile(values, 80), 2_001)
+    result = percentiles_from_histogram(values, bin_edges)
+    np.testing.assert_allclose(
+        [result[q] for q in (25, 50, 75)], np.percentile(values, [25, 50, 75]), rtol=1e-3
+    )
+    assert result[90] == result[95] == bin_edges[-1]
+
+
+def test_underflow_clamps_to_bottom_edge():
+    values = np.arange(100.0)
+    bin_edges = np.linspace(50, 99, 50)
+    assert percentiles_from_histogram(values, bin_edges)[5] == 50.0
+
+
+def test_pooled_moments_keep_precision_at_large_values():
+    values = 1e9 + np.random.default_rng(2).normal(0, 1, 300_000)
+    bin_edges = np.linspace(values.min(), values.max(), 11)
+    summaries = [_summarize(chunk, bin_edges, None) for chunk in np.array_split(values, 7)]
+    n, mean, m2 = _pool_moments(summaries)
+    assert n == values.size
+    assert mean == pytest.approx(values.mean(), rel=1e-15)
+    assert np.sqrt(m2 / n) == pytest.approx(values.std(), rel=1e-9)
+
+
+def test_zero_spread_collapses_to_point_value():
+    result = run_monte_carlo(FIXED, {"growth_rate": (12.0, 0.0)}, 10, 1_000, chunk_size=300, max_workers=1)
+    assert result.std == pytest.approx(0.0, abs=1e-9)
+    assert result.percentiles[5] == pytest.approx(result.mean, rel=1e-6)
+    assert result.percentiles[95] == pytest.approx(result.mean, rel=1e-6)
+
+
+def test_results_do_not_depend_on_worker_count():
+    distributions = {"growth_rate": (12.0, 4.0), "discount_rate": (11.0, 1.0)}
+    serial = run_monte_carlo(FIXED, distributions, 10, 20_000, chunk_size=5_000, max_workers=1)
+    parallel = run_monte_carlo(FIXED, distributions, 10, 20_000, chunk_size=5_000, max_workers=2)
+    assert serial.mean == parallel.mean and serial.std == parallel.std
+    assert serial.percentiles == parallel.percentiles
+
+
+@pytest.mark.parametrize("n_draws", [0, -5])
+def test_rejects_empty_simulations(n_draws):
+    with pytest.raises(ValueError, match="n_draws"):
+        run_monte_carlo(FIXED, {"growth_rate": (12.0, 4.0)}, 10, n_draws)
+
+
+def test_spawned_workers_find_the_engine_without_the_app_directory_on_sys_path(monkeypatch):
+    import monte_carlo
+
+    # As when the app is started from elsewhere: spawned workers only see the parent's sys.path
+    context = multiprocessing.get_context("spawn")
+    spawn_pool = functools.partial(ProcessPoolExecutor, mp_context=context)
+    monkeypatch.setattr(monte_carlo, "ProcessPoolExecutor", spawn_pool)
+    monkeypatch.setattr(sys, "path", [p for p in sys.path if Path(p).resolve() != Path(monte_carlo.__file__).resolve().parent])
+    distributions = {"growth_rate": (12.0, 4.0)}
+    spawned = run_monte_carlo(FIXED, distributions, 10, 3_000, chunk_size=1_000, max_workers=2)
+    serial = run_monte_carlo(FIXED, distributions, 10, 3_000, chunk_size=1_000, max_workers=1)
+    assert spawned.mean == serial.mean and spawned.percentiles == serial.percentiles
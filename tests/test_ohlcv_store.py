@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from finstat_common import ohlcv_store
+from finstat_common.providers import synthetic_ohlcv
+
+
+class Feed:
+    """Serves a synthetic daily series up to `visible` bars, recording each request"""
+
+    def __init__(self):
+        self.history = synthetic_ohlcv("TEST.NS", "1d", bars=300)
+        self.visible = len(self.history) - 5
+        self.calls = []
+
+    def __call__(self, ticker, interval, auto_adjust, start=None, period=None):
+        self.calls.append({"start": start, "period": period})
+        bars = self.history.iloc[: self.visible]
+        if start is not None:
+            return bars[bars.index >= start]
+        return ohlcv_store._slice_period(bars, period)
+
+
+@pytest.fixture
+def feed():
+    return Feed()
+
+
+@pytest.fixture
+def store(tmp_path, feed):
+    return ohlcv_store.OHLCVStore(root=tmp_path, fetch=feed)
+
+
+def test_fresh_series_is_served_from_disk(store, feed):
+    first = store.read("TEST.NS", "6mo")
+    second = ohlcv_store.OHLCVStore(root=store.root, fetch=feed).read("TEST.NS", "6mo")
+    assert feed.calls == [{"start": None, "period": "6mo"}]
+    pd.testing.assert_frame_equal(second, first, check_freq=False)
+
+
+def test_stale_series_fetches_only_new_bars(store, feed, monkeypatch):
+    store.read("TEST.NS", "6mo")
+    last = feed.history.index[feed.visible - 1]
+    feed.visible += 3
+    monkeypatch.setattr(ohlcv_store, "REFRESH_SECONDS", {})
+    bars = store.read("TEST.NS", "6mo")
+
+    assert feed.calls[-1] == {"start": last, "period": None}
+    assert bars.index.is_unique and bars.index[-1] == feed.history.index[feed.visible - 1]
+    expected = ohlcv_store._slice_period(feed.history.iloc[: feed.visible], "6mo")
+    pd.testing.assert_frame_equal(bars, expected, check_freq=False)
+
+
+def test_longer_period_than_stored_downloads_again(store, feed):
+    store.read("TEST.NS", "3mo")
+    bars = store.read("TEST.NS", "1y")
+    assert [call["period"] for call in feed.calls] == ["3mo", "1y"]
+    assert bars.index[0] >= ohlcv_store.period_start("1y").tz_localize(None)
+    _, meta = store.load("TEST.NS", "1d")
+    assert meta["covered_period"] == "1y"
+
+
+def test_readjusted_history_replaces_the_stored_series(store, feed, monkeypatch):
+    store.read("TEST.NS", "6mo")
+    # A 2:1 split re-adjusts every past bar upstream
+    prices = ["Open", "High", "Low", "Close", "Adj Close"]
+    feed.history[prices] = feed.history[prices] / 2
+    feed.visible += 1
+    monkeypatch.setattr(ohlcv_store, "REFRESH_SECONDS", {})
+    bars = store.read("TEST.NS", "6mo")
+
+    assert [call["period"] for call in feed.calls] == ["6mo", None, "6mo"]
+    expected = ohlcv_store._slice_period(feed.history.iloc[: feed.visible], "6mo")
+    pd.testing.assert_frame_equal(bars, expected, check_freq=False)
+
+
+def test_adjusted_and_raw_bars_are_stored_apart(store):
+    store.read("TEST.NS", "1mo")
+    store.read("TEST.NS", "1mo", auto_adjust=False)
+    assert store.path("TEST.NS", "1d").exists() and store.path("TEST.NS", "1d", auto_adjust=False).exists()
+    assert store.path("TEST.NS", "1d") != store.path("TEST.NS", "1d", auto_adjust=False)
@@ -0,0 +1,80 @@
+import plotly.graph_objects as go
+import pytest
+
+from finstat_common.indicators import compute
+from finstat_common.providers import synthetic_ohlcv
+from panels import WEBGL_THRESHOLD, compose_figure, macd_panel, price_panel, rsi_panel, use_webgl, with_traces
+
+
+@pytest.mark.parametrize(
+    "n_bars, mode, expected",
+    [
+        (WEBGL_THRESHOLD, "Auto", False),
+        (WEBGL_THRESHOLD + 1, "Auto", True),
+        (WEBGL_THRESHOLD + 1, "SVG", False),
+        (10, "WebGL", True),
+    ],
+)
+def test_use_webgl(n_bars, mode, expected):
+    assert use_webgl(n_bars, mode) is expected
+
+
+@pytest.fixture
+def bars():
+    return synthetic_ohlcv("WEBGL.NS", "15m", bars=20_000)
+
+
+def test_webgl_keeps_candlesticks(bars):
+    panel, candles, size = price_panel(bars, 2_000, {}, webgl=True)
+    assert size > 1 and len(candles) <= 2_000
+    price = panel.traces[0]
+    assert isinstance(price, go.Candlestick)
+    assert price.close.dtype == "float32"
+    assert all(isinstance(trace, go.Scattergl) for trace in panel.traces[1:])
+
+
+def test_price_band_is_opt_in(bars):
+    panel, _, _ = price_panel(bars, 2_000, {}, webgl=True, price_band=True)
+    assert not any(isinstance(trace, go.Candlestick) for trace in panel.traces)
+    assert [trace.name for trace in panel.traces[:3]] == ["Low", "High", "Price"]
+    # The band needs WebGL; an SVG chart always gets candles
+    svg, _, _ = price_panel(bars, 2_000, {}, webgl=False, price_band=True)
+    assert isinstance(svg.traces[0], go.Candlestick)
+
+
+@pytest.fixture
+def panels():
+    frame = synthetic_ohlcv("PANELS.NS", "1d", bars=500)
+    values = compute(frame, ["bbands_20_2", "rsi_14", "macd_12_26_9"])
+    for key, column in values.items():
+        frame[key] = column
+    price, _, _ = price_panel(frame, 200, {"bbands_20_2": "BB"})
+    rsi = rsi_panel(frame["rsi_14"], 200)
+    macd = macd_panel(frame["macd_12_26_9"], frame["macd_12_26_9_signal"], frame["macd_12_26_9_hist"], 200)
+    return price, rsi, macd
+
+
+def test_bands_are_drawn_with_their_middle_line(panels):
+    price, _, _ = panels
+    assert [trace.name for trace in price.traces if trace.name.startswith("BB")] == ["BB", "BB upper", "BB lower"]
+    assert price.secondary == [False, True, False, False, False]
+
+
+def test_composing_any_subset_leaves_cached_panels_untouched(panels):
+    price, rsi, macd = panels
+    full = compose_figure([price, rsi, macd], "All")
+    price_only = compose_figure([price], "Price")
+    assert len(full.data) == sum(len(panel.traces) for panel in panels)
+    assert len(price_only.data) == len(price.traces)
+    # The RSI panel lands on the second row, below the price panel's two y axes
+    assert full.data[len(price.traces)].yaxis == "y3"
+    # Composing places copies; the cached traces keep no row or axis assignment
+    assert all(trace.yaxis is None and trace.xaxis is None for panel in panels for trace in panel.traces)
+
+
+def test_with_traces_copies_the_panel(panels):
+    price, _, _ = panels
+    extra = go.Scatter(x=[0], y=[1], name="Forming")
+    combined = with_traces(price, [extra])
+    assert combined.traces[-1] is extra and combined.secondary[-1] is False
+    assert len(price.traces) == len(combined.traces) - 1 and len(price.secondary) == len(price.traces)
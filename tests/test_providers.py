@@ -0,0 +1,24 @@
+import pytest
+
+from finstat_common.providers import MarketDataProvider, SyntheticProvider
+
+
+def test_provider_must_implement_the_interface():
+    class PricesOnly(MarketDataProvider):
+        def download(self, ticker, interval="1d", auto_adjust=True, start=None, period=None):
+            return SyntheticProvider().download(ticker, interval, auto_adjust, start, period)
+
+    with pytest.raises(TypeError, match="fundamentals"):
+        PricesOnly()
+
+
+def test_download_many_defaults_to_one_download_per_ticker():
+    class Prices(MarketDataProvider):
+        def download(self, ticker, interval="1d", auto_adjust=True, start=None, period=None):
+            return SyntheticProvider().download(ticker, interval, auto_adjust, start, period)
+
+        def fundamentals(self, ticker, field):
+            return {}
+
+    data = Prices().download_many(["A.NS", "B.NS"], "1mo")
+    assert list(data["Close"].columns) == ["A.NS", "B.NS"]
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from finstat_common.ratios import compute_ratios
+
+
+def test_quick_ratio_needs_inventory():
+    wide = pd.DataFrame(
+        {
+            "current_assets": [200.0, 200.0, 200.0],
+            "current_liabilities": [100.0, 100.0, 0.0],
+            "inventory": [50.0, np.nan, 50.0],
+        }
+    )
+    quick = compute_ratios(wide)["quick_ratio"]
+    assert quick.iloc[0] == 1.5
+    # A missing inventory figure is unknown, not zero; a zero denominator is undefined
+    assert np.isnan(quick.iloc[1]) and np.isnan(quick.iloc[2])
+    assert compute_ratios(wide.drop(columns="inventory"))["quick_ratio"].isna().all()
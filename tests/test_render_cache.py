@@ -0,0 +1,57 @@
+import matplotlib.pyplot as plt
+
+from finstat_common.providers import synthetic_ohlcv
+from render_cache import RenderCache, render_png
+
+
+class Renderer:
+    def __init__(self, size: int):
+        self.size = size
+        self.calls = 0
+
+    def __call__(self) -> bytes:
+        self.calls += 1
+        return b"x" * self.size
+
+
+def test_hits_reuse_the_image_without_rendering():
+    cache, render = RenderCache(), Renderer(10)
+    assert cache.get_or_render("a", render) == cache.get_or_render("a", render)
+    assert render.calls == 1
+    assert {k: cache.stats()[k] for k in ("images", "bytes", "hits", "misses")} == {
+        "images": 1,
+        "bytes": 10,
+        "hits": 1,
+        "misses": 1,
+    }
+
+
+def test_least_recently_used_images_go_first_once_over_the_cap():
+    cache = RenderCache(max_bytes=25)
+    for key in "abc":
+        cache.get_or_render(key, Renderer(10))
+    # "a" was evicted to make room for "c"
+    assert cache.stats()["evictions"] == 1 and cache.stats()["bytes"] == 20
+    cache.get_or_render("b", Renderer(10))
+    cache.get_or_render("d", Renderer(10))
+    # Reading "b" made "c" the least recently used
+    again = Renderer(10)
+    cache.get_or_render("b", again)
+    cache.get_or_render("c", again)
+    assert again.calls == 1
+
+
+def test_an_oversized_image_is_still_kept():
+    cache = RenderCache(max_bytes=5)
+    render = Renderer(50)
+    cache.get_or_render("big", render)
+    cache.get_or_render("big", render)
+    assert render.calls == 1 and cache.stats()["bytes"] == 50
+
+
+def test_render_png_closes_its_figure():
+    bars = synthetic_ohlcv("PNG.NS", "1d", bars=60)
+    before = set(plt.get_fignums())
+    image = render_png(bars, 50, type="candle", volume=True)
+    assert image.startswith(b"\x89PNG") and set(plt.get_fignums()) == before
+    assert len(render_png(bars, 100, type="candle")) > len(render_png(bars, 50, type="candle"))
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from finstat_common.providers import synthetic_ohlcv
+from finstat_common.resample import NSE_TZ, base_interval, resample_ohlcv
+
+END = "2025-06-27 15:30"
+
+
+@pytest.fixture
+def minutes() -> pd.DataFrame:
+    return synthetic_ohlcv("TCS.NS", "15m", bars=25 * 10, end=END)
+
+
+@pytest.mark.parametrize("interval, first, last", [("30m", "09:15", "15:15"), ("1h", "09:15", "15:15")])
+def test_intraday_buckets_anchor_at_session_open(minutes, interval, first, last):
+    bars = resample_ohlcv(minutes, interval)
+    times = bars.index.strftime("%H:%M")
+    assert bars.index.tz is not None
+    assert set(pd.Series(times).groupby(bars.index.date).first()) == {first}
+    assert set(pd.Series(times).groupby(bars.index.date).last()) == {last}
+    # Only sessions that traded produce bars, so no weekend or overnight buckets
+    assert (bars.index.dayofweek < 5).all()
+    assert len(set(bars.index.date)) == len(set(minutes.index.date))
+
+
+def test_bucket_aggregates(minutes):
+    bars = resample_ohlcv(minutes, "1h")
+    start = bars.index[3]
+    inside = minutes[(minutes.index >= start) & (minutes.index < start + pd.Timedelta(hours=1))]
+    row = bars.iloc[3]
+    assert row["Open"] == inside["Open"].iloc[0]
+    assert row["High"] == inside["High"].max()
+    assert row["Low"] == inside["Low"].min()
+    assert row["Close"] == inside["Close"].iloc[-1]
+    assert row["Volume"] == inside["Volume"].sum()
+
+
+def test_bars_outside_session_are_dropped(minutes):
+    stray = minutes.iloc[:1].copy()
+    stray.index = pd.DatetimeIndex([pd.Timestamp("2025-06-27 16:00", tz=NSE_TZ)], name=minutes.index.name)
+    bars = resample_ohlcv(pd.concat([minutes, stray]), "30m")
+    assert bars.index.max() == pd.Timestamp("2025-06-27 15:15", tz=NSE_TZ)
+
+
+def test_daily_bars_are_indexed_by_naive_session_date(minutes):
+    days = resample_ohlcv(minutes, "1d")
+    assert days.index.tz is None
+    assert len(days) == 10
+    last_day = minutes[minutes.index.date == days.index[-1].date()]
+    assert days["Close"].iloc[-1] == last_day["Close"].iloc[-1]
+
+
+@pytest.mark.parametrize(
+    "period, interval, expected",
+    [
+        (pd.DateOffset(months=1), "1h", "15m"),
+        (pd.DateOffset(months=1), "30m", "15m"),
+        (pd.DateOffset(months=6), "1h", "1h"),
+        # Daily bars are never derived from intraday ones
+        (pd.DateOffset(months=1), "1d", "1d"),
+        (pd.DateOffset(years=5), "1d", "1d"),
+    ],
+)
+def test_base_interval(period, interval, expected):
+    assert base_interval(period, interval) == expected
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_dcf import value_frame
+from reverse_dcf import implied_frame, solve_implied
+
+
+@pytest.fixture
+def assumptions() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    n = 200
+    return pd.DataFrame(
+        {
+            "revenue_start": rng.uniform(100, 10_000, n),
+            "growth_rate": rng.uniform(-5, 40, n),
+            "ebit_margin": rng.uniform(5, 35, n),
+            "tax_rate": rng.uniform(15, 30, n),
+            "discount_rate": rng.uniform(9, 16, n),
+            "terminal_growth": rng.uniform(2, 6, n),
+            "shares_out": rng.uniform(1, 50, n),
+            "years": rng.choice([5, 10, 15], n),
+        }
+    )
+
+
+def test_round_trip_recovers_inputs_on_per_row_horizons(assumptions):
+    valued = value_frame(assumptions, years=10)
+    implied = implied_frame(valued.rename(columns={"intrinsic_value_per_share": "market_price"}), years=10)
+    assert (implied["implied_growth_status"] == "converged").all()
+    assert (implied["implied_discount_rate_status"] == "converged").all()
+    np.testing.assert_allclose(implied["implied_growth"], assumptions["growth_rate"], atol=1e-6)
+    np.testing.assert_allclose(implied["implied_discount_rate"], assumptions["discount_rate"], atol=1e-6)
+
+
+def test_unbracketed_price_is_reported(assumptions):
+    params = assumptions.iloc[0].drop("years").to_dict()
+    result = solve_implied("growth_rate", 1e12, params, 10)
+    assert result.status == "no_bracket" and not result.converged and np.isnan(result.value)
+
+
+def test_collapsed_bracket_is_not_reported_as_converged(assumptions):
+    params = assumptions.iloc[0].drop("years").to_dict()
+    price = float(value_frame(pd.DataFrame([params]), 10)["intrinsic_value_per_share"][0])
+    # An x_tol wider than the whole bracket stops after one step, far from the price
+    result = solve_implied("growth_rate", price * 1.5, params, 10, x_tol=1e3)
+    assert result.status == "stalled"
+    assert not result.converged
+    assert abs(float(result.residual)) > 1e-8 * price
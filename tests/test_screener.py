@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import screener
+from finstat_common import ohlcv_store
+from finstat_common.providers import synthetic_ohlcv
+
+
+class BatchFeed:
+    """Serves synthetic daily bars like `download_many`, recording each batch it is asked for"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, tickers, period, interval):
+        self.batches.append(list(tickers))
+        frames = {ticker: synthetic_ohlcv(ticker, interval, bars=150) for ticker in tickers if ticker != "GONE.NS"}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).swaplevel(axis=1)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    feed = BatchFeed()
+    single = lambda *args, **kwargs: pytest.fail("screener fetched tickers one at a time")  # noqa: E731
+    store = ohlcv_store.OHLCVStore(root=tmp_path, fetch=single, fetch_many=feed)
+    monkeypatch.setattr(screener, "get_store", lambda: store)
+    return store
+
+
+def test_empty_screen_ranks_to_an_empty_table():
+    table = screener.screen(pd.DataFrame({"A.NS": [np.nan, np.nan]}))
+    assert table.empty and list(table.columns) == list(screener.SCREEN_COLUMNS)
+    for name in screener.SCREENS:
+        ranked = screener.rank(table, name)
+        assert ranked.empty and list(ranked.columns) == list(screener.SCREEN_COLUMNS)
+
+
+def test_universe_is_batched_and_stored(store):
+    tickers = ["A.NS", "B.NS", "C.NS", "GONE.NS"]
+    panels = screener.download_universe(tickers, "3mo", batch_size=2)
+
+    assert store.fetch_many.batches == [["A.NS", "B.NS"], ["C.NS", "GONE.NS"]]
+    assert list(panels["Close"].columns) == ["A.NS", "B.NS", "C.NS"]
+    assert panels["Close"].dtypes.eq(np.float32).all()
+    # The screener filled the same per-ticker store a chart reads from
+    pd.testing.assert_series_equal(
+        store.read("B.NS", "3mo")["Close"].astype(np.float32), panels["Close"]["B.NS"].dropna(), check_names=False
+    )
+
+
+def test_fresh_tickers_are_not_downloaded_again(store):
+    screener.download_universe(["A.NS", "B.NS"], "3mo")
+    screener.download_universe(["A.NS", "B.NS", "C.NS"], "3mo")
+    assert store.fetch_many.batches == [["A.NS", "B.NS"], ["C.NS"]]
+
+
+def test_stale_tickers_are_spliced_into_the_store(store, monkeypatch):
+    screener.download_universe(["A.NS"], "3mo")
+    monkeypatch.setattr(ohlcv_store, "REFRESH_SECONDS", {})
+    screener.download_universe(["A.NS"], "3mo")
+    assert store.fetch_many.batches == [["A.NS"], ["A.NS"]]
+    _, meta = store.load("A.NS", "1d")
+    assert meta["covered_period"] == "3mo"
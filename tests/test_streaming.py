@@ -0,0 +1,93 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from finstat_common.incremental import IndicatorState
+from finstat_common.providers import synthetic_ohlcv
+from finstat_common.resample import resample_ohlcv
+from finstat_common.streaming import (
+    BAR_COLUMNS,
+    IST_OFFSET_NS,
+    CandleAggregator,
+    StreamRunner,
+    TickBatch,
+    TickFeed,
+    simulate_ticks,
+    ticks_from_bars,
+)
+
+
+@pytest.mark.parametrize("interval", ["15m", "1h", "1d"])
+def test_aggregated_ticks_match_resample(interval):
+    bars = {ticker: synthetic_ohlcv(ticker, "15m", bars=400) for ticker in ("A.NS", "B.NS")}
+    symbols, ticks = ticks_from_bars(bars, "15m")
+    aggregator = CandleAggregator(symbols, interval)
+    for start in range(0, len(ticks.price), 997):
+        aggregator.update(TickBatch(*(column[start : start + 997] for column in ticks)))
+
+    for symbol, frame in bars.items():
+        expected = resample_ohlcv(frame[BAR_COLUMNS], interval)
+        streamed = aggregator.bars(symbol)
+        pd.testing.assert_frame_equal(
+            streamed[BAR_COLUMNS], expected, rtol=1e-9, check_freq=False, check_names=False, check_index_type=False
+        )
+        # Closed bars carry RSI/MACD advanced one bar at a time
+        _, indicators = IndicatorState.warm(expected["Close"].iloc[:-1])
+        pd.testing.assert_frame_equal(
+            streamed.iloc[:-1][indicators.columns], indicators, rtol=1e-9, check_freq=False, check_names=False
+        )
+
+
+def _tick(minute: pd.Timestamp, second: int, price: float) -> TickBatch:
+    timestamp = (minute + pd.Timedelta(seconds=second)).tz_localize(None).as_unit("ns").value - IST_OFFSET_NS
+    return TickBatch(np.array([0], np.int32), np.array([timestamp]), np.array([price]), np.array([10.0]))
+
+
+def test_seeded_one_minute_stream_keeps_the_first_live_bar():
+    index = pd.date_range("2026-01-05 09:15", periods=30, freq="1min", tz="Asia/Kolkata")
+    close = 100 + np.arange(30.0)
+    seeded = pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0}, index=index)
+    aggregator = CandleAggregator(["A.NS"], "1m")
+    aggregator.seed("A.NS", seeded)
+
+    first, second = index[-1] + pd.Timedelta(minutes=1), index[-1] + pd.Timedelta(minutes=2)
+    # A late tick for the last stored bar is dropped
+    assert aggregator.update(_tick(index[-1], 30, 1.0)).dropped == 1
+    for tick in (_tick(first, 5, 200.0), _tick(first, 40, 210.0), _tick(second, 1, 220.0)):
+        aggregator.update(tick)
+
+    bars = aggregator.bars("A.NS")
+    assert list(bars.index[-2:]) == [first, second]
+    assert bars.loc[first, BAR_COLUMNS].tolist() == [200.0, 210.0, 200.0, 210.0, 20.0]
+    assert aggregator.stats()["bars_closed"] == 1
+
+
+def _simulated_runner(**limits) -> StreamRunner:
+    aggregator = CandleAggregator(["A.NS"], "1m")
+    feed = TickFeed(["A.NS"], simulate_ticks([100.0], "2026-01-05", rate=100.0), speed=60)
+    return StreamRunner(feed, aggregator, **limits).start()
+
+
+@pytest.mark.parametrize(
+    "limits, reason", [({"max_seconds": 0.3}, "time limit"), ({"idle_seconds": 0.3}, "not viewed")]
+)
+def test_endless_stream_stops_at_its_limits(limits, reason):
+    runner = _simulated_runner(**limits)
+    deadline = time.monotonic() + 10
+    while runner.running and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not runner.running and runner.error is None
+    assert reason in runner.stop_reason and runner.aggregator.stats()["ticks"] > 0
+
+
+def test_touched_stream_keeps_running():
+    runner = _simulated_runner(idle_seconds=0.5)
+    for _ in range(15):
+        runner.touch()
+        time.sleep(0.1)
+    assert runner.running
+    runner.stop()
+    assert not runner.running and runner.stop_reason is None
+    assert runner.id != _simulated_runner(max_seconds=0).id
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from finstat_common.fundamentals_cache import FundamentalsCache
+from finstat_common.providers import SyntheticProvider
+from finstat_common.ratios import compute_ratios, stack_statements
+from finstat_common.warehouse import FundamentalsWarehouse
+
+TICKERS = ["A.NS", "B.NS", "C.NS", "D.NS"]
+
+
+class Statements:
+    """Synthetic statements, with no data for `empty` tickers and an error for `failing` ones"""
+
+    def __init__(self, empty=(), failing=()):
+        self.provider = SyntheticProvider(end="2026-06-30")
+        self.empty, self.failing, self.calls = set(empty), set(failing), []
+
+    def __call__(self, ticker, field):
+        self.calls.append((ticker, field))
+        if ticker in self.failing:
+            raise RuntimeError("connection reset")
+        if ticker in self.empty:
+            return pd.DataFrame()
+        return self.provider.fundamentals(ticker, field)
+
+
+@pytest.fixture
+def warehouse(tmp_path):
+    return FundamentalsWarehouse(tmp_path, FundamentalsCache(tmp_path, Statements()))
+
+
+def test_resumed_ingest_skips_existing_parts(warehouse):
+    report = warehouse.ingest(TICKERS[:2], max_workers=2)
+    assert sorted(report.ingested) == TICKERS[:2] and not report.skipped
+    calls = len(warehouse.cache.fetch.calls)
+
+    report = warehouse.ingest(TICKERS, max_workers=2)
+    assert report.skipped == TICKERS[:2] and sorted(report.ingested) == TICKERS[2:]
+    # Only the new tickers were fetched
+    assert {ticker for ticker, _ in warehouse.cache.fetch.calls[calls:]} == set(TICKERS[2:])
+
+
+def test_empty_and_failed_tickers_get_no_part(tmp_path):
+    fetch = Statements(empty={"B.NS"}, failing={"C.NS"})
+    warehouse = FundamentalsWarehouse(tmp_path, FundamentalsCache(tmp_path, fetch))
+    report = warehouse.ingest(TICKERS[:3])
+    assert report.ingested == ["A.NS"] and report.empty == ["B.NS"] and list(report.failed) == ["C.NS"]
+    assert not warehouse.part_path("B.NS").exists() and not warehouse.part_path("C.NS").exists()
+
+    # Once the provider answers again, the next run picks both up
+    fetch.empty, fetch.failing = set(), set()
+    for field in ("balance_sheet", "quarterly_balance_sheet"):
+        warehouse.cache.write("B.NS", field, pd.DataFrame(), {"expires_at": 0})
+    report = warehouse.ingest(TICKERS[:3])
+    assert report.skipped == ["A.NS"] and sorted(report.ingested) == ["B.NS", "C.NS"]
+
+
+def test_compact_merges_parts_and_precomputes_ratios(warehouse):
+    warehouse.ingest(TICKERS)
+    parts = sum(pq.read_metadata(warehouse.part_path(ticker)).num_rows for ticker in TICKERS)
+    assert warehouse.compact() == parts == len(warehouse.line_items())
+
+    provider = warehouse.cache.fetch.provider
+    statements = {ticker: [provider.fundamentals(ticker, "quarterly_balance_sheet")] for ticker in TICKERS}
+    expected = compute_ratios(stack_statements(statements, "quarterly"))
+    table = warehouse.table().set_index(["ticker", "freq", "period"])
+    quarterly = table.xs("quarterly", level="freq", drop_level=False)
+    pd.testing.assert_frame_equal(
+        quarterly[expected.columns], expected.reindex(quarterly.index), check_names=False, check_index_type=False
+    )
+    assert len(warehouse.line_items(["B.NS"])["ticker"].unique()) == 1
+
+
+def test_screen_filters_and_ranks_the_latest_period(warehouse):
+    warehouse.ingest(TICKERS)
+    latest = warehouse.snapshot("quarterly")
+    assert sorted(latest.index) == TICKERS
+    table = warehouse.table()
+    for ticker, row in latest.iterrows():
+        assert row["period"] == table.loc[(table["ticker"] == ticker) & (table["freq"] == "quarterly"), "period"].max()
+
+    threshold = latest["current_ratio"].median()
+    result = warehouse.screen(f"current_ratio > {threshold}", sort_by="debt_to_equity", ascending=True)
+    expected = latest[latest["current_ratio"] > threshold].sort_values("debt_to_equity")
+    assert list(result.index) == list(expected.index) and len(result) > 0
+    assert np.all(np.diff(result["debt_to_equity"].to_numpy()) >= 0)
+    assert len(warehouse.screen(sort_by="current_ratio", limit=2)) == 2